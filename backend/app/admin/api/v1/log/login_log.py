@@ -2,16 +2,20 @@
 # -*- coding: utf-8 -*-
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
+from starlette.responses import StreamingResponse
 
 from backend.app.admin.schema.login_log import GetLoginLogDetail
 from backend.app.admin.service.login_log_service import login_log_service
+from backend.common.enums import ExportFormatType
 from backend.common.pagination import DependsPagination, PageData, paging_data
 from backend.common.response.response_schema import ResponseModel, ResponseSchemaModel, response_base
 from backend.common.security.jwt import DependsJwtAuth
 from backend.common.security.permission import RequestPermission
 from backend.common.security.rbac import DependsRBAC
-from backend.database.db import CurrentSession
+from backend.common.sparse_fields import FieldSet, sparse_fields
+from backend.database.db import CurrentReportingSession
+from backend.utils.export import export_response
 
 router = APIRouter()
 
@@ -19,20 +23,41 @@ router = APIRouter()
 @router.get(
     '',
     summary='分页获取登录日志',
+    response_model=ResponseSchemaModel[PageData[GetLoginLogDetail]],
     dependencies=[
         DependsJwtAuth,
         DependsPagination,
     ],
 )
 async def get_pagination_login_logs(
-    db: CurrentSession,
+    db: CurrentReportingSession,
+    fields: Annotated[FieldSet, sparse_fields(GetLoginLogDetail)],
     username: Annotated[str | None, Query(description='用户名')] = None,
     status: Annotated[int | None, Query(description='状态')] = None,
     ip: Annotated[str | None, Query(description='IP 地址')] = None,
-) -> ResponseSchemaModel[PageData[GetLoginLogDetail]]:
-    log_select = await login_log_service.get_select(username=username, status=status, ip=ip)
+) -> Response:
+    log_select = fields.project(await login_log_service.get_select(username=username, status=status, ip=ip))
     page_data = await paging_data(db, log_select)
-    return response_base.success(data=page_data)
+    return response_base.fast_success(data=page_data, schema=PageData[fields.schema])
+
+
+@router.get(
+    '/export',
+    summary='导出登录日志',
+    dependencies=[
+        Depends(RequestPermission('log:login:export')),
+        DependsRBAC,
+    ],
+)
+async def export_login_logs(
+    username: Annotated[str | None, Query(description='用户名')] = None,
+    status: Annotated[int | None, Query(description='状态')] = None,
+    ip: Annotated[str | None, Query(description='IP 地址')] = None,
+    fmt: Annotated[ExportFormatType, Query(alias='format', description='导出格式')] = ExportFormatType.csv,
+    gzip: Annotated[bool, Query(description='是否压缩为 .gz 文件')] = False,
+) -> StreamingResponse:
+    chunks = login_log_service.export(username=username, status=status, ip=ip, fmt=fmt)
+    return export_response(chunks, 'login_log', fmt, gzip=gzip)
 
 
 @router.delete(
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from fastapi import APIRouter, Depends
+
+from backend.common.opera_log import opera_log_policy
+from backend.common.response.response_schema import ResponseModel, response_base
+from backend.common.security.jwt import DependsJwtAuth
+from backend.common.security.permission import RequestPermission
+from backend.database.db import get_pool_stats
+
+router = APIRouter()
+
+
+@router.get(
+    '/pool',
+    summary='数据库连接池监控',
+    dependencies=[
+        Depends(RequestPermission('sys:monitor:server')),
+        DependsJwtAuth,
+    ],
+)
+@opera_log_policy(read_sample_rate=0.0)
+async def get_db_pool_stats() -> ResponseModel:
+    return response_base.success(data=get_pool_stats())
@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 from fastapi import APIRouter, Depends
 
+from backend.common.opera_log import opera_log_policy
 from backend.common.response.response_schema import ResponseModel, response_base
 from backend.common.security.jwt import DependsJwtAuth
 from backend.common.security.permission import RequestPermission
@@ -18,6 +19,7 @@ router = APIRouter()
         DependsJwtAuth,
     ],
 )
+@opera_log_policy(read_sample_rate=0.0)
 async def get_redis_info() -> ResponseModel:
     data = {
         'info': await redis_info.get_info(),
@@ -3,9 +3,11 @@
 from fastapi import APIRouter, Depends
 from starlette.concurrency import run_in_threadpool
 
+from backend.common.opera_log import opera_log_policy
 from backend.common.response.response_schema import ResponseModel, response_base
 from backend.common.security.jwt import DependsJwtAuth
 from backend.common.security.permission import RequestPermission
+from backend.database.db import get_pool_stats
 from backend.utils.server_info import server_info
 
 router = APIRouter()
@@ -19,6 +21,7 @@ router = APIRouter()
         DependsJwtAuth,
     ],
 )
+@opera_log_policy(read_sample_rate=0.0)
 async def get_server_info() -> ResponseModel:
     data = {
         # 扔到线程池，避免阻塞
@@ -27,5 +30,6 @@ async def get_server_info() -> ResponseModel:
         'sys': await run_in_threadpool(server_info.get_sys_info),
         'disk': await run_in_threadpool(server_info.get_disk_info),
         'service': await run_in_threadpool(server_info.get_service_info),
+        'db_pool': get_pool_stats(),
     }
     return response_base.success(data=data)
@@ -2,7 +2,7 @@
 # -*- coding: utf-8 -*-
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Path, Query
+from fastapi import APIRouter, Depends, Path, Query, Response
 
 from backend.app.admin.schema.data_rule import (
     CreateDataRuleParam,
@@ -16,6 +16,7 @@ from backend.common.response.response_schema import ResponseModel, ResponseSchem
 from backend.common.security.jwt import DependsJwtAuth
 from backend.common.security.permission import RequestPermission
 from backend.common.security.rbac import DependsRBAC
+from backend.common.sparse_fields import FieldSet, sparse_fields
 from backend.database.db import CurrentSession
 
 router = APIRouter()
@@ -52,17 +53,20 @@ async def get_data_rule(
 @router.get(
     '',
     summary='分页获取所有数据规则',
+    response_model=ResponseSchemaModel[PageData[GetDataRuleDetail]],
     dependencies=[
         DependsJwtAuth,
         DependsPagination,
     ],
 )
 async def get_pagination_data_rules(
-    db: CurrentSession, name: Annotated[str | None, Query(description='规则名称')] = None
-) -> ResponseSchemaModel[PageData[GetDataRuleDetail]]:
-    data_rule_select = await data_rule_service.get_select(name=name)
+    db: CurrentSession,
+    fields: Annotated[FieldSet, sparse_fields(GetDataRuleDetail)],
+    name: Annotated[str | None, Query(description='规则名称')] = None,
+) -> Response:
+    data_rule_select = fields.project(await data_rule_service.get_select(name=name))
     page_data = await paging_data(db, data_rule_select)
-    return response_base.success(data=page_data)
+    return response_base.fast_success(data=page_data, schema=PageData[fields.schema])
 
 
 @router.post(
@@ -2,7 +2,7 @@
 # -*- coding: utf-8 -*-
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Path, Query
+from fastapi import APIRouter, Depends, Path, Query, Response
 
 from backend.app.admin.schema.data_scope import (
     CreateDataScopeParam,
@@ -17,6 +17,7 @@ from backend.common.response.response_schema import ResponseModel, ResponseSchem
 from backend.common.security.jwt import DependsJwtAuth
 from backend.common.security.permission import RequestPermission
 from backend.common.security.rbac import DependsRBAC
+from backend.common.sparse_fields import FieldSet, sparse_fields
 from backend.database.db import CurrentSession
 
 router = APIRouter()
@@ -41,6 +42,7 @@ async def get_data_scope_rules(
 @router.get(
     '',
     summary='分页获取所有数据范围',
+    response_model=ResponseSchemaModel[PageData[GetDataScopeDetail]],
     dependencies=[
         DependsJwtAuth,
         DependsPagination,
@@ -48,12 +50,13 @@ async def get_data_scope_rules(
 )
 async def get_pagination_data_scopes(
     db: CurrentSession,
+    fields: Annotated[FieldSet, sparse_fields(GetDataScopeDetail)],
     name: Annotated[str | None, Query(description='范围名称')] = None,
     status: Annotated[int | None, Query(description='状态')] = None,
-) -> ResponseSchemaModel[PageData[GetDataScopeDetail]]:
-    data_scope_select = await data_scope_service.get_select(name=name, status=status)
+) -> Response:
+    data_scope_select = fields.project(await data_scope_service.get_select(name=name, status=status))
     page_data = await paging_data(db, data_scope_select)
-    return response_base.success(data=page_data)
+    return response_base.fast_success(data=page_data, schema=PageData[fields.schema])
 
 
 @router.post(
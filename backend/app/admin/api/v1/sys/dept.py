@@ -6,6 +6,7 @@ from fastapi import APIRouter, Depends, Path, Query, Request
 
 from backend.app.admin.schema.dept import CreateDeptParam, GetDeptDetail, UpdateDeptParam
 from backend.app.admin.service.dept_service import dept_service
+from backend.common.etag import conditional_get
 from backend.common.response.response_schema import ResponseModel, ResponseSchemaModel, response_base
 from backend.common.security.jwt import DependsJwtAuth
 from backend.common.security.permission import RequestPermission
@@ -14,13 +15,20 @@ from backend.common.security.rbac import DependsRBAC
 router = APIRouter()
 
 
-@router.get('/{pk}', summary='获取部门详情', dependencies=[DependsJwtAuth])
+@router.get('/{pk}', summary='获取部门详情', dependencies=[DependsJwtAuth, conditional_get('dept')])
 async def get_dept(pk: Annotated[int, Path(description='部门 ID')]) -> ResponseSchemaModel[GetDeptDetail]:
     data = await dept_service.get(pk=pk)
     return response_base.success(data=data)
 
 
-@router.get('', summary='获取所有部门展示树', dependencies=[DependsJwtAuth])
+@router.get(
+    '',
+    summary='获取所有部门展示树',
+    dependencies=[
+        DependsJwtAuth,
+        conditional_get('dept', 'role', 'data_scope', 'data_rule', per_user=True),
+    ],
+)
 async def get_all_depts(
     request: Request,
     name: Annotated[str | None, Query(description='部门名称')] = None,
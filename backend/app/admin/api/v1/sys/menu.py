@@ -2,10 +2,11 @@
 # -*- coding: utf-8 -*-
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, Path, Query, Request
+from fastapi import APIRouter, Depends, Path, Query, Request, Response
 
 from backend.app.admin.schema.menu import CreateMenuParam, GetMenuDetail, UpdateMenuParam
 from backend.app.admin.service.menu_service import menu_service
+from backend.common.etag import conditional_get
 from backend.common.response.response_schema import ResponseModel, ResponseSchemaModel, response_base
 from backend.common.security.jwt import DependsJwtAuth
 from backend.common.security.permission import RequestPermission
@@ -14,19 +15,25 @@ from backend.common.security.rbac import DependsRBAC
 router = APIRouter()
 
 
-@router.get('/sidebar', summary='获取用户菜单侧边栏', description='适配 vben5', dependencies=[DependsJwtAuth])
-async def get_user_sidebar(request: Request) -> ResponseSchemaModel[list[dict[str, Any]]]:
+@router.get(
+    '/sidebar',
+    summary='获取用户菜单侧边栏',
+    description='适配 vben5',
+    response_model=ResponseSchemaModel[list[dict[str, Any]]],
+    dependencies=[DependsJwtAuth, conditional_get('menu', per_user=True)],
+)
+async def get_user_sidebar(request: Request) -> Response:
     menu = await menu_service.get_user_menu_tree(request=request)
-    return response_base.success(data=menu)
+    return response_base.encoded_success(data=menu)
 
 
-@router.get('/{pk}', summary='获取菜单详情', dependencies=[DependsJwtAuth])
+@router.get('/{pk}', summary='获取菜单详情', dependencies=[DependsJwtAuth, conditional_get('menu')])
 async def get_menu(pk: Annotated[int, Path(description='菜单 ID')]) -> ResponseSchemaModel[GetMenuDetail]:
     data = await menu_service.get(pk=pk)
     return response_base.success(data=data)
 
 
-@router.get('', summary='获取所有菜单展示树', dependencies=[DependsJwtAuth])
+@router.get('', summary='获取所有菜单展示树', dependencies=[DependsJwtAuth, conditional_get('menu')])
 async def get_all_menus(
     title: Annotated[str | None, Query(description='菜单标题')] = None,
     status: Annotated[int | None, Query(description='状体')] = None,
@@ -2,7 +2,7 @@
 # -*- coding: utf-8 -*-
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, Path, Query
+from fastapi import APIRouter, Depends, Path, Query, Response
 
 from backend.app.admin.schema.role import (
     CreateRoleParam,
@@ -13,17 +13,19 @@ from backend.app.admin.schema.role import (
     UpdateRoleScopeParam,
 )
 from backend.app.admin.service.role_service import role_service
+from backend.common.etag import conditional_get
 from backend.common.pagination import DependsPagination, PageData, paging_data
 from backend.common.response.response_schema import ResponseModel, ResponseSchemaModel, response_base
 from backend.common.security.jwt import DependsJwtAuth
 from backend.common.security.permission import RequestPermission
 from backend.common.security.rbac import DependsRBAC
+from backend.common.sparse_fields import FieldSet, sparse_fields
 from backend.database.db import CurrentSession
 
 router = APIRouter()
 
 
-@router.get('/all', summary='获取所有角色', dependencies=[DependsJwtAuth])
+@router.get('/all', summary='获取所有角色', dependencies=[DependsJwtAuth, conditional_get('role')])
 async def get_all_roles() -> ResponseSchemaModel[list[GetRoleDetail]]:
     data = await role_service.get_all()
     return response_base.success(data=data)
@@ -37,7 +39,7 @@ async def get_user_all_roles(
     return response_base.success(data=data)
 
 
-@router.get('/{pk}/menus', summary='获取角色所有菜单', dependencies=[DependsJwtAuth])
+@router.get('/{pk}/menus', summary='获取角色所有菜单', dependencies=[DependsJwtAuth, conditional_get('role', 'menu')])
 async def get_role_all_menus(
     pk: Annotated[int, Path(description='角色 ID')],
 ) -> ResponseSchemaModel[list[dict[str, Any]]]:
@@ -45,13 +47,17 @@ async def get_role_all_menus(
     return response_base.success(data=menu)
 
 
-@router.get('/{pk}/scopes', summary='获取角色所有数据范围', dependencies=[DependsJwtAuth])
+@router.get(
+    '/{pk}/scopes', summary='获取角色所有数据范围', dependencies=[DependsJwtAuth, conditional_get('role', 'data_scope')]
+)
 async def get_role_all_scopes(pk: Annotated[int, Path(description='角色 ID')]) -> ResponseSchemaModel[list[int]]:
     rule = await role_service.get_scopes(pk=pk)
     return response_base.success(data=rule)
 
 
-@router.get('/{pk}', summary='获取角色详情', dependencies=[DependsJwtAuth])
+@router.get(
+    '/{pk}', summary='获取角色详情', dependencies=[DependsJwtAuth, conditional_get('role', 'menu', 'data_scope')]
+)
 async def get_role(
     pk: Annotated[int, Path(description='角色 ID')],
 ) -> ResponseSchemaModel[GetRoleWithRelationDetail]:
@@ -62,19 +68,22 @@ async def get_role(
 @router.get(
     '',
     summary='分页获取所有角色',
+    response_model=ResponseSchemaModel[PageData[GetRoleDetail]],
     dependencies=[
         DependsJwtAuth,
         DependsPagination,
+        conditional_get('role'),
     ],
 )
 async def get_pagination_roles(
     db: CurrentSession,
+    fields: Annotated[FieldSet, sparse_fields(GetRoleDetail)],
     name: Annotated[str | None, Query(description='角色名称')] = None,
     status: Annotated[int | None, Query(description='状态')] = None,
-) -> ResponseSchemaModel[PageData[GetRoleDetail]]:
-    role_select = await role_service.get_select(name=name, status=status)
+) -> Response:
+    role_select = fields.project(await role_service.get_select(name=name, status=status))
     page_data = await paging_data(db, role_select)
-    return response_base.success(data=page_data)
+    return response_base.fast_success(data=page_data, schema=PageData[fields.schema])
 
 
 @router.post(
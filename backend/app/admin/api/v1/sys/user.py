@@ -2,25 +2,30 @@
 # -*- coding: utf-8 -*-
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Path, Query, Request
+from fastapi import APIRouter, Depends, File, Path, Query, Request, Response, UploadFile
+from starlette.responses import StreamingResponse
 
 from backend.app.admin.schema.user import (
     AddUserParam,
     AvatarParam,
     GetCurrentUserInfoWithRelationDetail,
     GetUserInfoWithRelationDetail,
+    ImportUserResult,
     RegisterUserParam,
     ResetPasswordParam,
     UpdateUserParam,
     UpdateUserRoleParam,
 )
 from backend.app.admin.service.user_service import user_service
+from backend.common.enums import ExportFormatType
 from backend.common.pagination import DependsPagination, PageData, paging_data
 from backend.common.response.response_schema import ResponseModel, ResponseSchemaModel, response_base
 from backend.common.security.jwt import DependsJwtAuth
 from backend.common.security.permission import RequestPermission
 from backend.common.security.rbac import DependsRBAC
+from backend.common.sparse_fields import FieldSet, sparse_fields
 from backend.database.db import CurrentSession
+from backend.utils.export import export_response
 
 router = APIRouter()
 
@@ -38,6 +43,24 @@ async def add_user(request: Request, obj: AddUserParam) -> ResponseSchemaModel[G
     return response_base.success(data=data)
 
 
+@router.post(
+    '/import',
+    summary='批量导入用户',
+    description='支持 CSV 或 JSON 文件，字段同添加用户，CSV 中多个角色 ID 以 , | ; 或空格分隔',
+    dependencies=[
+        Depends(RequestPermission('sys:user:import')),
+        DependsRBAC,
+    ],
+)
+async def import_users(
+    request: Request,
+    file: Annotated[UploadFile, File(description='CSV 或 JSON 文件')],
+    background: Annotated[bool, Query(description='是否后台导入，超过阈值行数时自动后台导入')] = False,
+) -> ResponseSchemaModel[ImportUserResult]:
+    data = await user_service.import_users(request=request, file=file, background=background)
+    return response_base.success(data=data)
+
+
 @router.post('/password/reset', summary='密码重置', dependencies=[DependsJwtAuth])
 async def password_reset(request: Request, obj: ResetPasswordParam) -> ResponseModel:
     count = await user_service.pwd_reset(request=request, obj=obj)
@@ -52,6 +75,26 @@ async def get_current_user(request: Request) -> ResponseSchemaModel[GetCurrentUs
     return response_base.success(data=data)
 
 
+@router.get(
+    '/export',
+    summary='导出用户',
+    dependencies=[
+        Depends(RequestPermission('sys:user:export')),
+        DependsRBAC,
+    ],
+)
+async def export_users(
+    dept: Annotated[int | None, Query(description='部门 ID')] = None,
+    username: Annotated[str | None, Query(description='用户名')] = None,
+    phone: Annotated[str | None, Query(description='手机号')] = None,
+    status: Annotated[int | None, Query(description='状态')] = None,
+    fmt: Annotated[ExportFormatType, Query(alias='format', description='导出格式')] = ExportFormatType.csv,
+    gzip: Annotated[bool, Query(description='是否压缩为 .gz 文件')] = False,
+) -> StreamingResponse:
+    chunks = user_service.export(dept=dept, username=username, phone=phone, status=status, fmt=fmt)
+    return export_response(chunks, 'user', fmt, gzip=gzip)
+
+
 @router.get('/{username}', summary='查看用户信息', dependencies=[DependsJwtAuth])
 async def get_user(
     username: Annotated[str, Path(description='用户名')],
@@ -98,6 +141,7 @@ async def update_avatar(
 @router.get(
     '',
     summary='分页获取所有用户',
+    response_model=ResponseSchemaModel[PageData[GetUserInfoWithRelationDetail]],
     dependencies=[
         DependsJwtAuth,
         DependsPagination,
@@ -105,14 +149,15 @@ async def update_avatar(
 )
 async def get_pagination_users(
     db: CurrentSession,
+    fields: Annotated[FieldSet, sparse_fields(GetUserInfoWithRelationDetail)],
     dept: Annotated[int | None, Query(description='部门 ID')] = None,
     username: Annotated[str | None, Query(description='用户名')] = None,
     phone: Annotated[str | None, Query(description='手机号')] = None,
     status: Annotated[int | None, Query(description='状态')] = None,
-) -> ResponseSchemaModel[PageData[GetUserInfoWithRelationDetail]]:
-    user_select = await user_service.get_select(dept=dept, username=username, phone=phone, status=status)
+) -> Response:
+    user_select = await user_service.get_select(dept=dept, username=username, phone=phone, status=status, fields=fields)
     page_data = await paging_data(db, user_select)
-    return response_base.success(data=page_data)
+    return response_base.fast_success(data=page_data, schema=PageData[fields.schema])
 
 
 @router.put('/{pk}/super', summary='修改用户超级权限', dependencies=[DependsRBAC])
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-from typing import Sequence
+from typing import Iterable, Sequence
 
 from sqlalchemy import Select, and_, desc, select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -61,6 +61,18 @@ class CRUDDataRule(CRUDPlus[DataRule]):
         """
         return await self.select_models(db)
 
+    async def get_scope_ids(self, db: AsyncSession, pks: Iterable[int]) -> set[int]:
+        """
+        获取规则所属的数据范围 ID
+
+        :param db: 数据库会话
+        :param pks: 规则 ID 列表
+        :return:
+        """
+        stmt = select(self.model.scope_id).where(self.model.id.in_(set(pks)), self.model.scope_id.is_not(None))
+        result = await db.execute(stmt)
+        return set(result.scalars().all())
+
     async def create(self, db: AsyncSession, obj: CreateDataRuleParam) -> None:
         """
         创建规则
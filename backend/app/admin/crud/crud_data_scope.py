@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+from typing import Sequence
+
 from sqlalchemy import Select, and_, desc, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import noload, selectinload
@@ -7,6 +9,8 @@ from sqlalchemy_crud_plus import CRUDPlus
 
 from backend.app.admin.model import DataRule, DataScope
 from backend.app.admin.schema.data_scope import CreateDataScopeParam, UpdateDataScopeParam, UpdateDataScopeRuleParam
+from backend.database.loader import get_loader
+from backend.database.relation import sync_foreign_key
 
 
 class CRUDDataScope(CRUDPlus[DataScope]):
@@ -44,6 +48,17 @@ class CRUDDataScope(CRUDPlus[DataScope]):
         data_scope = await db.execute(stmt)
         return data_scope.scalars().first()
 
+    async def load_with_relation(self, db: AsyncSession, pks: Sequence[int]) -> list[DataScope | None]:
+        """
+        通过会话内批量加载器获取多个数据范围关联数据
+
+        :param db: 数据库会话
+        :param pks: 范围 ID 列表
+        :return:
+        """
+        loader = get_loader(db, self.model, selectinload(self.model.rules), key='rules')
+        return await loader.load_many(pks)
+
     async def get_list(self, name: str | None, status: int | None) -> Select:
         """
         获取数据范围列表
@@ -99,11 +114,8 @@ class CRUDDataScope(CRUDPlus[DataScope]):
         :param rule_ids: 数据规则 ID 列表
         :return:
         """
-        current_data_scope = await self.get_with_relation(db, pk)
-        stmt = select(DataRule).where(DataRule.id.in_(rule_ids.rules))
-        rules = await db.execute(stmt)
-        current_data_scope.rules = rules.scalars().all()
-        return len(current_data_scope.rules)
+        await sync_foreign_key(db, DataRule.id, DataRule.scope_id, pk, rule_ids.rules)
+        return len(set(rule_ids.rules))
 
     async def delete(self, db: AsyncSession, pk: list[int]) -> int:
         """
@@ -3,14 +3,18 @@
 from typing import Sequence
 
 from fastapi import Request
-from sqlalchemy import select
+from sqlalchemy import and_, lambda_stmt, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from sqlalchemy_crud_plus import CRUDPlus
 
 from backend.app.admin.model import Dept
+from backend.app.admin.model.closure import sys_dept_closure
 from backend.app.admin.schema.dept import CreateDeptParam, UpdateDeptParam
 from backend.common.security.permission import filter_data_permission
+from backend.database.dml import conditional_update, exists_row, unique_except_self
+from backend.database.hierarchy import ClosureTree
+from backend.database.loader import get_loader
 
 
 class CRUDDept(CRUDPlus[Dept]):
@@ -26,6 +30,28 @@ class CRUDDept(CRUDPlus[Dept]):
         """
         return await self.select_model_by_column(db, id=dept_id, del_flag=0)
 
+    async def load_many(self, db: AsyncSession, dept_ids: Sequence[int | None]) -> list[Dept | None]:
+        """
+        通过会话内批量加载器获取多个部门，已删除的部门视为不存在
+
+        :param db: 数据库会话
+        :param dept_ids: 部门 ID 列表
+        :return:
+        """
+        depts = await get_loader(db, self.model).load_many(dept_ids)
+        return [dept if dept and not dept.del_flag else None for dept in depts]
+
+    async def get_existing_ids(self, db: AsyncSession, dept_ids: Sequence[int]) -> set[int]:
+        """
+        批量获取存在的部门 ID
+
+        :param db: 数据库会话
+        :param dept_ids: 部门 ID 列表
+        :return:
+        """
+        result = await db.execute(select(self.model.id).where(self.model.id.in_(dept_ids), self.model.del_flag == 0))
+        return set(result.scalars().all())
+
     async def get_by_name(self, db: AsyncSession, name: str) -> Dept | None:
         """
         通过名称获取部门
@@ -75,7 +101,8 @@ class CRUDDept(CRUDPlus[Dept]):
         :param obj: 创建部门参数
         :return:
         """
-        await self.create_model(db, obj)
+        dept = await self.create_model(db, obj, flush=True)
+        await dept_tree.insert(db, dept.id, dept.parent_id)
 
     async def update(self, db: AsyncSession, dept_id: int, obj: UpdateDeptParam) -> int:
         """
@@ -84,9 +111,18 @@ class CRUDDept(CRUDPlus[Dept]):
         :param db: 数据库会话
         :param dept_id: 部门 ID
         :param obj: 更新部门参数
-        :return:
-        """
-        return await self.update_model(db, dept_id, obj)
+        :return: 更新行数，部门不存在、名称已存在或父级部门不存在时为 0
+        """
+        conditions = [
+            self.model.del_flag == 0,
+            unique_except_self(self.model, dept_id, {'name': obj.name}, lambda d: d.del_flag == 0),
+        ]
+        if obj.parent_id:
+            conditions.append(exists_row(self.model, lambda d: and_(d.id == obj.parent_id, d.del_flag == 0)))
+        count = await conditional_update(db, self.model, dept_id, obj.model_dump(exclude_unset=True), *conditions)
+        if count and 'parent_id' in obj.model_fields_set:
+            await dept_tree.move(db, dept_id, obj.parent_id)
+        return count
 
     async def delete(self, db: AsyncSession, dept_id: int) -> int:
         """
@@ -106,7 +142,7 @@ class CRUDDept(CRUDPlus[Dept]):
         :param dept_id: 部门 ID
         :return:
         """
-        stmt = select(self.model).options(selectinload(self.model.users)).where(self.model.id == dept_id)
+        stmt = lambda_stmt(lambda: select(Dept).options(selectinload(Dept.users)).where(Dept.id == dept_id))
         result = await db.execute(stmt)
         return result.scalars().first()
 
@@ -118,9 +154,51 @@ class CRUDDept(CRUDPlus[Dept]):
         :param dept_id: 部门 ID
         :return:
         """
-        stmt = select(self.model).where(self.model.parent_id == dept_id, self.model.del_flag == 0)
+        stmt = lambda_stmt(lambda: select(Dept).where(Dept.parent_id == dept_id, Dept.del_flag == 0))
+        result = await db.execute(stmt)
+        return result.scalars().all()
+
+    async def get_descendants(
+        self, db: AsyncSession, dept_id: int, *, max_depth: int | None = None, include_self: bool = False
+    ) -> Sequence[Dept]:
+        """
+        获取后代部门列表
+
+        :param db: 数据库会话
+        :param dept_id: 部门 ID
+        :param max_depth: 最大层级距离，为空时不限制
+        :param include_self: 是否包含自身
+        :return:
+        """
+        ids = dept_tree.descendant_ids(dept_id, max_depth=max_depth, include_self=include_self)
+        stmt = select(self.model).where(self.model.id.in_(ids), self.model.del_flag == 0).order_by(self.model.sort)
+        result = await db.execute(stmt)
+        return result.scalars().all()
+
+    async def get_ancestors(self, db: AsyncSession, dept_id: int) -> Sequence[Dept]:
+        """
+        获取祖先部门列表，由近及远排序
+
+        :param db: 数据库会话
+        :param dept_id: 部门 ID
+        :return:
+        """
+        ancestors = dept_tree.ancestors(dept_id).subquery()
+        stmt = select(self.model).join(ancestors, ancestors.c.id == self.model.id).order_by(ancestors.c.depth)
         result = await db.execute(stmt)
         return result.scalars().all()
 
+    async def is_descendant(self, db: AsyncSession, dept_id: int, ancestor_id: int) -> bool:
+        """
+        判断部门是否为另一部门的后代
+
+        :param db: 数据库会话
+        :param dept_id: 部门 ID
+        :param ancestor_id: 祖先部门 ID
+        :return:
+        """
+        return await dept_tree.is_descendant(db, dept_id, ancestor_id)
+
 
+dept_tree: ClosureTree = ClosureTree(Dept, sys_dept_closure)
 dept_dao: CRUDDept = CRUDDept(Dept)
@@ -1,11 +1,12 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-from sqlalchemy import Select
+from sqlalchemy import Select, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy_crud_plus import CRUDPlus
 
 from backend.app.admin.model import LoginLog
 from backend.app.admin.schema.login_log import CreateLoginLogParam
+from backend.utils.timezone import timezone
 
 
 class CRUDLoginLog(CRUDPlus[LoginLog]):
@@ -39,6 +40,17 @@ class CRUDLoginLog(CRUDPlus[LoginLog]):
         """
         await self.create_model(db, obj, commit=True)
 
+    async def bulk_create(self, db: AsyncSession, objs: list[CreateLoginLogParam]) -> None:
+        """
+        批量创建登录日志
+
+        :param db: 数据库会话
+        :param objs: 创建登录日志参数列表
+        :return:
+        """
+        created_time = timezone.now()
+        await db.execute(insert(self.model), [{**obj.model_dump(), 'created_time': created_time} for obj in objs])
+
     async def delete(self, db: AsyncSession, pk: list[int]) -> int:
         """
         删除登录日志
@@ -2,13 +2,17 @@
 # -*- coding: utf-8 -*-
 from typing import Sequence
 
-from sqlalchemy import and_, asc, select
+from sqlalchemy import asc, lambda_stmt, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from sqlalchemy_crud_plus import CRUDPlus
 
 from backend.app.admin.model import Menu
+from backend.app.admin.model.closure import sys_menu_closure
 from backend.app.admin.schema.menu import CreateMenuParam, UpdateMenuParam
+from backend.database.dml import conditional_update, exists_row, unique_except_self
+from backend.database.hierarchy import ClosureTree
+from backend.database.loader import get_loader
 
 
 class CRUDMenu(CRUDPlus[Menu]):
@@ -24,6 +28,16 @@ class CRUDMenu(CRUDPlus[Menu]):
         """
         return await self.select_model(db, menu_id)
 
+    async def load_many(self, db: AsyncSession, menu_ids: Sequence[int | None]) -> list[Menu | None]:
+        """
+        通过会话内批量加载器获取多个菜单
+
+        :param db: 数据库会话
+        :param menu_ids: 菜单 ID 列表
+        :return:
+        """
+        return await get_loader(db, self.model).load_many(menu_ids)
+
     async def get_by_title(self, db: AsyncSession, title: str) -> Menu | None:
         """
         通过标题获取菜单
@@ -59,11 +73,9 @@ class CRUDMenu(CRUDPlus[Menu]):
         :param menu_ids: 菜单 ID 列表
         :return:
         """
-        stmt = select(self.model).order_by(asc(self.model.sort))
-        filters = [self.model.type.in_([0, 1])]
+        stmt = lambda_stmt(lambda: select(Menu).where(Menu.type.in_([0, 1])).order_by(asc(Menu.sort)))
         if not superuser:
-            filters.append(self.model.id.in_(menu_ids))
-        stmt = stmt.where(and_(*filters))
+            stmt += lambda s: s.where(Menu.id.in_(menu_ids))
         menu = await db.execute(stmt)
         return menu.scalars().all()
 
@@ -75,7 +87,8 @@ class CRUDMenu(CRUDPlus[Menu]):
         :param obj: 创建菜单参数
         :return:
         """
-        await self.create_model(db, obj)
+        menu = await self.create_model(db, obj, flush=True)
+        await menu_tree.insert(db, menu.id, menu.parent_id)
 
     async def update(self, db: AsyncSession, menu_id: int, obj: UpdateMenuParam) -> int:
         """
@@ -84,9 +97,15 @@ class CRUDMenu(CRUDPlus[Menu]):
         :param db: 数据库会话
         :param menu_id: 菜单 ID
         :param obj: 更新菜单参数
-        :return:
+        :return: 更新行数，菜单不存在、标题已存在或父级菜单不存在时为 0
         """
-        return await self.update_model(db, menu_id, obj)
+        conditions = [unique_except_self(self.model, menu_id, {'title': obj.title}, lambda m: m.type != 2)]
+        if obj.parent_id:
+            conditions.append(exists_row(self.model, lambda m: m.id == obj.parent_id))
+        count = await conditional_update(db, self.model, menu_id, obj.model_dump(exclude_unset=True), *conditions)
+        if count and 'parent_id' in obj.model_fields_set:
+            await menu_tree.move(db, menu_id, obj.parent_id)
+        return count
 
     async def delete(self, db: AsyncSession, menu_id: int) -> int:
         """
@@ -106,10 +125,52 @@ class CRUDMenu(CRUDPlus[Menu]):
         :param menu_id: 菜单 ID
         :return:
         """
-        stmt = select(self.model).options(selectinload(self.model.children)).where(self.model.id == menu_id)
+        stmt = lambda_stmt(lambda: select(Menu).options(selectinload(Menu.children)).where(Menu.id == menu_id))
         result = await db.execute(stmt)
         menu = result.scalars().first()
         return menu.children
 
+    async def get_descendants(
+        self, db: AsyncSession, menu_id: int, *, max_depth: int | None = None, include_self: bool = False
+    ) -> Sequence[Menu]:
+        """
+        获取后代菜单列表
+
+        :param db: 数据库会话
+        :param menu_id: 菜单 ID
+        :param max_depth: 最大层级距离，为空时不限制
+        :param include_self: 是否包含自身
+        :return:
+        """
+        ids = menu_tree.descendant_ids(menu_id, max_depth=max_depth, include_self=include_self)
+        stmt = select(self.model).where(self.model.id.in_(ids)).order_by(self.model.sort)
+        result = await db.execute(stmt)
+        return result.scalars().all()
+
+    async def get_ancestors(self, db: AsyncSession, menu_id: int) -> Sequence[Menu]:
+        """
+        获取祖先菜单列表，由近及远排序
+
+        :param db: 数据库会话
+        :param menu_id: 菜单 ID
+        :return:
+        """
+        ancestors = menu_tree.ancestors(menu_id).subquery()
+        stmt = select(self.model).join(ancestors, ancestors.c.id == self.model.id).order_by(ancestors.c.depth)
+        result = await db.execute(stmt)
+        return result.scalars().all()
+
+    async def is_descendant(self, db: AsyncSession, menu_id: int, ancestor_id: int) -> bool:
+        """
+        判断菜单是否为另一菜单的后代
+
+        :param db: 数据库会话
+        :param menu_id: 菜单 ID
+        :param ancestor_id: 祖先菜单 ID
+        :return:
+        """
+        return await menu_tree.is_descendant(db, menu_id, ancestor_id)
+
 
+menu_tree: ClosureTree = ClosureTree(Menu, sys_menu_closure)
 menu_dao: CRUDMenu = CRUDMenu(Menu)
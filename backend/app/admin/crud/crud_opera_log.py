@@ -6,6 +6,8 @@ from sqlalchemy_crud_plus import CRUDPlus
 
 from backend.app.admin.model import OperaLog
 from backend.app.admin.schema.opera_log import CreateOperaLogParam
+from backend.core.conf import settings
+from backend.utils.compress import opera_log_args_codec
 
 
 class CRUDOperaLogDao(CRUDPlus[OperaLog]):
@@ -37,7 +39,10 @@ class CRUDOperaLogDao(CRUDPlus[OperaLog]):
         :param obj: 创建操作日志参数
         :return:
         """
-        await self.create_model(db, obj)
+        dict_obj = obj.model_dump()
+        if settings.OPERA_LOG_ARGS_COMPRESS:
+            dict_obj['args'], dict_obj['args_compressed'] = opera_log_args_codec.pack(dict_obj['args'])
+        db.add(self.model(**dict_obj))
 
     async def delete(self, db: AsyncSession, pk: list[int]) -> int:
         """
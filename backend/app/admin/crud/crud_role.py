@@ -2,18 +2,21 @@
 # -*- coding: utf-8 -*-
 from typing import Sequence
 
-from sqlalchemy import Select, and_, desc, select
+from sqlalchemy import Select, and_, desc, lambda_stmt, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import noload, selectinload
 from sqlalchemy_crud_plus import CRUDPlus
 
-from backend.app.admin.model import DataScope, Menu, Role, User
+from backend.app.admin.model import Role, User
+from backend.app.admin.model.m2m import sys_role_data_scope, sys_role_menu
 from backend.app.admin.schema.role import (
     CreateRoleParam,
     UpdateRoleMenuParam,
     UpdateRoleParam,
     UpdateRoleScopeParam,
 )
+from backend.database.dml import conditional_update, unique_except_self
+from backend.database.relation import sync_association
 
 
 class CRUDRole(CRUDPlus[Role]):
@@ -29,6 +32,17 @@ class CRUDRole(CRUDPlus[Role]):
         """
         return await self.select_model(db, role_id)
 
+    async def get_existing_ids(self, db: AsyncSession, role_ids: Sequence[int]) -> set[int]:
+        """
+        批量获取存在的角色 ID
+
+        :param db: 数据库会话
+        :param role_ids: 角色 ID 列表
+        :return:
+        """
+        result = await db.execute(select(self.model.id).where(self.model.id.in_(role_ids)))
+        return set(result.scalars().all())
+
     async def get_with_relation(self, db: AsyncSession, role_id: int) -> Role | None:
         """
         获取角色及关联数据
@@ -37,10 +51,8 @@ class CRUDRole(CRUDPlus[Role]):
         :param role_id: 角色 ID
         :return:
         """
-        stmt = (
-            select(self.model)
-            .options(selectinload(self.model.menus), selectinload(self.model.scopes))
-            .where(self.model.id == role_id)
+        stmt = lambda_stmt(
+            lambda: select(Role).options(selectinload(Role.menus), selectinload(Role.scopes)).where(Role.id == role_id)
         )
         role = await db.execute(stmt)
         return role.scalars().first()
@@ -62,7 +74,7 @@ class CRUDRole(CRUDPlus[Role]):
         :param user_id: 用户 ID
         :return:
         """
-        stmt = select(self.model).join(self.model.users).where(User.id == user_id)
+        stmt = lambda_stmt(lambda: select(Role).join(Role.users).where(User.id == user_id))
         roles = await db.execute(stmt)
         return roles.scalars().all()
 
@@ -118,9 +130,15 @@ class CRUDRole(CRUDPlus[Role]):
         :param db: 数据库会话
         :param role_id: 角色 ID
         :param obj: 更新角色参数
-        :return:
-        """
-        return await self.update_model(db, role_id, obj)
+        :return: 更新行数，角色不存在或名称已存在时为 0
+        """
+        return await conditional_update(
+            db,
+            self.model,
+            role_id,
+            obj.model_dump(exclude_unset=True),
+            unique_except_self(self.model, role_id, {'name': obj.name}),
+        )
 
     async def update_menus(self, db: AsyncSession, role_id: int, menu_ids: UpdateRoleMenuParam) -> int:
         """
@@ -131,11 +149,8 @@ class CRUDRole(CRUDPlus[Role]):
         :param menu_ids: 菜单 ID 列表
         :return:
         """
-        current_role = await self.get_with_relation(db, role_id)
-        stmt = select(Menu).where(Menu.id.in_(menu_ids.menus))
-        menus = await db.execute(stmt)
-        current_role.menus = menus.scalars().all()
-        return len(current_role.menus)
+        await sync_association(db, sys_role_menu, 'role_id', role_id, 'menu_id', menu_ids.menus)
+        return len(set(menu_ids.menus))
 
     async def update_scopes(self, db: AsyncSession, role_id: int, scope_ids: UpdateRoleScopeParam) -> int:
         """
@@ -146,11 +161,8 @@ class CRUDRole(CRUDPlus[Role]):
         :param scope_ids: 权限范围 ID 列表
         :return:
         """
-        current_role = await self.get_with_relation(db, role_id)
-        stmt = select(DataScope).where(DataScope.id.in_(scope_ids.scopes))
-        scopes = await db.execute(stmt)
-        current_role.scopes = scopes.scalars().all()
-        return len(current_role.scopes)
+        await sync_association(db, sys_role_data_scope, 'role_id', role_id, 'data_scope_id', scope_ids.scopes)
+        return len(set(scope_ids.scopes))
 
     async def delete(self, db: AsyncSession, role_id: list[int]) -> int:
         """
@@ -1,14 +1,17 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+from typing import Any, Iterable, Sequence
+
 import bcrypt
 
-from sqlalchemy import and_, desc, select
+from sqlalchemy import and_, desc, insert, lambda_stmt, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import noload, selectinload
 from sqlalchemy.sql import Select
 from sqlalchemy_crud_plus import CRUDPlus
 
 from backend.app.admin.model import Dept, Role, User
+from backend.app.admin.model.m2m import sys_role_data_scope, sys_role_menu, sys_user_role
 from backend.app.admin.schema.user import (
     AddUserParam,
     AvatarParam,
@@ -17,9 +20,41 @@ from backend.app.admin.schema.user import (
     UpdateUserRoleParam,
 )
 from backend.common.security.jwt import get_hash_password
+from backend.common.sparse_fields import FieldSet
+from backend.database.dml import toggle, update_returning
+from backend.database.relation import sync_association
 from backend.utils.timezone import timezone
 
 
+def _build_user_list_stmt(dept: bool, roles: bool) -> Select:
+    """
+    构建用户列表基础查询
+
+    :param dept: 是否加载部门
+    :param roles: 是否加载角色
+    :return:
+    """
+    return (
+        select(User)
+        .options(
+            selectinload(User.dept).options(noload(Dept.parent), noload(Dept.children), noload(Dept.users))
+            if dept
+            else noload(User.dept),
+            noload(User.socials),
+            selectinload(User.roles).options(noload(Role.users), noload(Role.menus), noload(Role.scopes))
+            if roles
+            else noload(User.roles),
+        )
+        .order_by(desc(User.join_time))
+    )
+
+
+# 用户列表基础查询，按是否加载部门和角色预先构建，以避免每次请求重复构建加载选项
+_user_list_stmts = {
+    (dept, roles): _build_user_list_stmt(dept, roles) for dept in (True, False) for roles in (True, False)
+}
+
+
 class CRUDUser(CRUDPlus[User]):
     """用户数据库操作类"""
 
@@ -96,13 +131,43 @@ class CRUDUser(CRUDPlus[User]):
         dict_obj = obj.model_dump(exclude={'roles'})
         dict_obj.update({'salt': salt})
         new_user = self.model(**dict_obj)
+        db.add(new_user)
+        await db.flush()
+        await sync_association(db, sys_user_role, 'user_id', new_user.id, 'role_id', obj.roles)
 
-        role_list = []
-        for role_id in obj.roles:
-            role_list.append(await db.get(Role, role_id))
-        new_user.roles.extend(role_list)
+    async def get_existing(self, db: AsyncSession, column: str, values: Sequence[str]) -> set[str]:
+        """
+        批量获取已存在的列值
 
-        db.add(new_user)
+        :param db: 数据库会话
+        :param column: 列名
+        :param values: 待检查的值
+        :return:
+        """
+        col = getattr(self.model, column)
+        existing = set()
+        # 分批查询，避免 IN 列表过长
+        for i in range(0, len(values), 1000):
+            result = await db.execute(select(col).where(col.in_(values[i : i + 1000])))
+            existing.update(result.scalars().all())
+        return existing
+
+    async def bulk_add(self, db: AsyncSession, users: list[dict[str, Any]], roles: dict[str, list[int]]) -> None:
+        """
+        批量添加用户，使用多行插入写入用户及用户角色关联
+
+        :param db: 数据库会话
+        :param users: 用户数据，需包含所有列的值
+        :param roles: 用户名与角色 ID 列表的映射
+        :return:
+        """
+        await db.execute(insert(self.model), users)
+        result = await db.execute(select(self.model.id, self.model.username).where(self.model.username.in_(roles)))
+        user_roles = [
+            {'user_id': pk, 'role_id': role_id} for pk, username in result.all() for role_id in roles[username]
+        ]
+        if user_roles:
+            await db.execute(insert(sys_user_role), user_roles)
 
     async def update_userinfo(self, db: AsyncSession, input_user: int, obj: UpdateUserParam) -> int:
         """
@@ -116,22 +181,16 @@ class CRUDUser(CRUDPlus[User]):
         return await self.update_model(db, input_user, obj)
 
     @staticmethod
-    async def update_role(db: AsyncSession, input_user: User, obj: UpdateUserRoleParam) -> None:
+    async def update_role(db: AsyncSession, input_user: int, obj: UpdateUserRoleParam) -> None:
         """
         更新用户角色
 
         :param db: 数据库会话
-        :param input_user: 用户对象
+        :param input_user: 用户 ID
         :param obj: 更新角色参数
         :return:
         """
-        for i in list(input_user.roles):
-            input_user.roles.remove(i)
-
-        role_list = []
-        for role_id in obj.roles:
-            role_list.append(await db.get(Role, role_id))
-        input_user.roles.extend(role_list)
+        await sync_association(db, sys_user_role, 'user_id', input_user, 'role_id', obj.roles)
 
     async def update_avatar(self, db: AsyncSession, input_user: int, avatar: AvatarParam) -> int:
         """
@@ -175,7 +234,14 @@ class CRUDUser(CRUDPlus[User]):
         """
         return await self.update_model(db, pk, {'password': new_pwd})
 
-    async def get_list(self, dept: int | None, username: str | None, phone: str | None, status: int | None) -> Select:
+    async def get_list(
+        self,
+        dept: int | None,
+        username: str | None,
+        phone: str | None,
+        status: int | None,
+        fields: FieldSet | None = None,
+    ) -> Select:
         """
         获取用户列表
 
@@ -183,17 +249,13 @@ class CRUDUser(CRUDPlus[User]):
         :param username: 用户名
         :param phone: 电话号码
         :param status: 用户状态
+        :param fields: 稀疏字段集，未请求的部门和角色不加载
         :return:
         """
-        stmt = (
-            select(self.model)
-            .options(
-                selectinload(self.model.dept).options(noload(Dept.parent), noload(Dept.children), noload(Dept.users)),
-                noload(self.model.socials),
-                selectinload(self.model.roles).options(noload(Role.users), noload(Role.menus), noload(Role.rules)),
-            )
-            .order_by(desc(self.model.join_time))
-        )
+        if fields is None:
+            stmt = _user_list_stmts[(True, True)]
+        else:
+            stmt = fields.project(_user_list_stmts[('dept' in fields, 'roles' in fields)])
 
         filters = []
         if dept:
@@ -210,93 +272,122 @@ class CRUDUser(CRUDPlus[User]):
 
         return stmt
 
-    async def get_super(self, db: AsyncSession, user_id: int) -> bool:
-        """
-        获取用户是否为超级管理员
-
-        :param db: 数据库会话
-        :param user_id: 用户 ID
-        :return:
-        """
-        user = await self.get(db, user_id)
-        return user.is_superuser
-
-    async def get_staff(self, db: AsyncSession, user_id: int) -> bool:
+    async def toggle_super(self, db: AsyncSession, user_id: int) -> bool | None:
         """
-        获取用户是否可以登录后台
+        切换用户超级管理员状态，单条语句完成读取与写入
 
         :param db: 数据库会话
         :param user_id: 用户 ID
-        :return:
-        """
-        user = await self.get(db, user_id)
-        return user.is_staff
+        :return: 切换后的状态，用户不存在时返回 None
+        """
+        row = await update_returning(
+            db,
+            self.model,
+            user_id,
+            {'is_superuser': toggle(self.model.is_superuser)},
+            returning=[self.model.is_superuser],
+        )
+        return bool(row[0]) if row else None
 
-    async def get_status(self, db: AsyncSession, user_id: int) -> int:
+    async def toggle_staff(self, db: AsyncSession, user_id: int) -> bool | None:
         """
-        获取用户状态
+        切换用户后台登录状态，单条语句完成读取与写入
 
         :param db: 数据库会话
         :param user_id: 用户 ID
-        :return:
-        """
-        user = await self.get(db, user_id)
-        return user.status
+        :return: 切换后的状态，用户不存在时返回 None
+        """
+        row = await update_returning(
+            db,
+            self.model,
+            user_id,
+            {'is_staff': toggle(self.model.is_staff)},
+            returning=[self.model.is_staff],
+        )
+        return bool(row[0]) if row else None
 
-    async def get_multi_login(self, db: AsyncSession, user_id: int) -> bool:
+    async def toggle_status(self, db: AsyncSession, user_id: int) -> int | None:
         """
-        获取用户是否允许多端登录
+        切换用户状态，单条语句完成读取与写入
 
         :param db: 数据库会话
         :param user_id: 用户 ID
-        :return:
-        """
-        user = await self.get(db, user_id)
-        return user.is_multi_login
+        :return: 切换后的状态，用户不存在时返回 None
+        """
+        row = await update_returning(
+            db,
+            self.model,
+            user_id,
+            {'status': toggle(self.model.status, 1, 0)},
+            returning=[self.model.status],
+        )
+        return row[0] if row else None
 
-    async def set_super(self, db: AsyncSession, user_id: int, is_super: bool) -> int:
+    async def toggle_multi_login(self, db: AsyncSession, user_id: int) -> bool | None:
         """
-        设置用户超级管理员状态
+        切换用户多端登录状态，单条语句完成读取与写入
 
         :param db: 数据库会话
         :param user_id: 用户 ID
-        :param is_super: 是否超级管理员
-        :return:
-        """
-        return await self.update_model(db, user_id, {'is_superuser': is_super})
+        :return: 切换后的状态，用户不存在时返回 None
+        """
+        row = await update_returning(
+            db,
+            self.model,
+            user_id,
+            {'is_multi_login': toggle(self.model.is_multi_login)},
+            returning=[self.model.is_multi_login],
+        )
+        return bool(row[0]) if row else None
 
-    async def set_staff(self, db: AsyncSession, user_id: int, is_staff: bool) -> int:
+    async def get_ids_by_role(self, db: AsyncSession, role_id: int) -> Sequence[int]:
         """
-        设置用户后台登录状态
+        获取角色下的用户 ID
 
         :param db: 数据库会话
-        :param user_id: 用户 ID
-        :param is_staff: 是否可登录后台
+        :param role_id: 角色 ID
         :return:
         """
-        return await self.update_model(db, user_id, {'is_staff': is_staff})
+        stmt = select(sys_user_role.c.user_id).where(sys_user_role.c.role_id == role_id)
+        result = await db.execute(stmt)
+        return result.scalars().all()
 
-    async def set_status(self, db: AsyncSession, user_id: int, status: int) -> int:
+    async def get_ids_by_scopes(self, db: AsyncSession, scope_ids: Iterable[int]) -> Sequence[int]:
         """
-        设置用户状态
+        获取拥有数据范围的角色下的用户 ID
 
         :param db: 数据库会话
-        :param user_id: 用户 ID
-        :param status: 状态
+        :param scope_ids: 数据范围 ID 列表
         :return:
         """
-        return await self.update_model(db, user_id, {'status': status})
+        scope_ids = set(scope_ids)
+        if not scope_ids:
+            return []
+        stmt = (
+            select(sys_user_role.c.user_id)
+            .join(sys_role_data_scope, sys_role_data_scope.c.role_id == sys_user_role.c.role_id)
+            .where(sys_role_data_scope.c.data_scope_id.in_(scope_ids))
+            .distinct()
+        )
+        result = await db.execute(stmt)
+        return result.scalars().all()
 
-    async def set_multi_login(self, db: AsyncSession, user_id: int, multi_login: bool) -> int:
+    async def get_ids_by_menu(self, db: AsyncSession, menu_id: int) -> Sequence[int]:
         """
-        设置用户多端登录状态
+        获取拥有菜单的角色下的用户 ID
 
         :param db: 数据库会话
-        :param user_id: 用户 ID
-        :param multi_login: 是否允许多端登录
+        :param menu_id: 菜单 ID
         :return:
         """
-        return await self.update_model(db, user_id, {'is_multi_login': multi_login})
+        stmt = (
+            select(sys_user_role.c.user_id)
+            .join(sys_role_menu, sys_role_menu.c.role_id == sys_user_role.c.role_id)
+            .where(sys_role_menu.c.menu_id == menu_id)
+            .distinct()
+        )
+        result = await db.execute(stmt)
+        return result.scalars().all()
 
     async def get_with_relation(
         self, db: AsyncSession, *, user_id: int | None = None, username: str | None = None
@@ -309,19 +400,16 @@ class CRUDUser(CRUDPlus[User]):
         :param username: 用户名
         :return:
         """
-        stmt = select(self.model).options(
-            selectinload(self.model.dept),
-            selectinload(self.model.roles).options(selectinload(Role.menus), selectinload(Role.scopes)),
+        stmt = lambda_stmt(
+            lambda: select(User).options(
+                selectinload(User.dept),
+                selectinload(User.roles).options(selectinload(Role.menus), selectinload(Role.scopes)),
+            )
         )
-
-        filters = []
         if user_id:
-            filters.append(self.model.id == user_id)
+            stmt += lambda s: s.where(User.id == user_id)
         if username:
-            filters.append(self.model.username == username)
-
-        if filters:
-            stmt = stmt.where(and_(*filters))
+            stmt += lambda s: s.where(User.username == username)
 
         user = await db.execute(stmt)
         return user.scalars().first()
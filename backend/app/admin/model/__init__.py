@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+from backend.app.admin.model.closure import sys_dept_closure, sys_menu_closure
 from backend.app.admin.model.data_rule import DataRule
 from backend.app.admin.model.data_scope import DataScope
 from backend.app.admin.model.dept import Dept
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from sqlalchemy import Column, ForeignKey, Index, Integer, Table
+
+from backend.common.model import MappedBase
+
+sys_dept_closure = Table(
+    'sys_dept_closure',
+    MappedBase.metadata,
+    Column(
+        'ancestor_id', Integer, ForeignKey('sys_dept.id', ondelete='CASCADE'), primary_key=True, comment='祖先部门ID'
+    ),
+    Column(
+        'descendant_id', Integer, ForeignKey('sys_dept.id', ondelete='CASCADE'), primary_key=True, comment='后代部门ID'
+    ),
+    Column('depth', Integer, nullable=False, comment='层级距离（0为自身）'),
+    Index('ix_sys_dept_closure_descendant_id', 'descendant_id', 'depth'),
+)
+
+sys_menu_closure = Table(
+    'sys_menu_closure',
+    MappedBase.metadata,
+    Column(
+        'ancestor_id', Integer, ForeignKey('sys_menu.id', ondelete='CASCADE'), primary_key=True, comment='祖先菜单ID'
+    ),
+    Column(
+        'descendant_id', Integer, ForeignKey('sys_menu.id', ondelete='CASCADE'), primary_key=True, comment='后代菜单ID'
+    ),
+    Column('depth', Integer, nullable=False, comment='层级距离（0为自身）'),
+    Index('ix_sys_menu_closure_descendant_id', 'descendant_id', 'depth'),
+)
@@ -31,5 +31,5 @@ class LoginLog(DataClassBase):
     msg: Mapped[str] = mapped_column(LONGTEXT().with_variant(TEXT, 'postgresql'), comment='提示消息')
     login_time: Mapped[datetime] = mapped_column(DateTime(timezone=True), comment='登录时间')
     created_time: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), init=False, default_factory=timezone.now, comment='创建时间'
+        DateTime(timezone=True), init=False, default_factory=timezone.now, index=True, comment='创建时间'
     )
@@ -2,12 +2,14 @@
 # -*- coding: utf-8 -*-
 from datetime import datetime
 
-from sqlalchemy import DateTime, String
-from sqlalchemy.dialects.mysql import JSON, LONGTEXT
-from sqlalchemy.dialects.postgresql import TEXT
+from sqlalchemy import DateTime, String, event
+from sqlalchemy.dialects.mysql import JSON, LONGBLOB, LONGTEXT
+from sqlalchemy.dialects.postgresql import BYTEA, TEXT
 from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.orm.attributes import set_committed_value
 
 from backend.common.model import DataClassBase, id_key
+from backend.utils.compress import opera_log_args_codec
 from backend.utils.timezone import timezone
 
 
@@ -15,6 +17,8 @@ class OperaLog(DataClassBase):
     """操作日志表"""
 
     __tablename__ = 'sys_opera_log'
+    # 稀疏字段集依赖，超过阈值的请求参数压缩存储在 args_compressed 中，由加载事件解压
+    __sparse_dependencies__ = {'args': ('args_compressed',)}
 
     id: Mapped[id_key] = mapped_column(init=False)
     trace_id: Mapped[str] = mapped_column(String(32), comment='请求跟踪 ID')
@@ -36,6 +40,17 @@ class OperaLog(DataClassBase):
     msg: Mapped[str | None] = mapped_column(LONGTEXT().with_variant(TEXT, 'postgresql'), comment='提示消息')
     cost_time: Mapped[float] = mapped_column(insert_default=0.0, comment='请求耗时（ms）')
     opera_time: Mapped[datetime] = mapped_column(DateTime(timezone=True), comment='操作时间')
+    args_compressed: Mapped[bytes | None] = mapped_column(
+        LONGBLOB().with_variant(BYTEA, 'postgresql'), default=None, comment='请求参数（zstd 压缩）'
+    )
     created_time: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), init=False, default_factory=timezone.now, comment='创建时间'
+        DateTime(timezone=True), init=False, default_factory=timezone.now, index=True, comment='创建时间'
     )
+
+
+@event.listens_for(OperaLog, 'load')
+def unpack_opera_log_args(target: OperaLog, context) -> None:
+    """加载时透明解压请求参数"""
+    args_compressed = target.__dict__.get('args_compressed')
+    if args_compressed:
+        set_committed_value(target, 'args', opera_log_args_codec.unpack(args_compressed))
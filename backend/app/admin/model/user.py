@@ -43,7 +43,7 @@ class User(Base):
     avatar: Mapped[str | None] = mapped_column(String(255), default=None, comment='头像')
     phone: Mapped[str | None] = mapped_column(String(11), default=None, comment='手机号')
     join_time: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), init=False, default_factory=timezone.now, comment='注册时间'
+        DateTime(timezone=True), init=False, default_factory=timezone.now, index=True, comment='注册时间'
     )
     last_login_time: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True), init=False, onupdate=timezone.now, comment='上次登录'
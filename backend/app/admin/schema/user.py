@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import re
+
 from datetime import datetime
 from typing import Any
 
-from pydantic import ConfigDict, EmailStr, Field, HttpUrl, model_validator
+from pydantic import ConfigDict, EmailStr, Field, HttpUrl, field_validator, model_validator
 from typing_extensions import Self
 
 from backend.app.admin.schema.dept import GetDeptDetail
@@ -41,6 +43,39 @@ class AddUserParam(AuthSchemaBase):
     email: EmailStr = Field(examples=['user@example.com'], description='邮箱')
 
 
+class ImportUserParam(AddUserParam):
+    """导入用户参数"""
+
+    password: str = Field(description='密码')
+    phone: CustomPhoneNumber | None = Field(None, description='手机号')
+
+    @field_validator('roles', mode='before')
+    @classmethod
+    def split_roles(cls, v: Any) -> Any:
+        """CSV 中的角色 ID 以 , | ; 或空格分隔"""
+        if isinstance(v, str):
+            return [i for i in re.split(r'[,|;\s]+', v) if i]
+        return v
+
+
+class ImportUserError(SchemaBase):
+    """导入用户错误"""
+
+    row: int = Field(description='行号')
+    username: str | None = Field(None, description='用户名')
+    msg: str = Field(description='错误信息')
+
+
+class ImportUserResult(SchemaBase):
+    """导入用户结果"""
+
+    total: int = Field(description='总行数')
+    success: int = Field(0, description='成功数')
+    failed: int = Field(0, description='失败数')
+    errors: list[ImportUserError] = Field([], description='错误报告')
+    task_id: str | None = Field(None, description='后台任务 ID，后台导入时返回，结果通过任务详情获取')
+
+
 class ResetPasswordParam(SchemaBase):
     """重置密码参数"""
 
@@ -128,7 +128,6 @@ class AuthService:
                 task = BackgroundTask(
                     login_log_service.create,
                     **dict(
-                        db=db,
                         request=request,
                         user_uuid=user.uuid if user else uuid4_str(),
                         username=obj.username,
@@ -145,7 +144,6 @@ class AuthService:
                 background_tasks.add_task(
                     login_log_service.create,
                     **dict(
-                        db=db,
                         request=request,
                         user_uuid=user.uuid,
                         username=obj.username,
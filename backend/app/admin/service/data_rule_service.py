@@ -5,11 +5,13 @@ from typing import Sequence
 from sqlalchemy import Select
 
 from backend.app.admin.crud.crud_data_rule import data_rule_dao
+from backend.app.admin.crud.crud_user import user_dao
 from backend.app.admin.model import DataRule
 from backend.app.admin.schema.data_rule import CreateDataRuleParam, GetDataRuleColumnDetail, UpdateDataRuleParam
 from backend.common.exception import errors
 from backend.core.conf import settings
 from backend.database.db import async_db_session
+from backend.database.redis import redis_client
 from backend.utils.import_parse import dynamic_import_data_model
 
 
@@ -84,6 +86,7 @@ class DataRuleService:
             if data_rule:
                 raise errors.ForbiddenError(msg='数据规则已存在')
             await data_rule_dao.create(db, obj)
+        await redis_client.bump_generation('data_rule')
 
     @staticmethod
     async def update(*, pk: int, obj: UpdateDataRuleParam) -> int:
@@ -102,7 +105,12 @@ class DataRuleService:
                 if await data_rule_dao.get_by_name(db, obj.name):
                     raise errors.ForbiddenError(msg='数据规则已存在')
             count = await data_rule_dao.update(db, pk, obj)
-            return count
+            scope_ids = await data_rule_dao.get_scope_ids(db, [pk])
+            user_ids = await user_dao.get_ids_by_scopes(db, scope_ids)
+        for user_id in user_ids:
+            await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{user_id}')
+        await redis_client.bump_generation('data_rule')
+        return count
 
     @staticmethod
     async def delete(*, pk: list[int]) -> int:
@@ -113,8 +121,13 @@ class DataRuleService:
         :return:
         """
         async with async_db_session.begin() as db:
+            scope_ids = await data_rule_dao.get_scope_ids(db, pk)
             count = await data_rule_dao.delete(db, pk)
-            return count
+            user_ids = await user_dao.get_ids_by_scopes(db, scope_ids)
+        for user_id in user_ids:
+            await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{user_id}')
+        await redis_client.bump_generation('data_rule')
+        return count
 
 
 data_rule_service: DataRuleService = DataRuleService()
@@ -2,13 +2,16 @@
 # -*- coding: utf-8 -*-
 from sqlalchemy import Select
 
+from backend.app.admin.crud.crud_data_rule import data_rule_dao
 from backend.app.admin.crud.crud_data_scope import data_scope_dao
-from backend.app.admin.model import DataScope
+from backend.app.admin.crud.crud_user import user_dao
+from backend.app.admin.model import DataRule, DataScope
 from backend.app.admin.schema.data_scope import CreateDataScopeParam, UpdateDataScopeParam, UpdateDataScopeRuleParam
 from backend.common.exception import errors
 from backend.core.conf import settings
 from backend.database.db import async_db_session
 from backend.database.redis import redis_client
+from backend.database.relation import get_missing_ids
 
 
 class DataScopeService:
@@ -66,6 +69,7 @@ class DataScopeService:
             if data_scope:
                 raise errors.ForbiddenError(msg='数据范围已存在')
             await data_scope_dao.create(db, obj)
+        await redis_client.bump_generation('data_scope')
 
     @staticmethod
     async def update(*, pk: int, obj: UpdateDataScopeParam) -> int:
@@ -87,7 +91,8 @@ class DataScopeService:
             for role in await data_scope.awaitable_attrs.roles:
                 for user in await role.awaitable_attrs.users:
                     await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{user.id}')
-            return count
+        await redis_client.bump_generation('data_scope')
+        return count
 
     @staticmethod
     async def update_data_scope_rule(*, pk: int, rule_ids: UpdateDataScopeRuleParam) -> int:
@@ -99,8 +104,19 @@ class DataScopeService:
         :return:
         """
         async with async_db_session.begin() as db:
+            data_scope = await data_scope_dao.get(db, pk)
+            if not data_scope:
+                raise errors.NotFoundError(msg='数据范围不存在')
+            if await get_missing_ids(db, DataRule.id, rule_ids.rules):
+                raise errors.NotFoundError(msg='数据规则不存在')
+            # 规则可能从其他数据范围移入，原数据范围的用户缓存同样需要清除
+            scope_ids = {pk, *await data_rule_dao.get_scope_ids(db, rule_ids.rules)}
             count = await data_scope_dao.update_rules(db, pk, rule_ids)
-            return count
+            user_ids = await user_dao.get_ids_by_scopes(db, scope_ids)
+        for user_id in user_ids:
+            await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{user_id}')
+        await redis_client.bump_generation('data_scope')
+        return count
 
     @staticmethod
     async def delete(*, pk: list[int]) -> int:
@@ -118,7 +134,8 @@ class DataScopeService:
                     for role in await data_rule.awaitable_attrs.roles:
                         for user in await role.awaitable_attrs.users:
                             await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{user.id}')
-            return count
+        await redis_client.bump_generation('data_scope')
+        return count
 
 
 data_scope_service: DataScopeService = DataScopeService()
@@ -67,6 +67,7 @@ class DeptService:
                 if not parent_dept:
                     raise errors.NotFoundError(msg='父级部门不存在')
             await dept_dao.create(db, obj)
+        await redis_client.bump_generation('dept')
 
     @staticmethod
     async def update(*, pk: int, obj: UpdateDeptParam) -> int:
@@ -77,21 +78,22 @@ class DeptService:
         :param obj: 部门更新参数
         :return:
         """
+        if obj.parent_id == pk:
+            raise errors.ForbiddenError(msg='禁止关联自身为父级')
         async with async_db_session.begin() as db:
-            dept = await dept_dao.get(db, pk)
-            if not dept:
-                raise errors.NotFoundError(msg='部门不存在')
-            if dept.name != obj.name:
-                if await dept_dao.get_by_name(db, obj.name):
-                    raise errors.ForbiddenError(msg='部门名称已存在')
-            if obj.parent_id:
-                parent_dept = await dept_dao.get(db, obj.parent_id)
-                if not parent_dept:
-                    raise errors.NotFoundError(msg='父级部门不存在')
-            if obj.parent_id == dept.id:
-                raise errors.ForbiddenError(msg='禁止关联自身为父级')
+            if obj.parent_id and await dept_dao.is_descendant(db, obj.parent_id, pk):
+                raise errors.ForbiddenError(msg='禁止关联子级为父级')
             count = await dept_dao.update(db, pk, obj)
-            return count
+            if not count:
+                # 条件更新未命中时再查明原因
+                dept, parent_dept = await dept_dao.load_many(db, [pk, obj.parent_id])
+                if not dept:
+                    raise errors.NotFoundError(msg='部门不存在')
+                if obj.parent_id and not parent_dept:
+                    raise errors.NotFoundError(msg='父级部门不存在')
+                raise errors.ForbiddenError(msg='部门名称已存在')
+        await redis_client.bump_generation('dept')
+        return count
 
     @staticmethod
     async def delete(*, pk: int) -> int:
@@ -111,7 +113,8 @@ class DeptService:
             count = await dept_dao.delete(db, pk)
             for user in dept.users:
                 await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{user.id}')
-            return count
+        await redis_client.bump_generation('dept')
+        return count
 
 
 dept_service: DeptService = DeptService()
@@ -1,15 +1,22 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 from datetime import datetime
+from typing import AsyncGenerator
 
 from fastapi import Request
+from pydantic import ValidationError
+from redis.exceptions import RedisError
 from sqlalchemy import Select
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.app.admin.crud.crud_login_log import login_log_dao
-from backend.app.admin.schema.login_log import CreateLoginLogParam
+from backend.app.admin.schema.login_log import CreateLoginLogParam, GetLoginLogDetail
+from backend.common.enums import ExportFormatType
 from backend.common.log import log
+from backend.core.conf import settings
 from backend.database.db import async_db_session
+from backend.database.redis import redis_client
+from backend.utils.export import stream_export
+from backend.utils.stream import RedisStreamConsumer
 
 
 class LoginLogService:
@@ -27,10 +34,27 @@ class LoginLogService:
         """
         return await login_log_dao.get_list(username=username, status=status, ip=ip)
 
+    @staticmethod
+    async def export(
+        *, username: str | None, status: int | None, ip: str | None, fmt: ExportFormatType
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        流式导出登录日志
+
+        :param username: 用户名
+        :param status: 状态
+        :param ip: IP 地址
+        :param fmt: 导出格式
+        :return:
+        """
+        stmt = await login_log_dao.get_list(username=username, status=status, ip=ip)
+        async with async_db_session(info={'reporting': True}) as db:
+            async for chunk in stream_export(db, stmt, list(GetLoginLogDetail.model_fields), fmt):
+                yield chunk
+
     @staticmethod
     async def create(
         *,
-        db: AsyncSession,
         request: Request,
         user_uuid: str,
         username: str,
@@ -41,7 +65,6 @@ class LoginLogService:
         """
         创建登录日志
 
-        :param db: 数据库会话
         :param request: FastAPI 请求对象
         :param user_uuid: 用户 UUID
         :param username: 用户名
@@ -66,10 +89,39 @@ class LoginLogService:
                 msg=msg,
                 login_time=login_time,
             )
-            await login_log_dao.create(db, obj)
+            if settings.LOGIN_LOG_STREAM:
+                try:
+                    await redis_client.xadd(
+                        settings.LOGIN_LOG_STREAM_REDIS_KEY,
+                        {'data': obj.model_dump_json()},
+                        maxlen=settings.LOGIN_LOG_STREAM_MAXLEN,
+                    )
+                    return
+                except RedisError as e:
+                    log.warning(f'登录日志写入 Redis Stream 失败，直接入库: {e}')
+            async with async_db_session.begin() as db:
+                await login_log_dao.create(db, obj)
         except Exception as e:
             log.error(f'登录日志创建失败: {e}')
 
+    @staticmethod
+    async def bulk_create(data: list[str]) -> None:
+        """
+        批量创建登录日志，Redis Stream 消费者组的批处理函数
+
+        :param data: 登录日志 JSON 列表
+        :return:
+        """
+        objs = []
+        for item in data:
+            try:
+                objs.append(CreateLoginLogParam.model_validate_json(item))
+            except ValidationError as e:
+                log.error(f'登录日志解析失败，已丢弃: {e}')
+        if objs:
+            async with async_db_session.begin() as db:
+                await login_log_dao.bulk_create(db, objs)
+
     @staticmethod
     async def delete(*, pk: list[int]) -> int:
         """
@@ -91,3 +143,14 @@ class LoginLogService:
 
 
 login_log_service: LoginLogService = LoginLogService()
+
+# 登录日志 Redis Stream 消费者组
+login_log_stream_consumer: RedisStreamConsumer = RedisStreamConsumer(
+    settings.LOGIN_LOG_STREAM_REDIS_KEY,
+    settings.LOGIN_LOG_STREAM_GROUP,
+    login_log_service.bulk_create,
+    batch_size=settings.LOGIN_LOG_STREAM_BATCH_SIZE,
+    block_ms=settings.LOGIN_LOG_STREAM_BLOCK_MS,
+    claim_idle_ms=settings.LOGIN_LOG_STREAM_CLAIM_IDLE_MS,
+    max_deliveries=settings.LOGIN_LOG_STREAM_MAX_DELIVERIES,
+)
@@ -1,10 +1,13 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+from collections import OrderedDict
 from typing import Any
 
 from fastapi import Request
+from msgspec import json
 
 from backend.app.admin.crud.crud_menu import menu_dao
+from backend.app.admin.crud.crud_user import user_dao
 from backend.app.admin.model import Menu
 from backend.app.admin.schema.menu import CreateMenuParam, UpdateMenuParam
 from backend.common.exception import errors
@@ -13,6 +16,9 @@ from backend.database.db import async_db_session
 from backend.database.redis import redis_client
 from backend.utils.build_tree import get_tree_data, get_vben5_tree_data
 
+# 已编码的用户菜单树，键为菜单代数和角色组合
+_menu_tree_cache: OrderedDict[str, bytes] = OrderedDict()
+
 
 class MenuService:
     """菜单服务类"""
@@ -46,24 +52,43 @@ class MenuService:
             return menu_tree
 
     @staticmethod
-    async def get_user_menu_tree(*, request: Request) -> list[dict[str, Any]]:
+    async def get_user_menu_tree(*, request: Request) -> bytes:
         """
-        获取用户的菜单树形结构
+        获取用户的菜单树形结构，返回编码后的 JSON
+
+        菜单树只取决于用户的角色组合，按角色组合和菜单代数缓存在进程内和 Redis 中，
+        菜单或角色菜单变更后代数递增，旧缓存自然失效
 
         :param request: FastAPI 请求对象
         :return:
         """
-        async with async_db_session() as db:
-            roles = request.user.roles
-            menu_ids = []
-            menu_tree = []
-            if roles:
-                for role in roles:
-                    menu_ids.extend([menu.id for menu in role.menus])
-                menu_select = await menu_dao.get_role_menus(db, request.user.is_superuser, menu_ids)
-                menu_tree = get_vben5_tree_data(menu_select)
+        roles = request.user.roles
+        if not roles:
+            return b'[]'
+        role_key = 'super' if request.user.is_superuser else ','.join(str(i) for i in sorted({r.id for r in roles}))
+        generation = await redis_client.get_generation('menu')
+        cache_key = f'{generation}:{role_key}'
+        menu_tree = _menu_tree_cache.get(cache_key)
+        if menu_tree is not None:
+            _menu_tree_cache.move_to_end(cache_key)
             return menu_tree
 
+        redis_key = f'{settings.MENU_TREE_CACHE_REDIS_PREFIX}:{cache_key}'
+        cached = await redis_client.get(redis_key)
+        if cached is not None:
+            menu_tree = cached.encode()
+        else:
+            menu_ids = {menu.id for role in roles for menu in role.menus if menu}
+            async with async_db_session() as db:
+                menu_select = await menu_dao.get_role_menus(db, request.user.is_superuser, list(menu_ids))
+            menu_tree = json.encode(get_vben5_tree_data(menu_select))
+            await redis_client.setex(redis_key, settings.MENU_TREE_CACHE_EXPIRE_SECONDS, menu_tree)
+
+        _menu_tree_cache[cache_key] = menu_tree
+        if len(_menu_tree_cache) > settings.MENU_TREE_CACHE_SIZE:
+            _menu_tree_cache.popitem(last=False)
+        return menu_tree
+
     @staticmethod
     async def create(*, obj: CreateMenuParam) -> None:
         """
@@ -81,6 +106,7 @@ class MenuService:
                 if not parent_menu:
                     raise errors.NotFoundError(msg='父级菜单不存在')
             await menu_dao.create(db, obj)
+        await redis_client.bump_generation('menu')
 
     @staticmethod
     async def update(*, pk: int, obj: UpdateMenuParam) -> int:
@@ -91,24 +117,25 @@ class MenuService:
         :param obj: 菜单更新参数
         :return:
         """
+        if obj.parent_id == pk:
+            raise errors.ForbiddenError(msg='禁止关联自身为父级')
         async with async_db_session.begin() as db:
-            menu = await menu_dao.get(db, pk)
-            if not menu:
-                raise errors.NotFoundError(msg='菜单不存在')
-            if menu.title != obj.title:
-                if await menu_dao.get_by_title(db, obj.title):
-                    raise errors.ForbiddenError(msg='菜单标题已存在')
-            if obj.parent_id:
-                parent_menu = await menu_dao.get(db, obj.parent_id)
-                if not parent_menu:
-                    raise errors.NotFoundError(msg='父级菜单不存在')
-            if obj.parent_id == menu.id:
-                raise errors.ForbiddenError(msg='禁止关联自身为父级')
+            if obj.parent_id and await menu_dao.is_descendant(db, obj.parent_id, pk):
+                raise errors.ForbiddenError(msg='禁止关联子级为父级')
             count = await menu_dao.update(db, pk, obj)
-            for role in await menu.awaitable_attrs.roles:
-                for user in await role.awaitable_attrs.users:
-                    await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{user.id}')
-            return count
+            if not count:
+                # 条件更新未命中时再查明原因
+                menu, parent_menu = await menu_dao.load_many(db, [pk, obj.parent_id])
+                if not menu:
+                    raise errors.NotFoundError(msg='菜单不存在')
+                if obj.parent_id and not parent_menu:
+                    raise errors.NotFoundError(msg='父级菜单不存在')
+                raise errors.ForbiddenError(msg='菜单标题已存在')
+            user_ids = await user_dao.get_ids_by_menu(db, pk)
+        for user_id in user_ids:
+            await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{user_id}')
+        await redis_client.bump_generation('menu')
+        return count
 
     @staticmethod
     async def delete(*, pk: int) -> int:
@@ -128,7 +155,8 @@ class MenuService:
                 for role in await menu.awaitable_attrs.roles:
                     for user in await role.awaitable_attrs.users:
                         await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{user.id}')
-            return count
+        await redis_client.bump_generation('menu')
+        return count
 
 
 menu_service: MenuService = MenuService()
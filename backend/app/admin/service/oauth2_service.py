@@ -93,7 +93,6 @@ class OAuth2Service:
             await user_dao.update_login_time(db, sys_user.username)
             await db.refresh(sys_user)
             login_log = dict(
-                db=db,
                 request=request,
                 user_uuid=sys_user.uuid,
                 username=sys_user.username,
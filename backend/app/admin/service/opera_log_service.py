@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+from typing import AsyncGenerator
+
 from sqlalchemy import Select
 
 from backend.app.admin.crud.crud_opera_log import opera_log_dao
-from backend.app.admin.schema.opera_log import CreateOperaLogParam
+from backend.app.admin.schema.opera_log import CreateOperaLogParam, GetOperaLogDetail
+from backend.common.enums import ExportFormatType
 from backend.database.db import async_db_session
+from backend.utils.export import stream_export
 
 
 class OperaLogService:
@@ -22,6 +26,24 @@ class OperaLogService:
         """
         return await opera_log_dao.get_list(username=username, status=status, ip=ip)
 
+    @staticmethod
+    async def export(
+        *, username: str | None, status: int | None, ip: str | None, fmt: ExportFormatType
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        流式导出操作日志
+
+        :param username: 用户名
+        :param status: 状态
+        :param ip: IP 地址
+        :param fmt: 导出格式
+        :return:
+        """
+        stmt = await opera_log_dao.get_list(username=username, status=status, ip=ip)
+        async with async_db_session(info={'reporting': True}) as db:
+            async for chunk in stream_export(db, stmt, list(GetOperaLogDetail.model_fields), fmt):
+                yield chunk
+
     @staticmethod
     async def create(*, obj: CreateOperaLogParam) -> None:
         """
@@ -4,10 +4,10 @@ from typing import Any, Sequence
 
 from sqlalchemy import Select
 
-from backend.app.admin.crud.crud_data_scope import data_scope_dao
 from backend.app.admin.crud.crud_menu import menu_dao
 from backend.app.admin.crud.crud_role import role_dao
-from backend.app.admin.model import Role
+from backend.app.admin.crud.crud_user import user_dao
+from backend.app.admin.model import DataScope, Menu, Role
 from backend.app.admin.schema.role import (
     CreateRoleParam,
     UpdateRoleMenuParam,
@@ -18,6 +18,7 @@ from backend.common.exception import errors
 from backend.core.conf import settings
 from backend.database.db import async_db_session
 from backend.database.redis import redis_client
+from backend.database.relation import get_missing_ids
 from backend.utils.build_tree import get_tree_data
 
 
@@ -113,6 +114,7 @@ class RoleService:
             if role:
                 raise errors.ForbiddenError(msg='角色已存在')
             await role_dao.create(db, obj)
+        await redis_client.bump_generation('role')
 
     @staticmethod
     async def update(*, pk: int, obj: UpdateRoleParam) -> int:
@@ -124,17 +126,16 @@ class RoleService:
         :return:
         """
         async with async_db_session.begin() as db:
-            role = await role_dao.get(db, pk)
-            if not role:
-                raise errors.NotFoundError(msg='角色不存在')
-            if role.name != obj.name:
-                role = await role_dao.get_by_name(db, obj.name)
-                if role:
-                    raise errors.ForbiddenError(msg='角色已存在')
             count = await role_dao.update(db, pk, obj)
-            for user in await role.awaitable_attrs.users:
-                await redis_client.delete_prefix(f'{settings.JWT_USER_REDIS_PREFIX}:{user.id}')
-            return count
+            if not count:
+                if not await role_dao.get(db, pk):
+                    raise errors.NotFoundError(msg='角色不存在')
+                raise errors.ForbiddenError(msg='角色已存在')
+            user_ids = await user_dao.get_ids_by_role(db, pk)
+        for user_id in user_ids:
+            await redis_client.delete_prefix(f'{settings.JWT_USER_REDIS_PREFIX}:{user_id}')
+        await redis_client.bump_generation('role')
+        return count
 
     @staticmethod
     async def update_role_menu(*, pk: int, menu_ids: UpdateRoleMenuParam) -> int:
@@ -146,17 +147,16 @@ class RoleService:
         :return:
         """
         async with async_db_session.begin() as db:
-            role = await role_dao.get_with_relation(db, pk)
+            role = await role_dao.get(db, pk)
             if not role:
                 raise errors.NotFoundError(msg='角色不存在')
-            for menu_id in menu_ids.menus:
-                menu = await menu_dao.get(db, menu_id)
-                if not menu:
-                    raise errors.NotFoundError(msg='菜单不存在')
+            if await get_missing_ids(db, Menu.id, menu_ids.menus):
+                raise errors.NotFoundError(msg='菜单不存在')
             count = await role_dao.update_menus(db, pk, menu_ids)
             for user in await role.awaitable_attrs.users:
                 await redis_client.delete_prefix(f'{settings.JWT_USER_REDIS_PREFIX}:{user.id}')
-            return count
+        await redis_client.bump_generation('menu')
+        return count
 
     @staticmethod
     async def update_role_scope(*, pk: int, scope_ids: UpdateRoleScopeParam) -> int:
@@ -171,14 +171,13 @@ class RoleService:
             role = await role_dao.get(db, pk)
             if not role:
                 raise errors.NotFoundError(msg='角色不存在')
-            for scope_id in scope_ids.scopes:
-                scope = await data_scope_dao.get(db, scope_id)
-                if not scope:
-                    raise errors.NotFoundError(msg='数据范围不存在')
+            if await get_missing_ids(db, DataScope.id, scope_ids.scopes):
+                raise errors.NotFoundError(msg='数据范围不存在')
             count = await role_dao.update_scopes(db, pk, scope_ids)
             for user in await role.awaitable_attrs.users:
                 await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{user.id}')
-            return count
+        await redis_client.bump_generation('role')
+        return count
 
     @staticmethod
     async def delete(*, pk: list[int]) -> int:
@@ -195,7 +194,8 @@ class RoleService:
                 if role:
                     for user in await role.awaitable_attrs.users:
                         await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{user.id}')
-            return count
+        await redis_client.bump_generation('role')
+        return count
 
 
 role_service: RoleService = RoleService()
@@ -2,29 +2,51 @@
 # -*- coding: utf-8 -*-
 import random
 
-from fastapi import Request
+from typing import Any, AsyncGenerator
+from uuid import uuid4
+
+import bcrypt
+
+from anyio import CapacityLimiter, create_task_group, to_thread
+from fastapi import Request, UploadFile
+from pydantic import ValidationError
 from sqlalchemy import Select
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
 
 from backend.app.admin.crud.crud_dept import dept_dao
 from backend.app.admin.crud.crud_role import role_dao
 from backend.app.admin.crud.crud_user import user_dao
-from backend.app.admin.model import User
+from backend.app.admin.model import Role, User
 from backend.app.admin.schema.user import (
     AddUserParam,
     AvatarParam,
+    GetUserInfoDetail,
+    ImportUserParam,
     RegisterUserParam,
     ResetPasswordParam,
     UpdateUserParam,
     UpdateUserRoleParam,
 )
+from backend.app.task.celery import celery_app
+from backend.common.enums import ExportFormatType
 from backend.common.exception import errors
 from backend.common.security.jwt import get_hash_password, get_token, jwt_decode, password_verify, superuser_verify
+from backend.common.sparse_fields import FieldSet
 from backend.core.conf import settings
-from backend.database.db import async_db_session
+from backend.database.db import async_db_session, uuid4_str
 from backend.database.redis import redis_client
+from backend.database.relation import get_missing_ids
+from backend.database.uow import independent_session
+from backend.utils.export import stream_export
+from backend.utils.file_ops import read_data_rows
+from backend.utils.timezone import timezone
 from backend.app.todo.crud.crud_todo import crud_todo
 from backend.app.todo.schema.todo import TodoCreateParam
 
+# 导入时需唯一的用户字段及其名称
+_IMPORT_LABELS = {'username': '用户名', 'nickname': '昵称', 'email': '邮箱'}
+
 
 class UserService:
     """用户服务类"""
@@ -78,12 +100,144 @@ class UserService:
             dept = await dept_dao.get(db, obj.dept_id)
             if not dept:
                 raise errors.NotFoundError(msg='部门不存在')
-            for role_id in obj.roles:
-                role = await role_dao.get(db, role_id)
-                if not role:
-                    raise errors.NotFoundError(msg='角色不存在')
+            if await get_missing_ids(db, Role.id, obj.roles):
+                raise errors.NotFoundError(msg='角色不存在')
             await user_dao.add(db, obj)
 
+    @staticmethod
+    async def import_users(*, request: Request, file: UploadFile, background: bool) -> dict[str, Any]:
+        """
+        从 CSV 或 JSON 文件批量导入用户，行数超过阈值时转为后台任务
+
+        :param request: FastAPI 请求对象
+        :param file: 上传文件
+        :param background: 是否强制后台导入
+        :return:
+        """
+        superuser_verify(request)
+        rows = await read_data_rows(file)
+        if not rows:
+            raise errors.RequestError(msg='导入文件为空')
+        # 密码在入队前完成哈希，任务消息中不包含明文密码
+        users, errs = await UserService.prepare_import(rows=rows)
+        if background or len(rows) > settings.USER_IMPORT_BACKGROUND_ROWS:
+            task = await run_in_threadpool(
+                celery_app.send_task,
+                'import_users',
+                kwargs={'users': users, 'errs': errs, 'total': len(rows)},
+            )
+            return {'total': len(rows), 'task_id': task.task_id}
+        return await UserService.bulk_import(users=users, errs=errs, total=len(rows))
+
+    @staticmethod
+    async def prepare_import(*, rows: list[dict[str, Any]]) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+        """
+        校验导入数据行并计算密码哈希
+
+        密码哈希在线程池中并行计算，结果可直接序列化为任务参数
+
+        :param rows: 用户数据行
+        :return: 待导入用户（含行号、密码哈希及盐）及逐行错误报告
+        """
+        errs: list[dict[str, Any]] = []
+        valid: list[tuple[int, ImportUserParam]] = []
+        seen: dict[str, set[str]] = {'username': set(), 'nickname': set(), 'email': set()}
+        for index, row in enumerate(rows, start=1):
+            try:
+                obj = ImportUserParam.model_validate(row)
+            except ValidationError as e:
+                msg = '; '.join(f'{".".join(map(str, err["loc"]))}: {err["msg"]}' for err in e.errors())
+                errs.append({'row': index, 'username': row.get('username'), 'msg': msg})
+                continue
+            obj.nickname = obj.nickname if obj.nickname else f'#{uuid4().hex[:10]}'
+            duplicated = [key for key in seen if getattr(obj, key) in seen[key]]
+            if duplicated:
+                msg = '、'.join(_IMPORT_LABELS[key] for key in duplicated) + '在文件中重复'
+                errs.append({'row': index, 'username': obj.username, 'msg': msg})
+                continue
+            for key in seen:
+                seen[key].add(getattr(obj, key))
+            valid.append((index, obj))
+
+        # bcrypt 计算时释放 GIL，可在线程池中并行
+        limiter = CapacityLimiter(settings.USER_IMPORT_HASH_CONCURRENCY)
+        users: list[dict[str, Any]] = []
+
+        async def hash_password(index: int, obj: ImportUserParam) -> None:
+            salt = bcrypt.gensalt()
+            password = await to_thread.run_sync(get_hash_password, obj.password, salt, limiter=limiter)
+            users.append({'row': index, **obj.model_dump(mode='json'), 'password': password, 'salt': salt.decode()})
+
+        async with create_task_group() as tg:
+            for index, obj in valid:
+                tg.start_soon(hash_password, index, obj)
+
+        users.sort(key=lambda u: u['row'])
+        return users, errs
+
+    @staticmethod
+    async def bulk_import(*, users: list[dict[str, Any]], errs: list[dict[str, Any]], total: int) -> dict[str, Any]:
+        """
+        批量导入用户
+
+        唯一性通过集合查询一次性校验，用户及角色关联按批次多行插入，每批一个事务，失败的批次不影响其他批次
+
+        :param users: 由 prepare_import 生成的待导入用户
+        :param errs: 由 prepare_import 生成的逐行错误报告
+        :param total: 导入文件总行数
+        :return: 导入结果及逐行错误报告
+        """
+        errs = list(errs)
+        async with async_db_session() as db:
+            existing = {
+                key: await user_dao.get_existing(db, key, [user[key] for user in users]) for key in _IMPORT_LABELS
+            }
+            depts = await dept_dao.get_existing_ids(db, list({user['dept_id'] for user in users}))
+            roles = await role_dao.get_existing_ids(db, list({r for user in users for r in user['roles']}))
+
+        checked: list[dict[str, Any]] = []
+        for user in users:
+            registered = [key for key in existing if user[key] in existing[key]]
+            if registered:
+                msg = '、'.join(_IMPORT_LABELS[key] for key in registered) + '已注册'
+            elif user['dept_id'] not in depts:
+                msg = '部门不存在'
+            elif not set(user['roles']) <= roles:
+                msg = '角色不存在'
+            else:
+                checked.append(user)
+                continue
+            errs.append({'row': user['row'], 'username': user['username'], 'msg': msg})
+
+        success = 0
+        batch_size = settings.USER_IMPORT_BATCH_SIZE
+        for i in range(0, len(checked), batch_size):
+            batch = checked[i : i + batch_size]
+            now = timezone.now()
+            rows = [
+                {
+                    **{key: value for key, value in user.items() if key not in ('row', 'roles')},
+                    'salt': user['salt'].encode(),
+                    'uuid': uuid4_str(),
+                    'join_time': now,
+                    'created_time': now,
+                }
+                for user in batch
+            ]
+            try:
+                # 每批在独立事务中提交，冲突批次回滚后不影响请求共享会话及其他批次
+                async with independent_session(async_db_session).begin() as db:
+                    await user_dao.bulk_add(db, rows, {user['username']: user['roles'] for user in batch})
+            except IntegrityError:
+                errs.extend(
+                    {'row': user['row'], 'username': user['username'], 'msg': '数据冲突，请重新导入'} for user in batch
+                )
+                continue
+            success += len(batch)
+
+        errs.sort(key=lambda e: e['row'])
+        return {'total': total, 'success': success, 'failed': total - success, 'errors': errs}
+
     @staticmethod
     async def pwd_reset(*, request: Request, obj: ResetPasswordParam) -> int:
         """
@@ -171,14 +325,12 @@ class UserService:
         async with async_db_session.begin() as db:
             if not request.user.is_superuser and request.user.username != username:
                 raise errors.ForbiddenError(msg='你只能修改自己的信息')
-            input_user = await user_dao.get_with_relation(db, username=username)
+            input_user = await user_dao.get_by_username(db, username)
             if not input_user:
                 raise errors.NotFoundError(msg='用户不存在')
-            for role_id in obj.roles:
-                role = await role_dao.get(db, role_id)
-                if not role:
-                    raise errors.NotFoundError(msg='角色不存在')
-            await user_dao.update_role(db, input_user, obj)
+            if await get_missing_ids(db, Role.id, obj.roles):
+                raise errors.NotFoundError(msg='角色不存在')
+            await user_dao.update_role(db, input_user.id, obj)
             await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{input_user.id}')
 
     @staticmethod
@@ -202,7 +354,9 @@ class UserService:
             return count
 
     @staticmethod
-    async def get_select(*, dept: int, username: str, phone: str, status: int) -> Select:
+    async def get_select(
+        *, dept: int, username: str, phone: str, status: int, fields: FieldSet | None = None
+    ) -> Select:
         """
         获取用户列表查询条件
 
@@ -210,9 +364,29 @@ class UserService:
         :param username: 用户名
         :param phone: 手机号
         :param status: 状态
+        :param fields: 稀疏字段集
         :return:
         """
-        return await user_dao.get_list(dept=dept, username=username, phone=phone, status=status)
+        return await user_dao.get_list(dept=dept, username=username, phone=phone, status=status, fields=fields)
+
+    @staticmethod
+    async def export(
+        *, dept: int | None, username: str | None, phone: str | None, status: int | None, fmt: ExportFormatType
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        流式导出用户
+
+        :param dept: 部门 ID
+        :param username: 用户名
+        :param phone: 手机号
+        :param status: 状态
+        :param fmt: 导出格式
+        :return:
+        """
+        stmt = await user_dao.get_list(dept=dept, username=username, phone=phone, status=status)
+        async with async_db_session(info={'reporting': True}) as db:
+            async for chunk in stream_export(db, stmt, [*GetUserInfoDetail.model_fields, 'dept.name'], fmt):
+                yield chunk
 
     @staticmethod
     async def update_permission(*, request: Request, pk: int) -> int:
@@ -223,17 +397,14 @@ class UserService:
         :param pk: 用户 ID
         :return:
         """
+        superuser_verify(request)
+        if pk == request.user.id:
+            raise errors.ForbiddenError(msg='非法操作')
         async with async_db_session.begin() as db:
-            superuser_verify(request)
-            user = await user_dao.get(db, pk)
-            if not user:
+            if await user_dao.toggle_super(db, pk) is None:
                 raise errors.NotFoundError(msg='用户不存在')
-            if pk == request.user.id:
-                raise errors.ForbiddenError(msg='非法操作')
-            super_status = await user_dao.get_super(db, pk)
-            count = await user_dao.set_super(db, pk, not super_status)
-            await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{user.id}')
-            return count
+        await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{pk}')
+        return 1
 
     @staticmethod
     async def update_staff(*, request: Request, pk: int) -> int:
@@ -244,17 +415,14 @@ class UserService:
         :param pk: 用户 ID
         :return:
         """
+        superuser_verify(request)
+        if pk == request.user.id:
+            raise errors.ForbiddenError(msg='非法操作')
         async with async_db_session.begin() as db:
-            superuser_verify(request)
-            user = await user_dao.get(db, pk)
-            if not user:
+            if await user_dao.toggle_staff(db, pk) is None:
                 raise errors.NotFoundError(msg='用户不存在')
-            if pk == request.user.id:
-                raise errors.ForbiddenError(msg='非法操作')
-            staff_status = await user_dao.get_staff(db, pk)
-            count = await user_dao.set_staff(db, pk, not staff_status)
-            await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{user.id}')
-            return count
+        await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{pk}')
+        return 1
 
     @staticmethod
     async def update_status(*, request: Request, pk: int) -> int:
@@ -265,17 +433,14 @@ class UserService:
         :param pk: 用户 ID
         :return:
         """
+        superuser_verify(request)
+        if pk == request.user.id:
+            raise errors.ForbiddenError(msg='非法操作')
         async with async_db_session.begin() as db:
-            superuser_verify(request)
-            user = await user_dao.get(db, pk)
-            if not user:
+            if await user_dao.toggle_status(db, pk) is None:
                 raise errors.NotFoundError(msg='用户不存在')
-            if pk == request.user.id:
-                raise errors.ForbiddenError(msg='非法操作')
-            status = await user_dao.get_status(db, pk)
-            count = await user_dao.set_status(db, pk, 0 if status == 1 else 1)
-            await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{user.id}')
-            return count
+        await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{pk}')
+        return 1
 
     @staticmethod
     async def update_multi_login(*, request: Request, pk: int) -> int:
@@ -286,28 +451,22 @@ class UserService:
         :param pk: 用户 ID
         :return:
         """
+        superuser_verify(request)
         async with async_db_session.begin() as db:
-            superuser_verify(request)
-            user = await user_dao.get(db, pk)
-            if not user:
+            new_multi_login = await user_dao.toggle_multi_login(db, pk)
+            if new_multi_login is None:
                 raise errors.NotFoundError(msg='用户不存在')
-            multi_login = await user_dao.get_multi_login(db, pk) if pk != user.id else request.user.is_multi_login
-            new_multi_login = not multi_login
-            count = await user_dao.set_multi_login(db, pk, new_multi_login)
-            await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{user.id}')
-            token = get_token(request)
-            token_payload = jwt_decode(token)
-            if pk == user.id:
+        await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{pk}')
+        if not new_multi_login:
+            key_prefix = f'{settings.TOKEN_REDIS_PREFIX}:{pk}'
+            if pk == request.user.id:
                 # 系统管理员修改自身时，除当前 token 外，其他 token 失效
-                if not new_multi_login:
-                    key_prefix = f'{settings.TOKEN_REDIS_PREFIX}:{user.id}'
-                    await redis_client.delete_prefix(key_prefix, exclude=f'{key_prefix}:{token_payload.session_uuid}')
+                token_payload = jwt_decode(get_token(request))
+                await redis_client.delete_prefix(key_prefix, exclude=f'{key_prefix}:{token_payload.session_uuid}')
             else:
                 # 系统管理员修改他人时，他人 token 全部失效
-                if not new_multi_login:
-                    key_prefix = f'{settings.TOKEN_REDIS_PREFIX}:{user.id}'
-                    await redis_client.delete_prefix(key_prefix)
-            return count
+                await redis_client.delete_prefix(key_prefix)
+        return 1
 
     @staticmethod
     async def delete(*, username: str) -> int:
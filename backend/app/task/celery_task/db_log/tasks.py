@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-from backend.app.admin.service.login_log_service import login_log_service
+from backend.app.admin.service.login_log_service import login_log_service, login_log_stream_consumer
 from backend.app.admin.service.opera_log_service import opera_log_service
 from backend.app.task.celery import celery_app
+from backend.core.conf import settings
 
 
 @celery_app.task(name='delete_db_opera_log')
@@ -17,3 +18,12 @@ async def delete_db_login_log() -> int:
     """自动删除数据库登录日志"""
     result = await login_log_service.delete_all()
     return result
+
+
+@celery_app.task(name='consume_login_log_stream')
+async def consume_login_log_stream() -> int:
+    """消费登录日志 Redis Stream 并批量入库"""
+    if not settings.LOGIN_LOG_STREAM or settings.LOGIN_LOG_STREAM_CONSUMER != 'celery':
+        return 0
+    result = await login_log_stream_consumer.drain()
+    return result
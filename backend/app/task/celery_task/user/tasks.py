@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from typing import Any
+
+from backend.app.admin.service.user_service import user_service
+from backend.app.task.celery import celery_app
+
+
+@celery_app.task(name='import_users')
+async def import_users(users: list[dict[str, Any]], errs: list[dict[str, Any]], total: int) -> dict[str, Any]:
+    """批量导入用户，密码已在入队前完成哈希"""
+    result = await user_service.bulk_import(users=users, errs=errs, total=total)
+    return result
@@ -36,6 +36,7 @@ class TaskSettings(BaseSettings):
     CELERY_TASK_PACKAGES: list[str] = [
         'app.task.celery_task',
         'app.task.celery_task.db_log',
+        'app.task.celery_task.user',
     ]
     CELERY_TASK_MAX_RETRIES: int = 5
 
@@ -53,6 +54,10 @@ class TaskSettings(BaseSettings):
             'task': 'delete_db_login_log',
             'schedule': crontab('0', '0', day_of_month='15'),
         },
+        'exec-every-5-seconds': {
+            'task': 'consume_login_log_stream',
+            'schedule': 5,
+        },
     }
 
     @model_validator(mode='before')
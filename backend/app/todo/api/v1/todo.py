@@ -1,12 +1,15 @@
+from typing import Annotated
+
 from backend.app.todo.schema.todo import TodoCreateParam
 from backend.app.todo.service.todo_service import todo_service
 from backend.common.response.response_schema import ResponseModel, response_base
+from backend.common.struct_body import struct_body
 from fastapi import APIRouter
 
 router = APIRouter()
 
 
 @router.post('', summary='Create todo')
-async def create_todo(obj: TodoCreateParam) -> ResponseModel:
+async def create_todo(obj: Annotated[TodoCreateParam, struct_body(TodoCreateParam)]) -> ResponseModel:
     await todo_service.create(obj=obj)
     return response_base.success(schema=None)
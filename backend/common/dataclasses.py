@@ -64,3 +64,16 @@ class TokenPayload:
 @dataclasses.dataclass
 class UploadUrl:
     url: str
+
+
+@dataclasses.dataclass(frozen=True)
+class OperaLogPolicy:
+    mutation: bool
+    read_sample_rate: float
+    error: bool
+
+
+@dataclasses.dataclass
+class DBRouteState:
+    user_id: int
+    sticky: bool = False
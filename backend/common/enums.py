@@ -135,3 +135,10 @@ class TodoPriority(StrEnum):
     low = 'low'
     medium = 'medium'
     high = 'high'
+
+
+class ExportFormatType(StrEnum):
+    """导出格式"""
+
+    csv = 'csv'
+    ndjson = 'ndjson'
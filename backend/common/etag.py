@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+import functools
+import hashlib
+
+from contextvars import ContextVar
+from typing import Any, Callable
+
+from fastapi import Depends, Request, Response
+from fastapi.routing import APIRoute
+from starlette.routing import BaseRoute
+
+from backend.core.conf import settings
+from backend.database.redis import redis_client
+
+# 当前请求的实体标签，由条件请求依赖设置，路由函数返回响应对象时由包装函数写入响应头
+_request_etag: ContextVar[str | None] = ContextVar('request_etag', default=None)
+
+
+class NotModifiedError(Exception):
+    """资源未变更，由全局异常处理器返回 304"""
+
+    def __init__(self, etag: str) -> None:
+        self.etag = etag
+
+
+def etag_headers(etag: str) -> dict[str, str]:
+    """
+    获取实体标签响应头，要求客户端每次使用缓存前重新验证
+
+    :param etag: 实体标签
+    :return:
+    """
+    return {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    按弱比较判断 If-None-Match 是否命中
+
+    :param if_none_match: If-None-Match 请求头
+    :param etag: 当前实体标签
+    :return:
+    """
+    if if_none_match.strip() == '*':
+        return True
+    opaque = etag.removeprefix('W/')
+    return any(tag.strip().removeprefix('W/') == opaque for tag in if_none_match.split(','))
+
+
+class ConditionalGet:
+    """
+    条件请求依赖
+
+    实体标签由资源代数、请求路径和查询参数计算，无需查询数据库或序列化响应；
+    If-None-Match 命中时直接返回 304，资源代数需在相应的创建、更新和删除服务中递增
+    """
+
+    def __init__(self, *resources: str, per_user: bool = False) -> None:
+        """
+        初始化条件请求依赖
+
+        :param resources: 响应所依赖的资源名称，与 redis_client.bump_generation 的名称一致
+        :param per_user: 响应是否因用户而异（如按角色或数据权限过滤），是则实体标签包含用户、部门和角色
+        :return:
+        """
+        self.resources = resources
+        self.per_user = per_user
+
+    async def __call__(self, request: Request, response: Response) -> None:
+        generations = await redis_client.get_generations(*self.resources)
+        parts = [
+            settings.FASTAPI_VERSION,
+            request.url.path,
+            request.url.query,
+            ','.join(f'{name}:{generation}' for name, generation in zip(self.resources, generations)),
+        ]
+        if self.per_user:
+            user = request.user
+            role_ids = ','.join(str(i) for i in sorted({role.id for role in user.roles}))
+            parts.append(f'{user.id}:{user.dept_id}:{int(user.is_superuser)}:{role_ids}')
+        etag = f'W/"{hashlib.blake2b("|".join(parts).encode(), digest_size=16).hexdigest()}"'
+
+        if_none_match = request.headers.get('if-none-match')
+        if if_none_match and _etag_matches(if_none_match, etag):
+            raise NotModifiedError(etag)
+        # 路由函数返回非响应对象时，FastAPI 会合并此处设置的响应头
+        response.headers.update(etag_headers(etag))
+        _request_etag.set(etag)
+
+
+def conditional_get(*resources: str, per_user: bool = False) -> Any:
+    """
+    条件请求依赖，用法：dependencies=[DependsJwtAuth, conditional_get('menu')]
+
+    :param resources: 响应所依赖的资源名称
+    :param per_user: 响应是否因用户而异
+    :return:
+    """
+    return Depends(ConditionalGet(*resources, per_user=per_user))
+
+
+def set_etag_after_endpoint(func: Callable) -> Callable:
+    """
+    路由函数直接返回响应对象时，为其设置实体标签响应头
+
+    :param func: 路由函数
+    :return:
+    """
+    if not asyncio.iscoroutinefunction(func):
+        return func
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs) -> Any:
+        result = await func(*args, **kwargs)
+        etag = _request_etag.get()
+        if etag is not None:
+            _request_etag.set(None)
+            if isinstance(result, Response) and result.status_code == 200:
+                result.headers.update(etag_headers(etag))
+        return result
+
+    return wrapper
+
+
+def bind_conditional_get(routes: list[BaseRoute]) -> None:
+    """
+    为使用条件请求依赖的路由绑定实体标签响应头设置
+
+    :param routes: 应用路由列表
+    :return:
+    """
+    for route in routes:
+        if not isinstance(route, APIRoute):
+            continue
+        if any(isinstance(dependant.call, ConditionalGet) for dependant in route.dependant.dependencies):
+            route.dependant.call = set_etag_after_endpoint(route.dependant.call)
@@ -1,12 +1,13 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
 from fastapi.exceptions import RequestValidationError
 from pydantic import ValidationError
 from starlette.exceptions import HTTPException
 from starlette.middleware.cors import CORSMiddleware
 from uvicorn.protocols.http.h11_impl import STATUS_PHRASES
 
+from backend.common.etag import NotModifiedError, etag_headers
 from backend.common.exception.errors import BaseExceptionMixin
 from backend.common.response.response_code import CustomResponseCode, StandardResponseCode
 from backend.common.response.response_schema import response_base
@@ -153,6 +154,17 @@ def register_exception(app: FastAPI):
             content=content,
         )
 
+    @app.exception_handler(NotModifiedError)
+    async def not_modified_exception_handler(request: Request, exc: NotModifiedError):
+        """
+        条件请求未变更处理，304 响应不包含响应体
+
+        :param request: FastAPI 请求对象
+        :param exc: 资源未变更异常
+        :return:
+        """
+        return Response(status_code=StandardResponseCode.HTTP_304, headers=etag_headers(exc.etag))
+
     @app.exception_handler(BaseExceptionMixin)
     async def custom_exception_handler(request: Request, exc: BaseExceptionMixin):
         """
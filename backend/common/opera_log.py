@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import random
+
+from typing import Any, Callable, TypeVar
+
+from fastapi.routing import APIRoute
+from starlette.routing import BaseRoute
+
+from backend.common.dataclasses import OperaLogPolicy
+from backend.core.conf import settings
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+# 只读请求方法
+READ_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+
+def opera_log_policy(
+    *, mutation: bool | None = None, read_sample_rate: float | None = None, error: bool | None = None
+) -> Callable[[F], F]:
+    """
+    路由操作日志策略装饰器，未指定的项使用 OPERA_LOG_POLICY_DEFAULT
+
+    E.g. ::
+
+        @router.get('/sidebar')
+        @opera_log_policy(read_sample_rate=0.01)
+        async def get_user_sidebar(): ...
+
+    :param mutation: 是否记录非只读请求
+    :param read_sample_rate: 只读请求采样率
+    :param error: 是否始终记录异常请求
+    :return:
+    """
+    overrides = {
+        k: v
+        for k, v in dict(mutation=mutation, read_sample_rate=read_sample_rate, error=error).items()
+        if v is not None
+    }
+
+    def decorator(func: F) -> F:
+        setattr(func, '__opera_log_policy__', overrides)
+        return func
+
+    return decorator
+
+
+class OperaLogPolicyRegistry:
+    """操作日志策略注册表，启动时按路由解析策略，请求时仅做字典查找"""
+
+    def __init__(self) -> None:
+        self.default = OperaLogPolicy(**settings.OPERA_LOG_POLICY_DEFAULT)
+        self._policies: dict[tuple[str, str], OperaLogPolicy] = {}
+
+    def build(self, routes: list[BaseRoute]) -> None:
+        """
+        解析路由策略
+
+        :param routes: 应用路由列表
+        :return:
+        """
+        self._policies.clear()
+        for route in routes:
+            if not isinstance(route, APIRoute):
+                continue
+            overrides = {
+                **settings.OPERA_LOG_POLICY_DEFAULT,
+                **getattr(route.endpoint, '__opera_log_policy__', {}),
+                **settings.OPERA_LOG_POLICY_ROUTES.get(route.path, {}),
+            }
+            policy = OperaLogPolicy(**overrides)
+            if policy == self.default:
+                continue
+            for method in route.methods:
+                self._policies[(route.path, method)] = policy
+
+    def get(self, route: BaseRoute | None, method: str) -> OperaLogPolicy:
+        """
+        获取路由策略
+
+        :param route: 请求匹配的路由
+        :param method: 请求方法
+        :return:
+        """
+        if route is None:
+            return self.default
+        return self._policies.get((getattr(route, 'path', None), method), self.default)
+
+    @staticmethod
+    def should_log(policy: OperaLogPolicy, method: str, error: bool) -> bool:
+        """
+        判断是否记录操作日志
+
+        :param policy: 路由策略
+        :param method: 请求方法
+        :param error: 请求是否异常
+        :return:
+        """
+        if error and policy.error:
+            return True
+        if method in READ_METHODS:
+            return policy.read_sample_rate >= 1 or random.random() < policy.read_sample_rate
+        return policy.mutation
+
+
+# 创建操作日志策略注册表单例
+opera_log_policy_registry: OperaLogPolicyRegistry = OperaLogPolicyRegistry()
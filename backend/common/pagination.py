@@ -2,15 +2,31 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import base64
+import binascii
+import hashlib
+
 from math import ceil
 from typing import TYPE_CHECKING, Any, Generic, Sequence, TypeVar
 
+import msgspec
+
 from fastapi import Depends, Query
 from fastapi_pagination import pagination_ctx
+from fastapi_pagination.api import resolve_params
 from fastapi_pagination.bases import AbstractPage, AbstractParams, RawParams
-from fastapi_pagination.ext.sqlalchemy import apaginate
 from fastapi_pagination.links.bases import create_links
 from pydantic import BaseModel, Field
+from sqlalchemy import Table, and_, func, inspect, literal, or_, text
+from sqlalchemy import select as sa_select
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import UnaryExpression
+
+from backend.common.exception import errors
+from backend.common.log import log
+from backend.core.conf import settings
+from backend.database.redis import redis_client
+from backend.utils.serializers import select_as_dict
 
 if TYPE_CHECKING:
     from sqlalchemy import Select
@@ -25,6 +41,9 @@ class _CustomPageParams(BaseModel, AbstractParams):
 
     page: int = Query(1, ge=1, description='Page number')
     size: int = Query(20, gt=0, le=200, description='Number of items per page')
+    cursor: str | None = Query(
+        None, description='Keyset pagination cursor, pass an empty value for the first page, page is ignored'
+    )
 
     def to_raw_params(self) -> RawParams:
         return RawParams(
@@ -47,10 +66,13 @@ class _PageDetails(BaseModel):
     """Pagination details"""
 
     items: list = Field([], description='List of data for the current page')
-    total: int = Field(description='Total number of data items')
-    page: int = Field(description='Current page number')
+    total: int | None = Field(description='Total number of data items, null in cursor mode')
+    page: int | None = Field(description='Current page number, null in cursor mode')
     size: int = Field(description='Number of items per page')
-    total_pages: int = Field(description='Total number of pages')
+    total_pages: int | None = Field(description='Total number of pages, null in cursor mode')
+    total_exact: bool = Field(True, description='Whether the total is an exact count or a planner estimate')
+    next_cursor: str | None = Field(None, description='Next page cursor, only in cursor mode')
+    prev_cursor: str | None = Field(None, description='Previous page cursor, only in cursor mode')
     links: _Links = Field(description='Pagination links')
 
 
@@ -111,16 +133,213 @@ class PageData(_PageDetails, Generic[SchemaT]):
     items: Sequence[SchemaT]
 
 
+def _encode_cursor(values: list[Any] | None, direction: str) -> str:
+    return base64.urlsafe_b64encode(msgspec.json.encode({'v': values, 'd': direction})).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[list[Any] | None, str]:
+    try:
+        data = msgspec.json.decode(base64.urlsafe_b64decode(cursor.encode()))
+        values, direction = data['v'], data['d']
+    except (binascii.Error, msgspec.DecodeError, KeyError, TypeError, ValueError):
+        raise errors.RequestError(msg='分页游标无效')
+    if direction not in ('n', 'p') or not (values is None or isinstance(values, list)):
+        raise errors.RequestError(msg='分页游标无效')
+    return values, direction
+
+
+def _keyset_columns(select: Select) -> list[tuple[Any, bool, str]]:
+    """
+    Resolve the keyset columns of a query: the ORDER BY columns followed by the primary key
+
+    :param select: SQL query statement
+    :return: list of (column, descending, attribute name)
+    """
+    mapper = inspect(select.column_descriptions[0]['entity'])
+    columns = []
+    for clause in select._order_by_clauses:
+        desc = isinstance(clause, UnaryExpression) and clause.modifier is operators.desc_op
+        column = clause.element if isinstance(clause, UnaryExpression) else clause
+        columns.append((column, desc, mapper.get_property_by_column(column).key))
+    for pk in mapper.primary_key:
+        if not any(column is pk for column, _, _ in columns):
+            columns.append((pk, columns[-1][1] if columns else False, mapper.get_property_by_column(pk).key))
+    return columns
+
+
+async def _keyset_paging_data(db: AsyncSession, select: Select, params: _CustomPageParams) -> dict[str, Any]:
+    """
+    Create keyset pagination data, rows are located by the cursor instead of OFFSET and no COUNT is executed
+
+    :param db: Database session
+    :param select: SQL query statement
+    :param params: Pagination parameters
+    :return:
+    """
+    columns = _keyset_columns(select)
+    values, direction = _decode_cursor(params.cursor) if params.cursor else (None, 'n')
+    if values is not None and len(values) != len(columns):
+        raise errors.RequestError(msg='分页游标无效')
+    backward = direction == 'p'
+
+    # Scanning backward reverses the order, the rows are reversed back after fetching
+    stmt = select.order_by(None).order_by(*[
+        column.asc() if desc == backward else column.desc() for column, desc, _ in columns
+    ])
+    if values:
+        values = [msgspec.convert(v, column.type.python_type) for v, (column, _, _) in zip(values, columns)]
+        conditions = []
+        for i, (column, desc, _) in enumerate(columns):
+            after = column < values[i] if desc != backward else column > values[i]
+            conditions.append(and_(*[c == v for (c, _, _), v in zip(columns[:i], values[:i])], after))
+        stmt = stmt.where(or_(*conditions))
+
+    # limit + 1 probe
+    result = await db.execute(stmt.limit(params.size + 1))
+    items = list(result.scalars().all())
+    has_more = len(items) > params.size
+    items = items[: params.size]
+    if backward:
+        items.reverse()
+
+    def cursor_of(item: Any, to: str) -> str:
+        return _encode_cursor([getattr(item, key) for _, _, key in columns], to)
+
+    has_next = has_more if not backward else values is not None
+    has_prev = has_more if backward else values is not None
+    next_cursor = cursor_of(items[-1], 'n') if items and has_next else None
+    prev_cursor = cursor_of(items[0], 'p') if items and has_prev else None
+    links = create_links(
+        first={'cursor': '', 'size': params.size},
+        last={'cursor': _encode_cursor(None, 'p'), 'size': params.size},
+        next={'cursor': next_cursor, 'size': params.size} if next_cursor else None,
+        prev={'cursor': prev_cursor, 'size': params.size} if prev_cursor else None,
+    ).model_dump()
+    return {
+        'items': [select_as_dict(item) for item in items],
+        'total': None,
+        'page': None,
+        'size': params.size,
+        'total_pages': None,
+        'next_cursor': next_cursor,
+        'prev_cursor': prev_cursor,
+        'links': links,
+    }
+
+
+def _count_query(select: Select) -> tuple[Select, Table | None]:
+    """
+    Build a lean count query, ORDER BY and loader options are dropped
+
+    Single table queries are counted directly with the same WHERE clause, joined queries are
+    counted over a subquery of constants, GROUP BY and DISTINCT queries over the full subquery
+
+    :param select: SQL query statement
+    :return: count query and the counted table when counted directly
+    """
+    select = select.order_by(None)
+    if select._group_by_clauses or select._distinct or select._limit_clause is not None:
+        return sa_select(func.count()).select_from(select.subquery()), None
+    froms = select.get_final_froms()
+    if len(froms) == 1 and isinstance(froms[0], Table) and select._offset_clause is None:
+        stmt = sa_select(func.count()).select_from(froms[0])
+        if select.whereclause is not None:
+            stmt = stmt.where(select.whereclause)
+        return stmt, froms[0]
+    subquery = select.with_only_columns(literal(1), maintain_column_froms=True).subquery()
+    return sa_select(func.count()).select_from(subquery), None
+
+
+def _count_fingerprint(db: AsyncSession, stmt: Select) -> str:
+    """
+    Fingerprint a count query by its compiled SQL and bound filter values
+
+    :param db: Database session
+    :param stmt: Count query
+    :return:
+    """
+    compiled = stmt.compile(dialect=db.bind.dialect)
+    params = sorted((k, repr(v)) for k, v in compiled.params.items())
+    return hashlib.md5(f'{compiled}|{params}'.encode(), usedforsecurity=False).hexdigest()
+
+
+async def _estimate_count(db: AsyncSession, table: Table) -> int | None:
+    """
+    Read the planner row estimate of a table
+
+    :param db: Database session
+    :param table: Table
+    :return: estimated rows, None if unavailable
+    """
+    if db.bind.dialect.name == 'postgresql':
+        stmt = text('SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:name)')
+    else:
+        stmt = text(
+            'SELECT table_rows FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = :name'
+        )
+    estimate = await db.scalar(stmt, {'name': table.name})
+    # reltuples is -1 for tables that were never analyzed
+    if estimate is None or estimate < 0:
+        return None
+    return int(estimate)
+
+
+async def _count(db: AsyncSession, select: Select) -> tuple[int, bool, bool]:
+    """
+    Count the rows of a query, using the count cache and the optional estimate mode
+
+    :param db: Database session
+    :param select: SQL query statement
+    :return: total, whether it is exact and whether it was counted just now rather than cached or estimated
+    """
+    stmt, table = _count_query(select)
+    if settings.PAGINATION_COUNT_ESTIMATE and table is not None and select.whereclause is None:
+        estimate = await _estimate_count(db, table)
+        if estimate is not None and estimate >= settings.PAGINATION_COUNT_ESTIMATE_MIN_ROWS:
+            return estimate, False, False
+
+    if settings.PAGINATION_COUNT_CACHE_EXPIRE_SECONDS <= 0:
+        return await db.scalar(stmt), True, True
+    key = f'{settings.PAGINATION_COUNT_CACHE_REDIS_PREFIX}:{_count_fingerprint(db, stmt)}'
+    try:
+        cached = await redis_client.get(key)
+    except Exception as e:
+        log.warning(f'分页计数缓存读取失败：{e}')
+        return await db.scalar(stmt), True, True
+    if cached is not None:
+        return int(cached), True, False
+    total = await db.scalar(stmt)
+    try:
+        await redis_client.set(key, total, ex=settings.PAGINATION_COUNT_CACHE_EXPIRE_SECONDS)
+    except Exception as e:
+        log.warning(f'分页计数缓存写入失败：{e}')
+    return total, True, True
+
+
 async def paging_data(db: AsyncSession, select: Select) -> dict[str, Any]:
     """
-    Create pagination data based on SQLAlchemy
+    Create pagination data based on SQLAlchemy, use keyset pagination when the cursor parameter is passed
+
+    The total is counted by a lean count query and cached for a short time by the filter fingerprint,
+    so it may lag behind writes by up to ``PAGINATION_COUNT_CACHE_EXPIRE_SECONDS``
 
     :param db: Database session
     :param select: SQL query statement
     :return:
     """
-    paginated_data: _CustomPage = await apaginate(db, select)
+    params: _CustomPageParams = resolve_params()
+    if params.cursor is not None:
+        return await _keyset_paging_data(db, select, params)
+    total, exact, fresh = await _count(db, select)
+    raw_params = params.to_raw_params()
+    items = []
+    # A cached or estimated total may lag behind writes, only a fresh count can rule out the page
+    if raw_params.offset < total or not fresh:
+        result = await db.execute(select.limit(raw_params.limit).offset(raw_params.offset))
+        items = [select_as_dict(item) for item in result.unique().scalars().all()]
+    paginated_data = _CustomPage.create(items, params, total=total)
     page_data = paginated_data.model_dump()
+    page_data['total_exact'] = exact
     return page_data
 
 
@@ -3,9 +3,11 @@
 from typing import Any, Generic, TypeVar
 
 from fastapi import Response
+from msgspec import json
 from pydantic import BaseModel, Field
 
 from backend.common.response.response_code import CustomResponse, CustomResponseCode
+from backend.common.response.response_struct import encode_response
 from backend.utils.serializers import MsgSpecJSONResponse
 
 SchemaT = TypeVar('SchemaT')
@@ -123,19 +125,49 @@ class ResponseBase:
         *,
         res: CustomResponseCode | CustomResponse = CustomResponseCode.HTTP_200,
         data: Any | None = None,
+        schema: Any = None,
     ) -> Response:
         """
-        This method was created to improve the interface response speed, and has significant performance improvements when parsing large json, but will lose pydantic parsing and validation
+        This method was created to improve the interface response speed, and has significant performance improvements when parsing large json
+
+        Without a schema the data is encoded as is, losing pydantic parsing and validation. With a schema the data
+        (ORM objects, dicts or lists of them) is validated against the precompiled msgspec mirror of the schema and
+        encoded in a single pass; schemas with custom validators or serializers fall back to one pydantic pass
 
         .. warning::
 
-            When using this return method, you cannot specify the interface parameters response_model and arrow return type
+            FastAPI skips response_model validation for the returned response, declare response_model in the route
+            decorator only for the interface documentation
 
         :param res: Return information
         :param data: Return data
+        :param schema: Return data model
+        :return:
+        """
+        if schema is None:
+            return MsgSpecJSONResponse({'code': res.code, 'msg': res.msg, 'data': data})
+        content = encode_response(code=res.code, msg=res.msg, data=data, schema=schema)
+        return Response(content, media_type='application/json')
+
+    @staticmethod
+    def encoded_success(
+        *,
+        res: CustomResponseCode | CustomResponse = CustomResponseCode.HTTP_200,
+        data: bytes,
+    ) -> Response:
+        """
+        Successful response with pre-encoded JSON data, the data is written to the body as is without serialization
+
+        .. warning::
+
+            The data must be valid JSON, it is not validated by response_model
+
+        :param res: Return information
+        :param data: Pre-encoded JSON data
         :return:
         """
-        return MsgSpecJSONResponse({'code': res.code, 'msg': res.msg, 'data': data})
+        head = json.encode({'code': res.code, 'msg': res.msg})
+        return Response(head[:-1] + b',"data":' + data + b'}', media_type='application/json')
 
 
 response_base: ResponseBase = ResponseBase()
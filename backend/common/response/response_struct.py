@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import collections.abc
+import copy
+import types
+import weakref
+
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from enum import Enum
+from functools import lru_cache
+from typing import Annotated, Any, Callable, Literal, Union, get_args, get_origin
+from uuid import UUID
+
+import msgspec
+
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, TypeAdapter
+
+from backend.common.log import log
+
+# msgspec 原生支持的类型，镜像时保持不变
+NATIVE_TYPES = (int, float, str, bool, bytes, datetime, date, time, timedelta, Decimal, UUID)
+
+SEQUENCE_ORIGINS = (
+    list,
+    set,
+    frozenset,
+    collections.abc.Sequence,
+    collections.abc.MutableSequence,
+    collections.abc.Set,
+    collections.abc.MutableSet,
+    collections.abc.Iterable,
+)
+
+MAPPING_ORIGINS = (dict, collections.abc.Mapping, collections.abc.MutableMapping)
+
+
+class _Encoded(str):
+    """按模型 json_encoders 预先编码的值，如按 DATETIME_FORMAT 格式化的时间"""
+
+    source: type
+    encoder: Callable[[Any], str]
+
+
+class _Unsupported(Exception):
+    """模型无法镜像为结构体，如包含校验器、序列化器或递归引用"""
+
+
+@lru_cache(maxsize=None)
+def _encoded_type(source: type, encoder: Callable[[Any], str]) -> type[_Encoded]:
+    return type(f'Encoded{source.__name__}', (_Encoded,), {'source': source, 'encoder': staticmethod(encoder)})
+
+
+def _dec_hook(type_: type, obj: Any) -> Any:
+    if isinstance(type_, type) and issubclass(type_, _Encoded):
+        if isinstance(obj, _Encoded):
+            return obj
+        return type_(type_.encoder(msgspec.convert(obj, type_.source, strict=False)))
+    raise NotImplementedError
+
+
+def _enc_hook(obj: Any) -> Any:
+    if isinstance(obj, _Encoded):
+        return str(obj)
+    raise NotImplementedError(f'不支持的类型：{type(obj)}')
+
+
+_encoder = msgspec.json.Encoder(enc_hook=_enc_hook)
+
+# 弱引用键，稀疏字段集等动态生成的模型被回收后对应结构体随之释放
+_model_structs: weakref.WeakKeyDictionary[type[BaseModel], type[msgspec.Struct]] = weakref.WeakKeyDictionary()
+
+
+def _mirror(tp: Any, encoders: dict[Any, Callable], building: set[type]) -> Any:
+    """
+    将 pydantic 字段类型转换为 msgspec 可校验的类型
+
+    :param tp: 字段类型
+    :param encoders: 所属模型的 json_encoders
+    :param building: 正在构建的模型，用于检测递归引用
+    :return:
+    """
+    if tp is Any or tp is None or tp is type(None):
+        return tp
+    origin = get_origin(tp)
+    if origin is Annotated:
+        return _mirror(get_args(tp)[0], encoders, building)
+    if origin is Union or origin is types.UnionType:
+        return Union[tuple(_mirror(arg, encoders, building) for arg in get_args(tp))]  # noqa: UP007
+    if origin is Literal:
+        return tp
+    if origin is tuple:
+        args = get_args(tp)
+        if len(args) == 2 and args[1] is Ellipsis:
+            return list[_mirror(args[0], encoders, building)]
+        return tuple[tuple(_mirror(arg, encoders, building) for arg in args)]
+    if origin in SEQUENCE_ORIGINS:
+        args = get_args(tp)
+        return list[_mirror(args[0], encoders, building)] if args else list
+    if origin in MAPPING_ORIGINS:
+        args = get_args(tp)
+        if not args:
+            return dict
+        return dict[_mirror(args[0], encoders, building), _mirror(args[1], encoders, building)]
+    if origin is not None:
+        raise _Unsupported(f'不支持的泛型类型：{tp}')
+    if tp in (list, tuple, set, frozenset):
+        return list
+    if isinstance(tp, type):
+        if issubclass(tp, BaseModel):
+            return _model_struct(tp, building)
+        if tp in NATIVE_TYPES or issubclass(tp, Enum):
+            encoder = encoders.get(tp)
+            return _encoded_type(tp, encoder) if encoder else tp
+    # 其余类型（如 EmailStr、HttpUrl）原样透传
+    return Any
+
+
+def _model_struct(model: type[BaseModel], building: set[type]) -> type[msgspec.Struct]:
+    """
+    生成 pydantic 模型的结构体镜像
+
+    :param model: pydantic 模型
+    :param building: 正在构建的模型，用于检测递归引用
+    :return:
+    """
+    struct = _model_structs.get(model)
+    if struct is not None:
+        return struct
+    if model in building:
+        raise _Unsupported(f'{model.__name__} 存在递归引用')
+    decorators = model.__pydantic_decorators__
+    if (
+        decorators.validators
+        or decorators.field_validators
+        or decorators.root_validators
+        or decorators.model_validators
+        or decorators.field_serializers
+        or decorators.model_serializers
+        or decorators.computed_fields
+    ):
+        raise _Unsupported(f'{model.__name__} 包含自定义校验器或序列化器')
+
+    building.add(model)
+    encoders = model.model_config.get('json_encoders') or {}
+    fields = []
+    for name, info in model.model_fields.items():
+        if info.exclude:
+            continue
+        alias = info.serialization_alias or info.alias or name
+        if info.is_required():
+            default = msgspec.field(name=alias)
+        elif info.default_factory is not None:
+            default = msgspec.field(default_factory=info.default_factory, name=alias)
+        elif isinstance(info.default, (list, dict, set)) and info.default:
+            default = msgspec.field(default_factory=lambda d=info.default: copy.deepcopy(d), name=alias)
+        else:
+            default = msgspec.field(default=info.default, name=alias)
+        fields.append((name, _mirror(info.annotation, encoders, building), default))
+    building.discard(model)
+
+    struct = msgspec.defstruct(model.__name__, fields, kw_only=True)
+    _model_structs[model] = struct
+    return struct
+
+
+@lru_cache(maxsize=1024)
+def compile_response_struct(schema: Any) -> Any | None:
+    """
+    编译响应数据模型的 msgspec 结构体镜像
+
+    :param schema: 响应数据模型，如 GetUserDetail、list[GetUserDetail]、PageData[GetUserDetail]
+    :return: 无法镜像时返回 None，编码时回退为 pydantic 单次校验和序列化
+    """
+    try:
+        mirror = _mirror(schema, {}, set())
+        # 提前构建类型信息，无效的联合类型等在编译时即报错
+        msgspec.json.Decoder(mirror, dec_hook=_dec_hook)
+    except (_Unsupported, TypeError) as e:
+        log.debug(f'响应模型 {schema} 回退为 pydantic 序列化：{e}')
+        return None
+    return mirror
+
+
+@lru_cache(maxsize=1024)
+def _type_adapter(schema: Any) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def encode_response(*, code: int, msg: str, data: Any, schema: Any) -> bytes:
+    """
+    按响应数据模型校验并编码统一返回结构，ORM 对象直接按属性转换，全程仅校验和编码一次
+
+    :param code: 返回状态码
+    :param msg: 返回信息
+    :param data: 返回数据，可为 ORM 对象、字典或其列表
+    :param schema: 响应数据模型
+    :return:
+    """
+    mirror = compile_response_struct(schema)
+    if mirror is None:
+        adapter = _type_adapter(schema)
+        data = adapter.dump_python(adapter.validate_python(data, from_attributes=True), mode='json')
+    else:
+        data = msgspec.convert(data, mirror, from_attributes=True, strict=False, dec_hook=_dec_hook)
+    return _encoder.encode({'code': code, 'msg': msg, 'data': data})
+
+
+def compile_route_structs(routes: list[Any]) -> int:
+    """
+    预编译路由响应模型的结构体镜像，避免首个请求承担编译开销
+
+    :param routes: 应用路由
+    :return: 成功镜像的响应模型数量
+    """
+    from backend.common.response.response_schema import ResponseSchemaModel
+
+    count = 0
+    for route in routes:
+        if not isinstance(route, APIRoute):
+            continue
+        model = route.response_model
+        if isinstance(model, type) and issubclass(model, ResponseSchemaModel):
+            if compile_response_struct(model.model_fields['data'].annotation) is not None:
+                count += 1
+    return count
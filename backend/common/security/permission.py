@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-from typing import TYPE_CHECKING
+from collections import OrderedDict
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Iterable
 
 from fastapi import Request
 from sqlalchemy import ColumnElement, and_, or_
@@ -11,6 +13,7 @@ from backend.common.enums import RoleDataRuleExpressionType, RoleDataRuleOperato
 from backend.common.exception import errors
 from backend.common.exception.errors import ServerError
 from backend.core.conf import settings
+from backend.database.redis import redis_client
 from backend.utils.import_parse import dynamic_import_data_model
 
 if TYPE_CHECKING:
@@ -49,85 +52,81 @@ class RequestPermission:
             request.state.permission = self.value
 
 
-async def filter_data_permission(db: AsyncSession, request: Request) -> ColumnElement[bool]:
-    """
-    过滤数据权限，控制用户可见数据范围
+# 已编译的数据权限过滤条件，键为启用的数据范围及数据范围、数据规则的代数
+_data_permission_cache: OrderedDict[tuple[frozenset[int], int, int], ColumnElement[bool]] = OrderedDict()
 
-    使用场景：
-        - 控制用户能看到哪些数据
 
-    :param db: 数据库会话
-    :param request: FastAPI 请求对象
+@lru_cache
+def _get_data_permission_model(name: str) -> tuple[Any, frozenset[str]]:
+    """
+    获取数据规则模型及其可过滤列
+
+    :param name: 数据规则模型名
     :return:
     """
-    # 获取用户角色和数据范围
-    data_scopes = []
-    for role in request.user.roles:
-        for scope in role.scopes:
-            if scope.status:
-                data_scopes.append(scope)
+    if name not in settings.DATA_PERMISSION_MODELS:
+        raise errors.NotFoundError(msg='数据规则模型不存在')
+    model_ins = dynamic_import_data_model(settings.DATA_PERMISSION_MODELS[name])
+    columns = frozenset(
+        key for key in model_ins.__table__.columns.keys() if key not in settings.DATA_PERMISSION_COLUMN_EXCLUDE
+    )
+    return model_ins, columns
 
-    # 超级管理员和无规则用户不做过滤
-    if request.user.is_superuser or not data_scopes:
-        return or_(1 == 1)
 
-    # 获取数据范围规则
-    data_rule_list: list[DataRule] = []
-    for data_scope in data_scopes:
-        data_scope_with_relation = await data_scope_dao.get_with_relation(db, data_scope.id)
-        data_rule_list.extend(data_scope_with_relation.rules)
+def _build_data_rule_condition(data_rule: 'DataRule') -> ColumnElement[bool] | None:
+    """
+    构建单条数据规则的过滤条件
 
-    # 去重
-    seen_data_rule_ids = set()
-    new_data_rule_list = []
-    for rule in data_rule_list:
-        if rule.id not in seen_data_rule_ids:
-            seen_data_rule_ids.add(rule.id)
-            new_data_rule_list.append(rule)
+    :param data_rule: 数据规则
+    :return:
+    """
+    # 验证规则模型和列
+    model_ins, model_columns = _get_data_permission_model(data_rule.model)
+    column = data_rule.column
+    if column not in model_columns:
+        raise errors.NotFoundError(msg='数据规则模型列不存在')
+
+    column_obj = getattr(model_ins, column)
+    match data_rule.expression:
+        case RoleDataRuleExpressionType.eq:
+            return column_obj == data_rule.value
+        case RoleDataRuleExpressionType.ne:
+            return column_obj != data_rule.value
+        case RoleDataRuleExpressionType.gt:
+            return column_obj > data_rule.value
+        case RoleDataRuleExpressionType.ge:
+            return column_obj >= data_rule.value
+        case RoleDataRuleExpressionType.lt:
+            return column_obj < data_rule.value
+        case RoleDataRuleExpressionType.le:
+            return column_obj <= data_rule.value
+        case RoleDataRuleExpressionType.in_:
+            values = data_rule.value.split(',') if isinstance(data_rule.value, str) else data_rule.value
+            return column_obj.in_(values)
+        case RoleDataRuleExpressionType.not_in:
+            values = data_rule.value.split(',') if isinstance(data_rule.value, str) else data_rule.value
+            return column_obj.not_in(values)
+    return None
+
+
+def compile_data_rules(data_rules: Iterable['DataRule']) -> ColumnElement[bool]:
+    """
+    将数据规则编译为过滤条件，结果不依赖请求，可在多次查询间复用
 
+    :param data_rules: 数据规则
+    :return:
+    """
     where_and_list = []
     where_or_list = []
-
-    for data_rule in new_data_rule_list:
-        # 验证规则模型
-        rule_model = data_rule.model
-        if rule_model not in settings.DATA_PERMISSION_MODELS:
-            raise errors.NotFoundError(msg='数据规则模型不存在')
-        model_ins = dynamic_import_data_model(settings.DATA_PERMISSION_MODELS[rule_model])
-
-        # 验证规则列
-        model_columns = [
-            key for key in model_ins.__table__.columns.keys() if key not in settings.DATA_PERMISSION_COLUMN_EXCLUDE
-        ]
-        column = data_rule.column
-        if column not in model_columns:
-            raise errors.NotFoundError(msg='数据规则模型列不存在')
-
-        # 构建过滤条件
-        column_obj = getattr(model_ins, column)
-        rule_expression = data_rule.expression
-        condition = None
-        match rule_expression:
-            case RoleDataRuleExpressionType.eq:
-                condition = column_obj == data_rule.value
-            case RoleDataRuleExpressionType.ne:
-                condition = column_obj != data_rule.value
-            case RoleDataRuleExpressionType.gt:
-                condition = column_obj > data_rule.value
-            case RoleDataRuleExpressionType.ge:
-                condition = column_obj >= data_rule.value
-            case RoleDataRuleExpressionType.lt:
-                condition = column_obj < data_rule.value
-            case RoleDataRuleExpressionType.le:
-                condition = column_obj <= data_rule.value
-            case RoleDataRuleExpressionType.in_:
-                values = data_rule.value.split(',') if isinstance(data_rule.value, str) else data_rule.value
-                condition = column_obj.in_(values)
-            case RoleDataRuleExpressionType.not_in:
-                values = data_rule.value.split(',') if isinstance(data_rule.value, str) else data_rule.value
-                condition = column_obj.not_in(values)
+    seen_data_rule_ids = set()
+    for data_rule in data_rules:
+        # 去重
+        if data_rule.id in seen_data_rule_ids:
+            continue
+        seen_data_rule_ids.add(data_rule.id)
 
         # 根据运算符添加到对应列表
+        condition = _build_data_rule_condition(data_rule)
         if condition is not None:
             match data_rule.operator:
                 case RoleDataRuleOperatorType.AND:
@@ -143,3 +142,48 @@ async def filter_data_permission(db: AsyncSession, request: Request) -> ColumnEl
         where_list.append(or_(*where_or_list))
 
     return or_(*where_list) if where_list else or_(1 == 1)
+
+
+async def filter_data_permission(db: AsyncSession, request: Request) -> ColumnElement[bool]:
+    """
+    过滤数据权限，控制用户可见数据范围
+
+    使用场景：
+        - 控制用户能看到哪些数据
+
+    编译结果按启用的数据范围及数据范围、数据规则的代数缓存在进程内，命中时仅读取一次代数，不产生数据库查询；
+    数据范围或规则变更时递增代数并清除相关用户缓存，从而使用新的缓存键
+
+    :param db: 数据库会话
+    :param request: FastAPI 请求对象
+    :return:
+    """
+    # 获取用户角色和数据范围
+    data_scopes = {}
+    for role in request.user.roles:
+        for scope in role.scopes:
+            if scope and scope.status:
+                data_scopes[scope.id] = scope
+
+    # 超级管理员和无规则用户不做过滤
+    if request.user.is_superuser or not data_scopes:
+        return or_(1 == 1)
+
+    scope_generation, rule_generation = await redis_client.get_generations('data_scope', 'data_rule')
+    cache_key = (frozenset(data_scopes), scope_generation, rule_generation)
+    where = _data_permission_cache.get(cache_key)
+    if where is not None:
+        _data_permission_cache.move_to_end(cache_key)
+        return where
+
+    # 获取数据范围规则
+    data_rule_list: list[DataRule] = []
+    for data_scope_with_relation in await data_scope_dao.load_with_relation(db, list(data_scopes)):
+        if data_scope_with_relation:
+            data_rule_list.extend(data_scope_with_relation.rules)
+
+    where = compile_data_rules(data_rule_list)
+    _data_permission_cache[cache_key] = where
+    if len(_data_permission_cache) > settings.DATA_PERMISSION_CACHE_SIZE:
+        _data_permission_cache.popitem(last=False)
+    return where
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from functools import lru_cache
+from typing import Annotated, Any
+
+from fastapi import Depends, Query
+from pydantic import BaseModel, create_model
+from sqlalchemy import Select, inspect
+from sqlalchemy.orm import load_only
+from sqlalchemy.sql import visitors
+
+from backend.common.exception import errors
+
+
+@lru_cache(maxsize=256)
+def _partial_schema(schema: type[BaseModel], names: frozenset[str]) -> type[BaseModel]:
+    """
+    生成仅包含指定字段的响应模型，字段顺序、约束和模型配置与原模型一致
+
+    :param schema: 响应模型
+    :param names: 字段名
+    :return:
+    """
+    fields = {name: (info.annotation, info) for name, info in schema.model_fields.items() if name in names}
+    return create_model(f'{schema.__name__}Partial', __config__=schema.model_config, **fields)  # type: ignore
+
+
+class FieldSet:
+    """列表接口请求的稀疏字段集"""
+
+    def __init__(self, schema: type[BaseModel], names: frozenset[str] | None = None) -> None:
+        """
+        初始化字段集
+
+        :param schema: 响应模型
+        :param names: 请求的字段名，为空时表示全部字段
+        :return:
+        """
+        self.names = names
+        self.schema = schema if names is None else _partial_schema(schema, names)
+
+    def __contains__(self, name: str) -> bool:
+        return self.names is None or name in self.names
+
+    def project(self, stmt: Select) -> Select:
+        """
+        按字段裁剪查询的列，主键、排序列、字段依赖列及所请求关联的外键始终加载；未请求的关联需由 DAO 设置 noload
+
+        :param stmt: 单模型查询
+        :return:
+        """
+        if self.names is None:
+            return stmt
+        entity = stmt.column_descriptions[0]['entity']
+        mapper = inspect(entity)
+        # 非映射属性的字段（如计算字段）无法确定依赖的列，保持加载全部列
+        if not all(name in mapper.attrs for name in self.names):
+            return stmt
+
+        column_keys = {column: prop.key for prop in mapper.column_attrs for column in prop.columns}
+        keys = {name for name in self.names if name in mapper.column_attrs}
+        keys.update(column_keys[column] for column in mapper.primary_key)
+        for clause in stmt._order_by_clauses:
+            keys.update(column_keys[element] for element in visitors.iterate(clause) if element in column_keys)
+        # 字段依赖的其他列，如压缩存储的字段需同时加载压缩列，由模型的 __sparse_dependencies__ 声明
+        dependencies = getattr(entity, '__sparse_dependencies__', {})
+        for name in self.names:
+            keys.update(dependencies.get(name, ()))
+            if name in mapper.relationships:
+                relationship = mapper.relationships[name]
+                keys.update(column_keys[column] for column in relationship.local_columns if column in column_keys)
+        return stmt.options(load_only(*(getattr(entity, key) for key in keys)))
+
+
+class SparseFields:
+    """稀疏字段集依赖，解析并校验 fields 查询参数"""
+
+    def __init__(self, schema: type[BaseModel]) -> None:
+        """
+        初始化依赖
+
+        :param schema: 响应模型，字段名以其顶层字段为准
+        :return:
+        """
+        decorators = schema.__pydantic_decorators__
+        if decorators.field_validators or decorators.model_validators:
+            raise ValueError(f'{schema.__name__} 包含自定义校验器，不支持稀疏字段集')
+        self.schema = schema
+
+    def __call__(
+        self,
+        fields: Annotated[str | None, Query(description='返回字段，多个字段以 , 分隔，为空时返回全部字段')] = None,
+    ) -> FieldSet:
+        if not fields:
+            return FieldSet(self.schema)
+        names = frozenset(name.strip() for name in fields.split(',') if name.strip())
+        invalid = names - self.schema.model_fields.keys()
+        if invalid:
+            raise errors.RequestError(msg=f'无效的返回字段：{", ".join(sorted(invalid))}')
+        return FieldSet(self.schema, names or None)
+
+
+def sparse_fields(schema: type[BaseModel]) -> Any:
+    """
+    稀疏字段集依赖，用法：fields: Annotated[FieldSet, sparse_fields(GetDetail)]
+
+    :param schema: 响应模型
+    :return:
+    """
+    return Depends(SparseFields(schema))
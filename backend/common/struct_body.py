@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import json
+import types
+
+from enum import Enum
+from functools import lru_cache
+from typing import Annotated, Any, Literal, Union, get_args, get_origin
+
+import annotated_types
+import msgspec
+
+from fastapi import Body, Depends, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from fastapi.utils import create_model_field
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from pydantic.fields import FieldInfo
+from starlette.routing import BaseRoute
+
+from backend.common.log import log
+from backend.common.response.response_struct import MAPPING_ORIGINS, NATIVE_TYPES, SEQUENCE_ORIGINS
+
+# annotated_types 约束与 msgspec.Meta 参数的对应关系
+_CONSTRAINTS = {
+    annotated_types.Gt: 'gt',
+    annotated_types.Ge: 'ge',
+    annotated_types.Lt: 'lt',
+    annotated_types.Le: 'le',
+    annotated_types.MultipleOf: 'multiple_of',
+    annotated_types.MinLen: 'min_length',
+    annotated_types.MaxLen: 'max_length',
+}
+
+
+class _Unsupported(Exception):
+    """模型无法镜像为结构体，如包含校验器、非原生类型或无法映射的约束"""
+
+
+_struct_models: dict[type[msgspec.Struct], type[BaseModel]] = {}
+_model_structs: dict[type[BaseModel], type[msgspec.Struct]] = {}
+
+
+def _meta(metadata: list[Any]) -> dict[str, Any]:
+    """
+    将 pydantic 约束转换为 msgspec.Meta 参数
+
+    :param metadata: 字段约束
+    :return:
+    """
+    meta = {}
+    for item in metadata:
+        if isinstance(item, FieldInfo):
+            meta.update(_meta(item.metadata))
+            continue
+        key = _CONSTRAINTS.get(type(item))
+        if key is not None:
+            meta[key] = getattr(item, key)
+            continue
+        # Field(pattern=...) 等以通用元数据表示，仅支持正则
+        extra = {k: v for k, v in vars(item).items() if v is not None} if hasattr(item, '__dict__') else None
+        if extra is None or set(extra) - {'pattern'}:
+            raise _Unsupported(f'不支持的约束：{item!r}')
+        meta.update(extra)
+    return meta
+
+
+def _constrained(tp: Any, metadata: list[Any]) -> Any:
+    meta = _meta(metadata)
+    return Annotated[tp, msgspec.Meta(**meta)] if meta else tp
+
+
+def _mirror(tp: Any, building: set[type]) -> Any:
+    """
+    将 pydantic 字段类型转换为 msgspec 可校验的类型
+
+    :param tp: 字段类型
+    :param building: 正在构建的模型，用于检测递归引用
+    :return:
+    """
+    if tp is Any or tp is None or tp is type(None):
+        return tp
+    origin = get_origin(tp)
+    if origin is Annotated:
+        base, *metadata = get_args(tp)
+        return _constrained(_mirror(base, building), metadata)
+    if origin is Union or origin is types.UnionType:
+        return Union[tuple(_mirror(arg, building) for arg in get_args(tp))]  # noqa: UP007
+    if origin is Literal:
+        return tp
+    if origin is tuple:
+        args = get_args(tp)
+        if len(args) == 2 and args[1] is Ellipsis:
+            return list[_mirror(args[0], building)]
+        return tuple[tuple(_mirror(arg, building) for arg in args)]
+    if origin in SEQUENCE_ORIGINS:
+        args = get_args(tp)
+        return list[_mirror(args[0], building)] if args else list
+    if origin in MAPPING_ORIGINS:
+        args = get_args(tp)
+        return dict[_mirror(args[0], building), _mirror(args[1], building)] if args else dict
+    if origin is None and isinstance(tp, type):
+        if issubclass(tp, BaseModel):
+            return _model_struct(tp, building)
+        if tp in NATIVE_TYPES or issubclass(tp, Enum):
+            return tp
+    # EmailStr、HttpUrl 等类型的校验语义无法等价映射
+    raise _Unsupported(f'不支持的类型：{tp}')
+
+
+def _model_struct(model: type[BaseModel], building: set[type]) -> type[msgspec.Struct]:
+    """
+    生成 pydantic 模型的请求体结构体镜像，未传入的可选字段为 UNSET，以保留 model_fields_set
+
+    :param model: pydantic 模型
+    :param building: 正在构建的模型，用于检测递归引用
+    :return:
+    """
+    struct = _model_structs.get(model)
+    if struct is not None:
+        return struct
+    if model in building:
+        raise _Unsupported(f'{model.__name__} 存在递归引用')
+    decorators = model.__pydantic_decorators__
+    if (
+        decorators.validators
+        or decorators.field_validators
+        or decorators.root_validators
+        or decorators.model_validators
+    ):
+        raise _Unsupported(f'{model.__name__} 包含自定义校验器')
+    if model.model_config.get('strict'):
+        raise _Unsupported(f'{model.__name__} 为严格模式')
+
+    building.add(model)
+    fields = []
+    for name, info in model.model_fields.items():
+        alias = info.validation_alias or info.alias or name
+        if not isinstance(alias, str):
+            raise _Unsupported(f'{model.__name__}.{name} 不支持 AliasPath 或 AliasChoices')
+        tp = _constrained(_mirror(info.annotation, building), info.metadata)
+        if info.is_required():
+            fields.append((name, tp, msgspec.field(name=alias)))
+        else:
+            fields.append((name, tp | msgspec.UnsetType, msgspec.field(default=msgspec.UNSET, name=alias)))
+    building.discard(model)
+
+    struct = msgspec.defstruct(
+        model.__name__,
+        fields,
+        kw_only=True,
+        forbid_unknown_fields=model.model_config.get('extra') == 'forbid',
+    )
+    _model_structs[model] = struct
+    _struct_models[struct] = model
+    return struct
+
+
+@lru_cache(maxsize=None)
+def compile_body_decoder(schema: Any) -> msgspec.json.Decoder | None:
+    """
+    编译请求体模型的 msgspec 解码器
+
+    :param schema: 请求体模型
+    :return: 无法镜像时返回 None，由 pydantic 校验
+    """
+    try:
+        return msgspec.json.Decoder(_mirror(schema, set()), strict=False)
+    except (_Unsupported, TypeError) as e:
+        log.warning(f'请求体模型 {schema} 无法使用 msgspec 校验，回退为 pydantic：{e}')
+        return None
+
+
+def _to_python(value: Any, use_enum_values: bool = False) -> Any:
+    """
+    将解码得到的结构体转换为 pydantic 模型实例，不重复校验
+
+    :param value: 解码值
+    :param use_enum_values: 所属模型是否配置了 use_enum_values
+    :return:
+    """
+    model = _struct_models.get(type(value))
+    if model is not None:
+        enum_values = bool(model.model_config.get('use_enum_values'))
+        data = {}
+        for name in value.__struct_fields__:
+            field_value = getattr(value, name)
+            if field_value is not msgspec.UNSET:
+                data[name] = _to_python(field_value, enum_values)
+        # 未传入的字段由 model_construct 填充默认值（深拷贝），且不计入 model_fields_set
+        return model.model_construct(**data)
+    if isinstance(value, list):
+        return [_to_python(item, use_enum_values) for item in value]
+    if isinstance(value, dict):
+        return {key: _to_python(item, use_enum_values) for key, item in value.items()}
+    if use_enum_values and isinstance(value, Enum):
+        return value.value
+    return value
+
+
+@lru_cache(maxsize=None)
+def _type_adapter(schema: Any) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+class StructBody:
+    """
+    使用 msgspec 解码并校验请求体的依赖
+
+    校验通过时直接构造 pydantic 模型实例，服务层无需改动；校验失败或模型无法镜像时交由 pydantic 重新校验，
+    错误格式与 FastAPI 请求体校验一致，同样由全局校验异常处理器处理
+    """
+
+    def __init__(self, schema: Any) -> None:
+        """
+        初始化请求体依赖
+
+        :param schema: 请求体模型
+        :return:
+        """
+        self.schema = schema
+
+    async def __call__(self, request: Request) -> Any:
+        body = await request.body()
+        if not body:
+            raise RequestValidationError(
+                [{'type': 'missing', 'loc': ('body',), 'msg': 'Field required', 'input': None}], body=body
+            )
+        decoder = compile_body_decoder(self.schema)
+        if decoder is not None:
+            try:
+                return _to_python(decoder.decode(body))
+            except msgspec.DecodeError:
+                # 以 pydantic 的结果为准，msgspec 更严格的输入（如非 RFC 3339 时间）仍可通过
+                pass
+        # 与 FastAPI 请求体的解析和校验方式保持一致，错误格式相同
+        try:
+            data = json.loads(body)
+        except json.JSONDecodeError as e:
+            raise RequestValidationError(
+                [
+                    {
+                        'type': 'json_invalid',
+                        'loc': ('body', e.pos),
+                        'msg': 'JSON decode error',
+                        'input': {},
+                        'ctx': {'error': e.msg},
+                    }
+                ],
+                body=e.doc,
+            )
+        try:
+            return _type_adapter(self.schema).validate_python(data, from_attributes=True)
+        except ValidationError as e:
+            errors = [{**error, 'loc': ('body', *error['loc'])} for error in e.errors(include_url=False)]
+            raise RequestValidationError(errors, body=data)
+
+
+def struct_body(schema: Any) -> Any:
+    """
+    msgspec 请求体依赖，用法：obj: Annotated[CreateParam, struct_body(CreateParam)]
+
+    :param schema: 请求体模型
+    :return:
+    """
+    return Depends(StructBody(schema))
+
+
+def bind_struct_body(routes: list[BaseRoute]) -> None:
+    """
+    为使用 msgspec 请求体依赖的路由补充接口文档中的请求体，并预编译解码器
+
+    路由处理函数在路由创建时已构建完成，此处设置的 body_field 仅用于生成 OpenAPI 文档，不会触发 FastAPI 的请求体校验
+
+    :param routes: 应用路由列表
+    :return:
+    """
+    for route in routes:
+        if not isinstance(route, APIRoute) or route.body_field is not None:
+            continue
+        for dependant in route.dependant.dependencies:
+            if isinstance(dependant.call, StructBody):
+                schema = dependant.call.schema
+                compile_body_decoder(schema)
+                field_info = Body()
+                field_info.annotation = schema
+                route.body_field = create_model_field(
+                    name=f'body_{route.unique_id}', type_=schema, required=True, field_info=field_info
+                )
+                break
@@ -57,8 +57,54 @@ class Settings(BaseSettings):
     DATABASE_SCHEMA: str = 'fba'
     DATABASE_CHARSET: str = 'utf8mb4'
 
+    # 数据库连接池，按 worker 数量调整，每个 worker 最大连接数为 POOL_SIZE + POOL_MAX_OVERFLOW
+    DATABASE_POOL_SIZE: int = 10  # 低：- 高：+
+    DATABASE_POOL_MAX_OVERFLOW: int = 20  # 低：- 高：+
+    DATABASE_POOL_TIMEOUT: int = 30  # 低：+ 高：-
+    DATABASE_POOL_RECYCLE: int = 3600  # 低：+ 高：-
+    DATABASE_POOL_PRE_PING: bool = True  # 低：False 高：True
+    DATABASE_POOL_USE_LIFO: bool = False  # 低：False 高：True
+    DATABASE_POOL_PREWARM: bool = False  # 启动时预先建立 POOL_SIZE 个连接
+
+    # 数据库语句缓存
+    DATABASE_QUERY_CACHE_SIZE: int = 500  # SQLAlchemy 语句编译缓存大小
+    DATABASE_PREPARED_STATEMENT_CACHE_SIZE: int = 100  # asyncpg 预处理语句缓存大小，MySQL 无效
+    DATABASE_PGBOUNCER: bool = False  # 通过 PgBouncer 事务/语句池连接时开启，将禁用预处理语句缓存
+
+    # 请求级数据库会话，请求内的服务共享同一会话，写事务块退出时提交，路由函数返回后释放连接
+    DATABASE_REQUEST_SESSION: bool = False
+
+    # 数据库只读副本，格式为 host:port，账号密码与主库一致
+    DATABASE_REPLICA_HOSTS: list[str] = []
+    DATABASE_REPORTING_REPLICA_HOSTS: list[str] = []  # 报表副本，用于日志列表、导出等报表类查询
+    DATABASE_REPLICA_STICKY_SECONDS: int = 5  # 用户写入后在此时长内读取主库
+    DATABASE_REPLICA_STICKY_REDIS_PREFIX: str = 'fba:db:sticky'
+    DATABASE_REPLICA_HEALTH_CHECK_INTERVAL: int = 10
+    DATABASE_REPLICA_HEALTH_CHECK_TIMEOUT: int = 3
+
     # Redis
     REDIS_TIMEOUT: int = 5
+    GENERATION_REDIS_PREFIX: str = 'fba:generation'
+
+    # 分页
+    PAGINATION_COUNT_CACHE_REDIS_PREFIX: str = 'fba:pagination:count'
+    PAGINATION_COUNT_CACHE_EXPIRE_SECONDS: int = 10  # 总数缓存时长，按过滤条件缓存，0 为禁用
+    PAGINATION_COUNT_ESTIMATE: bool = False  # 无过滤条件时使用数据库统计信息估算总数
+    PAGINATION_COUNT_ESTIMATE_MIN_ROWS: int = 100000  # 估算行数低于此值时仍精确计数
+
+    # 菜单
+    MENU_TREE_CACHE_REDIS_PREFIX: str = 'fba:menu:tree'
+    MENU_TREE_CACHE_EXPIRE_SECONDS: int = 60 * 60 * 24  # 按角色组合和菜单代数缓存，菜单变更后自动失效
+    MENU_TREE_CACHE_SIZE: int = 256  # 进程内缓存的菜单树数量
+
+    # 数据导出
+    EXPORT_BATCH_SIZE: int = 1000  # 服务端游标每批读取行数，同时也是响应分块大小
+    EXPORT_GZIP_LEVEL: int = 6
+
+    # 用户导入
+    USER_IMPORT_BATCH_SIZE: int = 500  # 每个事务插入的用户数
+    USER_IMPORT_HASH_CONCURRENCY: int = 8  # 并行计算密码哈希的线程数
+    USER_IMPORT_BACKGROUND_ROWS: int = 1000  # 超过此行数时转为后台任务导入
 
     # Token
     TOKEN_ALGORITHM: str = 'HS256'
@@ -98,6 +144,11 @@ class Settings(BaseSettings):
         'created_time',
         'updated_time',
     ]
+    DATA_PERMISSION_CACHE_SIZE: int = 1024  # 进程内缓存的已编译数据权限过滤条件数量
+
+    # 部门、菜单层级索引（闭包表），开启前需执行 backend/scripts/hierarchy.py rebuild 初始化已有数据
+    HIERARCHY_CLOSURE_ENABLED: bool = False
+    HIERARCHY_MAX_DEPTH: int = 64  # 未开启闭包表时递归查询的最大深度
 
     # Socket.IO
     WS_NO_AUTH_MARKER: str = 'internal'
@@ -114,6 +165,27 @@ class Settings(BaseSettings):
     # 中间件配置
     MIDDLEWARE_CORS: bool = True
     MIDDLEWARE_ACCESS: bool = True
+    MIDDLEWARE_COMPRESS: bool = True
+
+    # 响应压缩
+    COMPRESS_ENCODINGS: list[str] = ['zstd', 'br', 'gzip']  # 按服务端优先级排列，br 需安装 brotli
+    COMPRESS_MINIMUM_SIZE: int = 1024  # 小于此值（字节）的响应不压缩，流式响应始终压缩
+    COMPRESS_ZSTD_LEVEL: int = 3
+    COMPRESS_BROTLI_LEVEL: int = 4
+    COMPRESS_GZIP_LEVEL: int = 5
+    COMPRESS_CONTENT_TYPES: list[str] = [  # 仅压缩以下类型，图片、压缩包等已压缩的内容不在其中
+        'application/json',
+        'application/x-ndjson',
+        'application/javascript',
+        'application/xml',
+        'image/svg+xml',
+        'text/html',
+        'text/plain',
+        'text/css',
+        'text/csv',
+        'text/javascript',
+        'text/xml',
+    ]
 
     # 请求限制配置
     REQUEST_LIMITER_REDIS_PREFIX: str = 'fba:limiter'
@@ -128,6 +200,7 @@ class Settings(BaseSettings):
     UPLOAD_IMAGE_SIZE_MAX: int = 5 * 1024 * 1024  # 5 MB
     UPLOAD_VIDEO_EXT_INCLUDE: list[str] = ['mp4', 'mov', 'avi', 'flv']
     UPLOAD_VIDEO_SIZE_MAX: int = 20 * 1024 * 1024  # 20 MB
+    UPLOAD_DATA_SIZE_MAX: int = 50 * 1024 * 1024  # 50 MB，CSV / JSON 数据文件
 
     # 演示模式配置
     DEMO_MODE: bool = False
@@ -172,6 +245,15 @@ class Settings(BaseSettings):
         f'{FASTAPI_API_V1_PATH}/oauth2/github/callback',
         f'{FASTAPI_API_V1_PATH}/oauth2/linux-do/callback',
     ]
+    OPERA_LOG_POLICY_DEFAULT: dict[str, bool | float] = {
+        'mutation': True,  # 记录非 GET/HEAD/OPTIONS 请求
+        'read_sample_rate': 1.0,  # GET/HEAD/OPTIONS 请求采样率，0 为不记录
+        'error': True,  # 始终记录异常请求
+    }
+    OPERA_LOG_POLICY_ROUTES: dict[str, dict[str, bool | float]] = {  # 路由级策略，键为路由路径，优先级高于路由装饰器
+        f'{FASTAPI_API_V1_PATH}/sys/menus/sidebar': {'read_sample_rate': 0.0},
+        f'{FASTAPI_API_V1_PATH}/sys/tokens': {'read_sample_rate': 0.0},
+    }
     OPERA_LOG_ENCRYPT_TYPE: int = 1  # 0: AES (性能损耗); 1: md5; 2: ItsDangerous; 3: 不加密, others: 替换为 ******
     OPERA_LOG_ENCRYPT_KEY_INCLUDE: list[str] = [  # 将加密接口入参参数对应的值
         'password',
@@ -179,6 +261,21 @@ class Settings(BaseSettings):
         'new_password',
         'confirm_password',
     ]
+    OPERA_LOG_ARGS_COMPRESS: bool = True  # 超过阈值的请求参数使用 zstd 压缩存储
+    OPERA_LOG_ARGS_COMPRESS_THRESHOLD: int = 1024  # 压缩阈值（字节），JSON 编码后小于此值的参数内联存储
+    OPERA_LOG_ARGS_COMPRESS_LEVEL: int = 3
+    OPERA_LOG_ARGS_COMPRESS_DICT_ID: int | None = None  # 训练字典 ID，通过 scripts/opera_log_args.py 生成
+
+    # 登录日志
+    LOGIN_LOG_STREAM: bool = True  # 登录日志写入 Redis Stream，由消费者组批量入库
+    LOGIN_LOG_STREAM_REDIS_KEY: str = 'fba:login_log:stream'
+    LOGIN_LOG_STREAM_GROUP: str = 'fba:login_log:writer'
+    LOGIN_LOG_STREAM_MAXLEN: int = 100000  # 流最大长度（近似裁剪）
+    LOGIN_LOG_STREAM_CONSUMER: Literal['app', 'celery'] = 'app'  # 应用进程内消费或 Celery 定时任务消费
+    LOGIN_LOG_STREAM_BATCH_SIZE: int = 500
+    LOGIN_LOG_STREAM_BLOCK_MS: int = 2000
+    LOGIN_LOG_STREAM_CLAIM_IDLE_MS: int = 60000  # 待确认消息空闲超过此时长后重试
+    LOGIN_LOG_STREAM_MAX_DELIVERIES: int = 5  # 超过最大投递次数的消息转入死信流
 
     # 插件配置
     PLUGIN_PIP_CHINA: bool = True
@@ -22,3 +22,6 @@ PLUGIN_DIR = BASE_PATH / 'plugin'
 
 # 离线 IP 数据库路径
 IP2REGION_XDB = STATIC_DIR / 'ip2region.xdb'
+
+# zstd 压缩字典目录
+ZSTD_DICT_DIR = BASE_PATH / 'zstd_dict'
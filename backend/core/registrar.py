@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import asyncio
 import os
 
 from contextlib import asynccontextmanager
@@ -14,12 +15,19 @@ from fastapi_pagination import add_pagination
 from starlette.middleware.authentication import AuthenticationMiddleware
 from starlette.staticfiles import StaticFiles
 
+from backend.app.admin.service.login_log_service import login_log_stream_consumer
+from backend.common.etag import bind_conditional_get
 from backend.common.exception.exception_handler import register_exception
 from backend.common.log import set_custom_logfile, setup_logging
+from backend.common.opera_log import opera_log_policy_registry
+from backend.common.response.response_struct import compile_route_structs
+from backend.common.struct_body import bind_struct_body
 from backend.core.conf import settings
 from backend.core.path_conf import STATIC_DIR, UPLOAD_DIR
-from backend.database.db import create_table
+from backend.database.db import create_table, prewarm_pool, replica_pool, reporting_replica_pool
 from backend.database.redis import redis_client
+from backend.database.router import replica_health_check
+from backend.database.uow import bind_request_session
 from backend.middleware.jwt_auth_middleware import JwtAuthMiddleware
 from backend.middleware.opera_log_middleware import OperaLogMiddleware
 from backend.middleware.state_middleware import StateMiddleware
@@ -40,6 +48,9 @@ async def register_init(app: FastAPI) -> AsyncGenerator[None, None]:
     """
     # 创建数据库表
     await create_table()
+    # 预热数据库连接池
+    if settings.DATABASE_POOL_PREWARM:
+        await prewarm_pool()
     # 连接 redis
     await redis_client.open()
     # 初始化 limiter
@@ -48,9 +59,22 @@ async def register_init(app: FastAPI) -> AsyncGenerator[None, None]:
         prefix=settings.REQUEST_LIMITER_REDIS_PREFIX,
         http_callback=http_limit_callback,
     )
+    # 启动数据库副本健康检查
+    replica_checker = None
+    if replica_pool or reporting_replica_pool:
+        replica_checker = asyncio.create_task(replica_health_check(replica_pool, reporting_replica_pool))
+    # 启动登录日志消费者
+    login_log_consumer = None
+    if settings.LOGIN_LOG_STREAM and settings.LOGIN_LOG_STREAM_CONSUMER == 'app':
+        login_log_consumer = asyncio.create_task(login_log_stream_consumer.run())
 
     yield
 
+    # 停止后台任务
+    for task in (replica_checker, login_log_consumer):
+        if task:
+            task.cancel()
+
     # 关闭 redis 连接
     await redis_client.close()
     # 关闭 limiter
@@ -122,6 +146,12 @@ def register_middleware(app: FastAPI) -> None:
         on_error=JwtAuthMiddleware.auth_exception_handler,
     )
 
+    # Request session
+    if settings.DATABASE_REQUEST_SESSION:
+        from backend.middleware.request_session_middleware import RequestSessionMiddleware
+
+        app.add_middleware(RequestSessionMiddleware)
+
     # Access log
     if settings.MIDDLEWARE_ACCESS:
         from backend.middleware.access_middleware import AccessMiddleware
@@ -134,6 +164,12 @@ def register_middleware(app: FastAPI) -> None:
     # Trace ID (必须)
     app.add_middleware(CorrelationIdMiddleware, validator=False)
 
+    # Compress
+    if settings.MIDDLEWARE_COMPRESS:
+        from backend.middleware.compress_middleware import CompressMiddleware
+
+        app.add_middleware(CompressMiddleware)
+
     # CORS（必须放在最下面）
     if settings.MIDDLEWARE_CORS:
         from fastapi.middleware.cors import CORSMiddleware
@@ -164,6 +200,12 @@ def register_router(app: FastAPI) -> None:
     # Extra
     ensure_unique_route_names(app)
     simplify_operation_ids(app)
+    opera_log_policy_registry.build(app.routes)
+    if settings.DATABASE_REQUEST_SESSION:
+        bind_request_session(app.routes)
+    bind_conditional_get(app.routes)
+    bind_struct_body(app.routes)
+    compile_route_structs(app.routes)
 
 
 def register_page(app: FastAPI) -> None:
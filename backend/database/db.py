@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import asyncio
 import sys
 
-from typing import Annotated, AsyncGenerator
+from typing import Annotated, Any, AsyncGenerator
 from uuid import uuid4
 
 from fastapi import Depends
@@ -12,21 +13,27 @@ from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 from backend.common.log import log
 from backend.common.model import MappedBase
 from backend.core.conf import settings
+from backend.database.pool import InstrumentedAsyncAdaptedQueuePool, prewarm_engine
+from backend.database.router import ReplicaPool, RoutingSession, RoutingSessionMaker
+from backend.database.statement import create_connect_args, get_compile_cache_stats, instrument_compile_cache
+from backend.database.uow import UnitOfWorkSessionMaker
 
 
-def create_database_url(unittest: bool = False) -> URL:
+def create_database_url(unittest: bool = False, host: str | None = None, port: int | None = None) -> URL:
     """
     创建数据库链接
 
     :param unittest: 是否用于单元测试
+    :param host: 数据库主机，默认为主库主机
+    :param port: 数据库端口，默认为主库端口
     :return:
     """
     url = URL.create(
         drivername='mysql+asyncmy' if settings.DATABASE_TYPE == 'mysql' else 'postgresql+asyncpg',
         username=settings.DATABASE_USER,
         password=settings.DATABASE_PASSWORD,
-        host=settings.DATABASE_HOST,
-        port=settings.DATABASE_PORT,
+        host=host or settings.DATABASE_HOST,
+        port=port or settings.DATABASE_PORT,
         database=settings.DATABASE_SCHEMA if not unittest else f'{settings.DATABASE_SCHEMA}_test',
     )
     if settings.DATABASE_TYPE == 'mysql':
@@ -34,39 +41,82 @@ def create_database_url(unittest: bool = False) -> URL:
     return url
 
 
-def create_async_engine_and_session(url: str | URL) -> tuple[AsyncEngine, async_sessionmaker[AsyncSession]]:
+def create_async_db_engine(url: str | URL) -> AsyncEngine:
     """
-    创建数据库引擎和 Session
+    创建数据库引擎
 
     :param url: 数据库连接 URL
     :return:
     """
     try:
-        # 数据库引擎
         engine = create_async_engine(
             url,
             echo=settings.DATABASE_ECHO,
             echo_pool=settings.DATABASE_POOL_ECHO,
             future=True,
-            # 中等并发
-            pool_size=10,  # 低：- 高：+
-            max_overflow=20,  # 低：- 高：+
-            pool_timeout=30,  # 低：+ 高：-
-            pool_recycle=3600,  # 低：+ 高：-
-            pool_pre_ping=True,  # 低：False 高：True
-            pool_use_lifo=False,  # 低：False 高：True
+            poolclass=InstrumentedAsyncAdaptedQueuePool,
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_POOL_MAX_OVERFLOW,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+            pool_recycle=settings.DATABASE_POOL_RECYCLE,
+            pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+            pool_use_lifo=settings.DATABASE_POOL_USE_LIFO,
+            query_cache_size=settings.DATABASE_QUERY_CACHE_SIZE,
+            connect_args=create_connect_args(),
         )
     except Exception as e:
         log.error('❌ 数据库链接失败 {}', e)
         sys.exit()
     else:
-        db_session = async_sessionmaker(
-            bind=engine,
-            class_=AsyncSession,
-            autoflush=False,  # 禁用自动刷新
-            expire_on_commit=False,  # 禁用提交时过期
-        )
-        return engine, db_session
+        instrument_compile_cache(engine)
+        return engine
+
+
+def create_replica_pool(name: str, hosts: list[str]) -> ReplicaPool:
+    """
+    创建只读副本池
+
+    :param name: 副本池名称
+    :param hosts: 副本主机列表，格式为 host:port
+    :return:
+    """
+    engines = []
+    for item in hosts:
+        host, _, port = item.partition(':')
+        engines.append(create_async_db_engine(create_database_url(host=host, port=int(port) if port else None)))
+    return ReplicaPool(name, engines)
+
+
+def create_async_engine_and_session(
+    url: str | URL,
+    *,
+    replicas: ReplicaPool | None = None,
+    reporting_replicas: ReplicaPool | None = None,
+) -> tuple[AsyncEngine, async_sessionmaker[AsyncSession]]:
+    """
+    创建数据库引擎和 Session
+
+    :param url: 数据库连接 URL
+    :param replicas: 只读副本池，配置后只读会话将路由至副本
+    :param reporting_replicas: 报表副本池
+    :return:
+    """
+    engine = create_async_db_engine(url)
+    kw = dict(
+        bind=engine,
+        class_=AsyncSession,
+        autoflush=False,  # 禁用自动刷新
+        expire_on_commit=False,  # 禁用提交时过期
+    )
+    if not replicas and not reporting_replicas:
+        return engine, async_sessionmaker(**kw)
+    db_session = RoutingSessionMaker(
+        **kw,
+        sync_session_class=RoutingSession,
+        replicas=replicas or ReplicaPool('replica', []),
+        reporting_replicas=reporting_replicas or ReplicaPool('reporting', []),
+    )
+    return engine, db_session
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -75,18 +125,49 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+async def get_reporting_db() -> AsyncGenerator[AsyncSession, None]:
+    """获取报表数据库会话，优先路由至报表副本"""
+    async with async_db_session(info={'reporting': True}) as session:
+        yield session
+
+
 async def create_table() -> None:
     """创建数据库表"""
     async with async_engine.begin() as coon:
         await coon.run_sync(MappedBase.metadata.create_all)
 
 
+async def prewarm_pool() -> None:
+    """预热主库及副本连接池"""
+    engines = [async_engine, *replica_pool.engines, *reporting_replica_pool.engines]
+    await asyncio.gather(*[prewarm_engine(engine, settings.DATABASE_POOL_SIZE) for engine in engines])
+
+
+def get_pool_stats() -> dict[str, dict[str, Any]]:
+    """获取主库及副本连接池、编译缓存统计信息"""
+    engines = {'primary': async_engine}
+    for pool in (replica_pool, reporting_replica_pool):
+        for engine in pool.engines:
+            engines[f'{pool.name}:{engine.url.host}:{engine.url.port}'] = engine
+    return {
+        name: {**engine.pool.stats(), 'compile_cache': get_compile_cache_stats(engine)}
+        for name, engine in engines.items()
+    }
+
+
 def uuid4_str() -> str:
     """数据库引擎 UUID 类型兼容性解决方案"""
     return str(uuid4())
 
 
 SQLALCHEMY_DATABASE_URL = create_database_url()
-async_engine, async_db_session = create_async_engine_and_session(SQLALCHEMY_DATABASE_URL)
+replica_pool = create_replica_pool('replica', settings.DATABASE_REPLICA_HOSTS)
+reporting_replica_pool = create_replica_pool('reporting', settings.DATABASE_REPORTING_REPLICA_HOSTS)
+async_engine, async_db_session = create_async_engine_and_session(
+    SQLALCHEMY_DATABASE_URL, replicas=replica_pool, reporting_replicas=reporting_replica_pool
+)
+if settings.DATABASE_REQUEST_SESSION:
+    async_db_session = UnitOfWorkSessionMaker(async_db_session)
 # Session Annotated
 CurrentSession = Annotated[AsyncSession, Depends(get_db)]
+CurrentReportingSession = Annotated[AsyncSession, Depends(get_reporting_db)]
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from typing import Any, Callable, Sequence, Type
+
+from sqlalchemy import ColumnElement, Row, Update, and_, case, exists, inspect, literal, select, update
+from sqlalchemy.dialects import mysql, postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute, aliased
+
+
+def toggle(column: InstrumentedAttribute, on: Any = True, off: Any = False) -> ColumnElement:
+    """
+    翻转列值的 SQL 表达式，由数据库在更新时计算，无需先读后写
+
+    :param column: 模型列
+    :param on: 开启值
+    :param off: 关闭值
+    :return:
+    """
+    return case(
+        (column == literal(on, column.type), literal(off, column.type)),
+        else_=literal(on, column.type),
+    )
+
+
+def exists_row(model: Type[Any], where: Callable[[Any], ColumnElement[bool]]) -> ColumnElement[bool]:
+    """
+    存在满足条件的行，可直接用于目标表相同的更新语句中
+
+    :param model: SQLA 模型
+    :param where: 行条件，参数为模型别名
+    :return:
+    """
+    # MySQL 不允许 UPDATE 语句的子查询直接引用目标表，带 LIMIT 的派生表会被物化从而规避此限制
+    other = aliased(model)
+    pk_col = getattr(other, inspect(model).primary_key[0].key)
+    derived = select(pk_col).where(where(other)).limit(1).subquery()
+    return exists(select(literal(1)).select_from(derived))
+
+
+def unique_except_self(
+    model: Type[Any],
+    pk: Any,
+    values: dict[str, Any],
+    where: Callable[[Any], ColumnElement[bool]] | None = None,
+) -> ColumnElement[bool]:
+    """
+    除自身外不存在相同列值的条件，用于在更新语句中校验唯一性
+
+    :param model: SQLA 模型
+    :param pk: 自身主键
+    :param values: 需唯一的列值
+    :param where: 参与唯一性比较的行的附加条件，参数为模型别名
+    :return:
+    """
+    pk_key = inspect(model).primary_key[0].key
+
+    def conditions(other: Any) -> ColumnElement[bool]:
+        clauses = [getattr(other, pk_key) != pk, *(getattr(other, k) == v for k, v in values.items())]
+        if where is not None:
+            clauses.append(where(other))
+        return and_(*clauses)
+
+    return ~exists_row(model, conditions)
+
+
+def _update_stmt(model: Type[Any], pk: Any, values: dict[str, Any], *whereclause: ColumnElement[bool]) -> Update:
+    pk_col = inspect(model).primary_key[0]
+    return update(model).where(pk_col == pk, *whereclause).values(values).execution_options(synchronize_session=False)
+
+
+async def conditional_update(
+    db: AsyncSession,
+    model: Type[Any],
+    pk: Any,
+    values: dict[str, Any],
+    *whereclause: ColumnElement[bool],
+) -> int:
+    """
+    按主键条件更新，校验与写入在同一语句中完成
+
+    :param db: 数据库会话
+    :param model: SQLA 模型
+    :param pk: 主键
+    :param values: 更新的列值，可为 SQL 表达式
+    :param whereclause: 附加更新条件，不满足时不更新
+    :return: 更新行数，为 0 时表示不存在或条件不满足
+    """
+    result = await db.execute(_update_stmt(model, pk, values, *whereclause))
+    return result.rowcount
+
+
+async def update_returning(
+    db: AsyncSession,
+    model: Type[Any],
+    pk: Any,
+    values: dict[str, Any],
+    *whereclause: ColumnElement[bool],
+    returning: Sequence[InstrumentedAttribute] = (),
+) -> Row | None:
+    """
+    按主键条件更新，并返回更新后的列值
+
+    支持 UPDATE ... RETURNING 的数据库（PostgreSQL）单语句完成；MySQL 在同一事务内更新后按主键回读，
+    更新持有的行锁保证回读到的是本次写入的值
+
+    :param db: 数据库会话
+    :param model: SQLA 模型
+    :param pk: 主键
+    :param values: 更新的列值，可为 SQL 表达式
+    :param whereclause: 附加更新条件，不满足时不更新
+    :param returning: 返回的列，默认为主键
+    :return: 未匹配到行（不存在或条件不满足）时返回 None
+    """
+    pk_col = inspect(model).primary_key[0]
+    columns = returning or (getattr(model, pk_col.key),)
+    stmt = _update_stmt(model, pk, values, *whereclause)
+    if db.bind.dialect.update_returning:
+        result = await db.execute(stmt.returning(*columns))
+        return result.first()
+    result = await db.execute(stmt)
+    if not result.rowcount:
+        return None
+    result = await db.execute(select(*columns).where(pk_col == pk))
+    return result.first()
+
+
+async def upsert(
+    db: AsyncSession,
+    model: Type[Any],
+    rows: Sequence[dict[str, Any]],
+    conflict_columns: Sequence[str],
+    update_columns: Sequence[str],
+    **update_values: Any,
+) -> int:
+    """
+    批量插入，唯一键冲突时更新已有行，单条语句完成
+
+    PostgreSQL 使用 INSERT ... ON CONFLICT DO UPDATE，MySQL 使用 INSERT ... ON DUPLICATE KEY UPDATE；
+    同一语句内不能多次命中同一行，调用方需保证 rows 中的冲突列值不重复
+
+    :param db: 数据库会话
+    :param model: SQLA 模型
+    :param rows: 插入的行，需包含全部必填列（Core 插入不会应用模型的 default_factory）
+    :param conflict_columns: 唯一约束列，仅 PostgreSQL 使用
+    :param update_columns: 冲突时以插入值更新的列
+    :param update_values: 冲突时额外更新的列值，如更新时间
+    :return: 受影响行数
+    """
+    if not rows:
+        return 0
+    if db.bind.dialect.name == 'postgresql':
+        stmt = postgresql.insert(model).values(list(rows))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(conflict_columns),
+            set_={**{c: stmt.excluded[c] for c in update_columns}, **update_values},
+        )
+    else:
+        stmt = mysql.insert(model).values(list(rows))
+        stmt = stmt.on_duplicate_key_update({**{c: stmt.inserted[c] for c in update_columns}, **update_values})
+    result = await db.execute(stmt)
+    return result.rowcount
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from typing import Any, Type
+
+from sqlalchemy import Select, Table, delete, insert, inspect, literal, literal_column, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core.conf import settings
+
+
+class ClosureTree:
+    """
+    邻接表（parent_id）的层级索引
+
+    开启 HIERARCHY_CLOSURE_ENABLED 时通过闭包表维护全部祖先-后代关系，后代、祖先和限定深度的子树均为单次索引查询；
+    未开启时不维护闭包表，查询退化为递归 CTE，同样为单条语句
+    """
+
+    def __init__(self, model: Type[Any], closure: Table) -> None:
+        """
+        初始化层级索引
+
+        :param model: SQLA 模型，需包含 parent_id 列
+        :param closure: 闭包表，包含 ancestor_id、descendant_id、depth 列
+        :return:
+        """
+        self.model = model
+        self.closure = closure
+        self.pk = getattr(model, inspect(model).primary_key[0].key)
+        self.parent = model.parent_id
+
+    @property
+    def enabled(self) -> bool:
+        return settings.HIERARCHY_CLOSURE_ENABLED
+
+    def descendants(self, pk: int, *, max_depth: int | None = None, include_self: bool = False) -> Select:
+        """
+        后代查询，列为 id 和 depth（与节点的层级距离）
+
+        :param pk: 节点 ID
+        :param max_depth: 最大层级距离，为空时不限制
+        :param include_self: 是否包含自身
+        :return:
+        """
+        min_depth = 0 if include_self else 1
+        if self.enabled:
+            c = self.closure.c
+            stmt = select(c.descendant_id.label('id'), c.depth).where(c.ancestor_id == pk, c.depth >= min_depth)
+            if max_depth is not None:
+                stmt = stmt.where(c.depth <= max_depth)
+            return stmt
+
+        max_depth = settings.HIERARCHY_MAX_DEPTH if max_depth is None else min(max_depth, settings.HIERARCHY_MAX_DEPTH)
+        tree = select(self.pk.label('id'), literal_column('0').label('depth')).where(self.pk == pk).cte(recursive=True)
+        tree = tree.union_all(
+            select(self.pk, tree.c.depth + 1).where(self.parent == tree.c.id, tree.c.depth < max_depth)
+        )
+        return select(tree.c.id, tree.c.depth).where(tree.c.depth >= min_depth)
+
+    def ancestors(self, pk: int, *, include_self: bool = False) -> Select:
+        """
+        祖先查询，列为 id 和 depth（与节点的层级距离）
+
+        :param pk: 节点 ID
+        :param include_self: 是否包含自身
+        :return:
+        """
+        min_depth = 0 if include_self else 1
+        if self.enabled:
+            c = self.closure.c
+            return select(c.ancestor_id.label('id'), c.depth).where(c.descendant_id == pk, c.depth >= min_depth)
+
+        tree = select(self.pk.label('id'), self.parent.label('parent_id'), literal_column('0').label('depth'))
+        tree = tree.where(self.pk == pk).cte(recursive=True)
+        tree = tree.union_all(
+            select(self.pk, self.parent, tree.c.depth + 1).where(
+                self.pk == tree.c.parent_id, tree.c.depth < settings.HIERARCHY_MAX_DEPTH
+            )
+        )
+        return select(tree.c.id, tree.c.depth).where(tree.c.depth >= min_depth)
+
+    def descendant_ids(self, pk: int, *, max_depth: int | None = None, include_self: bool = False) -> Select:
+        """
+        后代 ID 查询，可直接作为 IN 子查询使用，如数据权限按子树过滤
+
+        :param pk: 节点 ID
+        :param max_depth: 最大层级距离，为空时不限制
+        :param include_self: 是否包含自身
+        :return:
+        """
+        subtree = self.descendants(pk, max_depth=max_depth, include_self=include_self).subquery()
+        return select(subtree.c.id)
+
+    async def is_descendant(self, db: AsyncSession, pk: int, ancestor_pk: int) -> bool:
+        """
+        判断节点是否为另一节点的后代
+
+        :param db: 数据库会话
+        :param pk: 节点 ID
+        :param ancestor_pk: 祖先节点 ID
+        :return:
+        """
+        subtree = self.descendants(ancestor_pk).subquery()
+        result = await db.execute(select(subtree.c.id).where(subtree.c.id == pk).limit(1))
+        return result.first() is not None
+
+    async def insert(self, db: AsyncSession, pk: int, parent_id: int | None) -> None:
+        """
+        新增节点，复制父节点的全部祖先关系
+
+        :param db: 数据库会话
+        :param pk: 节点 ID
+        :param parent_id: 父节点 ID
+        :return:
+        """
+        if not self.enabled:
+            return
+        c = self.closure.c
+        rows = select(literal(pk).label('ancestor_id'), literal(pk), literal(0))
+        if parent_id is not None:
+            rows = union_all(rows, select(c.ancestor_id, literal(pk), c.depth + 1).where(c.descendant_id == parent_id))
+        await db.execute(insert(self.closure).from_select(['ancestor_id', 'descendant_id', 'depth'], rows))
+
+    async def move(self, db: AsyncSession, pk: int, parent_id: int | None) -> None:
+        """
+        移动节点及其子树到新的父节点下，父节点未变化时不做处理
+
+        :param db: 数据库会话
+        :param pk: 节点 ID
+        :param parent_id: 新父节点 ID
+        :return:
+        """
+        if not self.enabled:
+            return
+        c = self.closure.c
+        result = await db.execute(select(c.ancestor_id).where(c.descendant_id == pk, c.depth == 1))
+        if result.scalar_one_or_none() == parent_id:
+            return
+
+        # MySQL 不允许 DELETE 的子查询引用目标表，先查出子树
+        result = await db.execute(select(c.descendant_id).where(c.ancestor_id == pk))
+        subtree = result.scalars().all()
+        await db.execute(delete(self.closure).where(c.descendant_id.in_(subtree), c.ancestor_id.not_in(subtree)))
+        if parent_id is not None:
+            above, below = self.closure.alias('above'), self.closure.alias('below')
+            rows = select(above.c.ancestor_id, below.c.descendant_id, above.c.depth + below.c.depth + 1).where(
+                above.c.descendant_id == parent_id, below.c.ancestor_id == pk
+            )
+            await db.execute(insert(self.closure).from_select(['ancestor_id', 'descendant_id', 'depth'], rows))
+
+    async def rebuild(self, db: AsyncSession, batch_size: int = 1000) -> int:
+        """
+        根据 parent_id 重建闭包表，用于首次开启或修复数据
+
+        :param db: 数据库会话
+        :param batch_size: 每批插入行数
+        :return: 闭包表行数
+        """
+        result = await db.execute(select(self.pk, self.parent))
+        parents = dict(result.all())
+        rows = []
+        for pk in parents:
+            # 逐级向上，遇到环或缺失的父节点即停止
+            node, depth, seen = pk, 0, set()
+            while node is not None and node in parents and node not in seen:
+                seen.add(node)
+                rows.append({'ancestor_id': node, 'descendant_id': pk, 'depth': depth})
+                node, depth = parents[node], depth + 1
+        await db.execute(delete(self.closure))
+        for i in range(0, len(rows), batch_size):
+            await db.execute(insert(self.closure), rows[i : i + batch_size])
+        return len(rows)
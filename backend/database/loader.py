@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+
+from typing import Any, Generic, Hashable, Iterable, Type, TypeVar
+
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.interfaces import ORMOption
+
+Model = TypeVar('Model')
+
+
+class ModelLoader(Generic[Model]):
+    """
+    按主键批量加载模型
+
+    同一事件循环轮次内发起的 load 调用合并为一次 WHERE pk IN (...) 查询，
+    已加载的结果缓存在加载器中，生命周期与会话一致（启用请求级会话时即为请求级）
+    """
+
+    def __init__(self, db: AsyncSession, model: Type[Model], *options: ORMOption) -> None:
+        """
+        初始化加载器
+
+        :param db: 数据库会话
+        :param model: SQLA 模型
+        :param options: 加载选项，如 selectinload(...)
+        :return:
+        """
+        self.db = db
+        self.model = model
+        self.options = options
+        self.pk = inspect(model).primary_key[0]
+        self.cache: dict[Any, Model | None] = {}
+        self.pending: dict[Any, asyncio.Future] = {}
+        self.scheduled = False
+        # 持有调度中的批次任务引用，避免任务在完成前被垃圾回收
+        self.tasks: set[asyncio.Task] = set()
+        # 会话不支持并发查询，批次依次执行
+        self.lock = asyncio.Lock()
+
+    async def load(self, pk: Any) -> Model | None:
+        """
+        加载单个模型
+
+        :param pk: 主键
+        :return:
+        """
+        if pk is None:
+            return None
+        if pk in self.cache:
+            return self.cache[pk]
+        return await self._enqueue(pk)
+
+    async def load_many(self, pks: Iterable[Any]) -> list[Model | None]:
+        """
+        加载多个模型，结果顺序与主键顺序一致，空主键对应结果为 None
+
+        :param pks: 主键
+        :return:
+        """
+        futures = [self.cache.get(pk) if pk is None or pk in self.cache else self._enqueue(pk) for pk in pks]
+        return [await f if isinstance(f, asyncio.Future) else f for f in futures]
+
+    def clear(self, pk: Any = None) -> None:
+        """
+        清除缓存，写入后需重新加载时调用
+
+        :param pk: 主键，为空时清除全部
+        :return:
+        """
+        if pk is None:
+            self.cache.clear()
+        else:
+            self.cache.pop(pk, None)
+
+    def _enqueue(self, pk: Any) -> asyncio.Future:
+        future = self.pending.get(pk)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self.pending[pk] = future
+            if not self.scheduled:
+                self.scheduled = True
+                task = asyncio.create_task(self._dispatch())
+                self.tasks.add(task)
+                task.add_done_callback(self.tasks.discard)
+        return future
+
+    async def _dispatch(self) -> None:
+        async with self.lock:
+            batch, self.pending, self.scheduled = self.pending, {}, False
+            if not batch:
+                return
+            try:
+                stmt = select(self.model).options(*self.options).where(self.pk.in_(list(batch)))
+                result = await self.db.execute(stmt)
+                found = {getattr(obj, self.pk.key): obj for obj in result.scalars().all()}
+            except Exception as e:
+                for future in batch.values():
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            for pk, future in batch.items():
+                self.cache[pk] = found.get(pk)
+                if not future.done():
+                    future.set_result(self.cache[pk])
+
+
+def get_loader(db: AsyncSession, model: Type[Model], *options: ORMOption, key: Hashable = None) -> ModelLoader[Model]:
+    """
+    获取会话内的模型加载器，同一会话、模型和键共享同一加载器及其缓存
+
+    :param db: 数据库会话
+    :param model: SQLA 模型
+    :param options: 加载选项，仅在首次创建时生效
+    :param key: 区分同一模型不同加载选项的键
+    :return:
+    """
+    loaders: dict[tuple, ModelLoader] = db.info.setdefault('loaders', {})
+    loader = loaders.get((model, key))
+    if loader is None:
+        loader = loaders[(model, key)] = ModelLoader(db, model, *options)
+    return loader
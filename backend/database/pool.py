@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+import time
+
+from collections import deque
+from typing import Any
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
+
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """记录连接检出耗时与超时次数的连接池"""
+
+    # 用于计算耗时分位数的最近检出样本数
+    sample_size: int = 1000
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_samples: deque[float] = deque(maxlen=self.sample_size)
+
+    def connect(self) -> PoolProxiedConnection:
+        start = time.perf_counter()
+        try:
+            conn = super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        wait = time.perf_counter() - start
+        self.checkouts += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+        self.wait_samples.append(wait)
+        return conn
+
+    def stats(self) -> dict[str, Any]:
+        """
+        获取连接池统计信息，耗时单位为毫秒
+
+        :return:
+        """
+        samples = sorted(self.wait_samples)
+
+        def percentile(p: float) -> float:
+            return round(samples[min(len(samples) - 1, int(len(samples) * p))] * 1000, 3) if samples else 0.0
+
+        size = self.size()
+        checked_out = self.checkedout()
+        return {
+            'size': size,
+            'max_overflow': self._max_overflow,
+            'checked_in': self.checkedin(),
+            'checked_out': checked_out,
+            'overflow': max(self.overflow(), 0),
+            'saturation': round(checked_out / (size + max(self._max_overflow, 0)), 4) if size else 0.0,
+            'checkouts': self.checkouts,
+            'timeouts': self.timeouts,
+            'wait_avg': round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            'wait_p95': percentile(0.95),
+            'wait_p99': percentile(0.99),
+            'wait_max': round(self.wait_max * 1000, 3),
+        }
+
+
+async def prewarm_engine(engine: AsyncEngine, size: int) -> None:
+    """
+    预热连接池，并发建立指定数量的连接后归还
+
+    :param engine: 数据库引擎
+    :param size: 连接数
+    :return:
+    """
+    conns = await asyncio.gather(*[engine.connect() for _ in range(size)])
+    for conn in conns:
+        await conn.close()
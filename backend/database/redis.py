@@ -63,6 +63,37 @@ class RedisCli(Redis):
         if keys:
             await self.delete(*keys)
 
+    async def get_generation(self, name: str) -> int:
+        """
+        获取数据代数，数据变更时递增，用于构造随数据失效的缓存键
+
+        :param name: 数据名称
+        :return:
+        """
+        generation = await self.get(f'{settings.GENERATION_REDIS_PREFIX}:{name}')
+        return int(generation or 0)
+
+    async def get_generations(self, *names: str) -> list[int]:
+        """
+        批量获取数据代数
+
+        :param names: 数据名称
+        :return:
+        """
+        if not names:
+            return []
+        generations = await self.mget([f'{settings.GENERATION_REDIS_PREFIX}:{name}' for name in names])
+        return [int(generation or 0) for generation in generations]
+
+    async def bump_generation(self, name: str) -> int:
+        """
+        递增数据代数，需在数据变更的事务提交后调用
+
+        :param name: 数据名称
+        :return:
+        """
+        return await self.incr(f'{settings.GENERATION_REDIS_PREFIX}:{name}')
+
 
 # 创建 redis 客户端单例
 redis_client: RedisCli = RedisCli()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from typing import Iterable
+
+from sqlalchemy import Table, delete, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+async def get_missing_ids(db: AsyncSession, pk: InstrumentedAttribute, ids: Iterable[int]) -> set[int]:
+    """
+    通过一次 IN 查询获取不存在的 ID
+
+    :param db: 数据库会话
+    :param pk: 主键列，如 Role.id
+    :param ids: 待校验的 ID
+    :return:
+    """
+    ids = set(ids)
+    if not ids:
+        return set()
+    result = await db.execute(select(pk).where(pk.in_(ids)))
+    return ids - set(result.scalars().all())
+
+
+async def sync_association(
+    db: AsyncSession,
+    table: Table,
+    owner_key: str,
+    owner_id: int,
+    target_key: str,
+    target_ids: Iterable[int],
+) -> tuple[int, int]:
+    """
+    同步多对多关联表，对比现有与目标 ID 集合，仅批量删除和插入差异行
+
+    :param db: 数据库会话
+    :param table: 关联表
+    :param owner_key: 关联表中所属方的列名，如 role_id
+    :param owner_id: 所属方 ID
+    :param target_key: 关联表中目标方的列名，如 menu_id
+    :param target_ids: 目标 ID
+    :return: 新增数、删除数
+    """
+    owner_col, target_col = table.c[owner_key], table.c[target_key]
+    result = await db.execute(select(target_col).where(owner_col == owner_id))
+    current = set(result.scalars().all())
+    desired = set(target_ids)
+    to_add, to_remove = desired - current, current - desired
+    if to_remove:
+        await db.execute(delete(table).where(owner_col == owner_id, target_col.in_(to_remove)))
+    if to_add:
+        await db.execute(insert(table), [{owner_key: owner_id, target_key: i} for i in sorted(to_add)])
+    return len(to_add), len(to_remove)
+
+
+async def sync_foreign_key(
+    db: AsyncSession,
+    pk: InstrumentedAttribute,
+    fk: InstrumentedAttribute,
+    owner_id: int,
+    target_ids: Iterable[int],
+) -> tuple[int, int]:
+    """
+    同步一对多外键关联，将目标行的外键指向所属方，并解除其余行的关联
+
+    :param db: 数据库会话
+    :param pk: 目标方主键列，如 DataRule.id
+    :param fk: 目标方外键列，如 DataRule.scope_id
+    :param owner_id: 所属方 ID
+    :param target_ids: 目标 ID
+    :return: 关联数、解除数
+    """
+    result = await db.execute(select(pk).where(fk == owner_id))
+    current = set(result.scalars().all())
+    desired = set(target_ids)
+    to_add, to_remove = desired - current, current - desired
+    if to_remove:
+        await db.execute(update(pk.class_).where(pk.in_(to_remove)).values({fk: None}))
+    if to_add:
+        await db.execute(
+            update(pk.class_).where(pk.in_(to_add), or_(fk.is_(None), fk != owner_id)).values({fk: owner_id})
+        )
+    return len(to_add), len(to_remove)
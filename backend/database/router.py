@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+
+from contextvars import ContextVar
+from typing import Any
+
+from sqlalchemy import Delete, Engine, Insert, Update, event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from backend.common.dataclasses import DBRouteState
+from backend.common.log import log
+from backend.core.conf import settings
+from backend.database.redis import redis_client
+
+# 当前请求的读写路由状态，由 JWT 中间件在认证通过后设置
+db_route_state: ContextVar[DBRouteState | None] = ContextVar('db_route_state', default=None)
+
+
+class ReplicaPool:
+    """只读副本池，轮询选择健康副本"""
+
+    def __init__(self, name: str, engines: list[AsyncEngine]) -> None:
+        """
+        初始化副本池
+
+        :param name: 副本池名称
+        :param engines: 副本数据库引擎列表
+        :return:
+        """
+        self.name = name
+        self.engines = engines
+        self.healthy = list(engines)
+        self._index = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def choose(self) -> Engine | None:
+        """
+        轮询选择健康副本
+
+        :return:
+        """
+        healthy = self.healthy
+        if not healthy:
+            return None
+        self._index = (self._index + 1) % len(healthy)
+        return healthy[self._index].sync_engine
+
+    async def check(self) -> None:
+        """检查副本健康状态"""
+        healthy = []
+        for engine in self.engines:
+            try:
+                async with engine.connect() as conn:
+                    await asyncio.wait_for(
+                        conn.execute(text('SELECT 1')), settings.DATABASE_REPLICA_HEALTH_CHECK_TIMEOUT
+                    )
+            except Exception as e:
+                log.warning(f'数据库副本 {engine.url.host}:{engine.url.port} 健康检查失败: {e}')
+            else:
+                healthy.append(engine)
+        self.healthy = healthy
+
+
+class RoutingSession(Session):
+    """
+    读写分离会话
+
+    通过 ``async_db_session.begin()`` 创建的会话、写语句以及已写入的会话使用主库，
+    其余只读会话使用副本，当前用户近期有写入时粘滞至主库以保证读己之写
+    """
+
+    def __init__(self, *, replicas: ReplicaPool, reporting_replicas: ReplicaPool, **kw: Any) -> None:
+        """
+        初始化读写分离会话
+
+        :param replicas: 只读副本池
+        :param reporting_replicas: 报表副本池，用于日志列表、导出等报表类查询
+        :return:
+        """
+        super().__init__(**kw)
+        self.replicas = replicas
+        self.reporting_replicas = reporting_replicas
+
+    @property
+    def primary(self) -> Engine:
+        """主库引擎"""
+        return self.bind
+
+    def get_bind(self, mapper: Any = None, *, clause: Any = None, **kw: Any) -> Engine:
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            self.info['primary'] = self.info['written'] = True
+            return self.primary
+        if self.info.get('primary'):
+            return self.primary
+        replica = self.info.get('replica')
+        if replica is None:
+            replica = self.choose_replica()
+            self.info['replica'] = replica
+        return replica
+
+    def choose_replica(self) -> Engine:
+        """
+        选择本会话使用的副本
+
+        :return:
+        """
+        if self.info.get('reporting'):
+            return self.reporting_replicas.choose() or self.replicas.choose() or self.primary
+        state = db_route_state.get()
+        if state is not None and state.sticky:
+            return self.primary
+        return self.replicas.choose() or self.primary
+
+
+class RoutingSessionMaker(async_sessionmaker[AsyncSession]):
+    """读写分离会话工厂，``begin()`` 创建的会话固定使用主库"""
+
+    def begin(self) -> Any:
+        session = self(info={'primary': True})
+        return session._maker_context_manager()
+
+
+# 写入粘滞标记的后台任务，持有引用避免任务在执行前被回收
+_sticky_tasks: set[asyncio.Task] = set()
+
+
+async def _set_sticky(key: str) -> None:
+    """
+    写入跨进程的粘滞标记，失败时仅记录日志，本进程内仍按请求状态读取主库
+
+    :param key: 粘滞标记键名
+    :return:
+    """
+    try:
+        await redis_client.set(key, 1, ex=settings.DATABASE_REPLICA_STICKY_SECONDS)
+    except Exception as e:
+        log.warning(f'写入读写分离粘滞标记失败，其他进程可能读取到副本的旧数据: {e}')
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def mark_sticky(session: Session) -> None:
+    """
+    会话提交写入后，将当前用户在粘滞时长内路由至主库
+
+    :param session: 数据库会话
+    :return:
+    """
+    if not session.info.pop('written', False):
+        return
+    state = db_route_state.get()
+    if state is None:
+        return
+    state.sticky = True
+    key = f'{settings.DATABASE_REPLICA_STICKY_REDIS_PREFIX}:{state.user_id}'
+    task = asyncio.get_running_loop().create_task(_set_sticky(key))
+    _sticky_tasks.add(task)
+    task.add_done_callback(_sticky_tasks.discard)
+
+
+async def bind_route_state(user_id: int) -> None:
+    """
+    设置当前请求的读写路由状态
+
+    :param user_id: 用户 ID
+    :return:
+    """
+    sticky = bool(await redis_client.exists(f'{settings.DATABASE_REPLICA_STICKY_REDIS_PREFIX}:{user_id}'))
+    db_route_state.set(DBRouteState(user_id=user_id, sticky=sticky))
+
+
+async def replica_health_check(*pools: ReplicaPool) -> None:
+    """
+    定时检查副本健康状态
+
+    :param pools: 副本池
+    :return:
+    """
+    while True:
+        for pool in pools:
+            await pool.check()
+        await asyncio.sleep(settings.DATABASE_REPLICA_HEALTH_CHECK_INTERVAL)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from collections import Counter
+from typing import Any
+from uuid import uuid4
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import Engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from backend.core.conf import settings
+
+# 引擎编译缓存统计
+_compile_cache_stats: WeakKeyDictionary[Engine, Counter] = WeakKeyDictionary()
+
+
+def create_connect_args() -> dict[str, Any]:
+    """
+    创建驱动连接参数
+
+    asyncpg 使用服务端预处理语句，PgBouncer 事务/语句池模式下连接会在客户端之间复用，
+    需禁用预处理语句缓存并使用唯一语句名称；asyncmy 使用文本协议，无预处理语句缓存
+
+    :return:
+    """
+    if settings.DATABASE_TYPE != 'postgresql':
+        return {}
+    if settings.DATABASE_PGBOUNCER:
+        return {
+            'statement_cache_size': 0,
+            'prepared_statement_cache_size': 0,
+            'prepared_statement_name_func': lambda: f'__asyncpg_{uuid4()}__',
+        }
+    return {
+        'statement_cache_size': settings.DATABASE_PREPARED_STATEMENT_CACHE_SIZE,
+        'prepared_statement_cache_size': settings.DATABASE_PREPARED_STATEMENT_CACHE_SIZE,
+    }
+
+
+def instrument_compile_cache(engine: AsyncEngine) -> None:
+    """
+    记录引擎编译缓存命中情况
+
+    :param engine: 数据库引擎
+    :return:
+    """
+    counter = _compile_cache_stats.setdefault(engine.sync_engine, Counter())
+
+    @event.listens_for(engine.sync_engine, 'after_cursor_execute')
+    def record_cache_hit(conn, cursor, statement, parameters, context, executemany) -> None:
+        cache_hit = getattr(context, 'cache_hit', None)
+        if cache_hit is not None:
+            counter[cache_hit.name] += 1
+
+
+def get_compile_cache_stats(engine: AsyncEngine) -> dict[str, Any]:
+    """
+    获取引擎编译缓存统计信息
+
+    :param engine: 数据库引擎
+    :return:
+    """
+    counter = _compile_cache_stats.get(engine.sync_engine, Counter())
+    hit, miss = counter['CACHE_HIT'], counter['CACHE_MISS']
+    return {
+        'size': settings.DATABASE_QUERY_CACHE_SIZE,
+        'hit': hit,
+        'miss': miss,
+        'no_cache_key': counter['NO_CACHE_KEY'],
+        'hit_rate': round(hit / (hit + miss), 4) if hit + miss else 0.0,
+    }
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+import functools
+
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncContextManager, AsyncGenerator, Awaitable, Callable, TypeVar
+
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette.routing import BaseRoute
+
+T = TypeVar('T')
+
+
+class RequestUnitOfWork:
+    """
+    请求级工作单元
+
+    首次使用时创建会话，首次查询时检出连接，请求内所有服务共享同一会话，
+    路由函数返回后统一提交并释放连接，之后的会话请求（如后台任务）将使用独立会话；
+    写事务块退出时即提交，服务在事务块之后执行的缓存失效、数据代数递增等副作用均发生在提交之后
+    """
+
+    def __init__(self, maker: async_sessionmaker[AsyncSession]) -> None:
+        """
+        初始化工作单元
+
+        :param maker: 会话工厂
+        :return:
+        """
+        self.maker = maker
+        self.session: AsyncSession | None = None
+        self.closed = False
+
+    @asynccontextmanager
+    async def use(self, begin: bool = False) -> AsyncGenerator[AsyncSession, None]:
+        """
+        使用共享会话
+
+        :param begin: 是否为写事务，写事务正常退出时提交，异常时回滚，与会话工厂的 begin() 一致
+        :return:
+        """
+        if self.session is None:
+            self.session = self.maker()
+        if not begin:
+            yield self.session
+            return
+        self.session.info['primary'] = True
+        try:
+            yield self.session
+        except BaseException:
+            await self.session.rollback()
+            raise
+        await self.session.commit()
+
+    async def release(self, commit: bool) -> None:
+        """
+        结束工作单元并释放连接
+
+        :param commit: 是否提交，否则回滚
+        :return:
+        """
+        if self.closed:
+            return
+        self.closed = True
+        session = self.session
+        if session is None:
+            return
+        try:
+            if commit:
+                await session.commit()
+            else:
+                await session.rollback()
+        finally:
+            await session.close()
+
+
+# 当前请求的工作单元
+request_uow: ContextVar[RequestUnitOfWork | None] = ContextVar('request_uow', default=None)
+
+
+class UnitOfWorkSessionMaker:
+    """请求级会话工厂，请求内复用工作单元会话，请求外与原会话工厂行为一致"""
+
+    def __init__(self, maker: async_sessionmaker[AsyncSession]) -> None:
+        self.maker = maker
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.maker, name)
+
+    @staticmethod
+    def current() -> RequestUnitOfWork | None:
+        """获取当前请求未结束的工作单元"""
+        uow = request_uow.get()
+        if uow is None or uow.closed:
+            return None
+        return uow
+
+    def __call__(self, **kw: Any) -> AsyncContextManager[AsyncSession]:
+        uow = self.current()
+        if uow is None or kw:
+            return self.maker(**kw)
+        return uow.use()
+
+    def begin(self) -> AsyncContextManager[AsyncSession]:
+        uow = self.current()
+        if uow is None:
+            return self.maker.begin()
+        return uow.use(begin=True)
+
+
+def independent_session(maker: Any) -> async_sessionmaker[AsyncSession]:
+    """
+    获取不使用请求工作单元的会话工厂，其 begin() 在独立事务中执行并在退出时提交
+
+    用于需在请求内自行控制事务边界的场景（如分批提交，单批失败不影响共享会话）
+
+    :param maker: 会话工厂
+    :return:
+    """
+    if isinstance(maker, UnitOfWorkSessionMaker):
+        return maker.maker
+    return maker
+
+
+async def without_request_session(coro: Awaitable[T]) -> T:
+    """
+    脱离请求工作单元执行协程，用于请求中创建的后台任务
+
+    create_task 会复制当前上下文，依赖校验失败等路由函数未执行的请求，工作单元仍未结束，
+    任务内的会话请求将与请求共用同一会话；此处仅在任务的上下文副本中清除工作单元，使任务使用独立会话
+
+    :param coro: 协程
+    :return:
+    """
+    request_uow.set(None)
+    return await coro
+
+
+def release_after_endpoint(func: Callable) -> Callable:
+    """
+    路由函数返回后立即提交并释放连接，无需等待响应序列化
+
+    :param func: 路由函数
+    :return:
+    """
+    if not asyncio.iscoroutinefunction(func):
+        return func
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs) -> Any:
+        uow = request_uow.get()
+        try:
+            result = await func(*args, **kwargs)
+        except BaseException:
+            if uow is not None:
+                await uow.release(commit=False)
+            raise
+        if uow is not None:
+            await uow.release(commit=True)
+        return result
+
+    return wrapper
+
+
+def bind_request_session(routes: list[BaseRoute]) -> None:
+    """
+    为路由绑定请求级会话释放
+
+    :param routes: 应用路由列表
+    :return:
+    """
+    for route in routes:
+        if isinstance(route, APIRoute):
+            route.dependant.call = release_after_endpoint(route.dependant.call)
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.common.log import log
+from backend.core.conf import settings
+from backend.utils.compress import StreamCompressor, available_encodings
+
+
+def negotiate_encoding(accept_encoding: str, encodings: tuple[str, ...]) -> str | None:
+    """
+    按 Accept-Encoding 协商内容编码，质量值相同时按服务端优先级选择
+
+    :param accept_encoding: Accept-Encoding 请求头
+    :param encodings: 服务端支持的编码，按优先级排列
+    :return: 无可用编码时返回 None
+    """
+    qualities: dict[str, float] = {}
+    for item in accept_encoding.lower().split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[coding] = quality
+
+    wildcard = qualities.get('*', 0.0)
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = qualities.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressMiddleware:
+    """响应压缩中间件，按 Accept-Encoding 协商 zstd、brotli 或 gzip 编码"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        encodings: list[str] | None = None,
+        minimum_size: int | None = None,
+        content_types: list[str] | None = None,
+        levels: dict[str, int] | None = None,
+    ) -> None:
+        """
+        初始化中间件
+
+        :param app: ASGI 应用
+        :param encodings: 启用的编码，按服务端优先级排列
+        :param minimum_size: 最小压缩大小（字节）
+        :param content_types: 允许压缩的内容类型
+        :param levels: 各编码的压缩级别
+        :return:
+        """
+        self.app = app
+        encodings = settings.COMPRESS_ENCODINGS if encodings is None else encodings
+        unavailable = set(encodings) - set(available_encodings())
+        if unavailable:
+            log.warning(f'响应压缩编码 {", ".join(sorted(unavailable))} 不可用，已忽略')
+        self.encodings = tuple(encoding for encoding in encodings if encoding not in unavailable)
+        self.minimum_size = settings.COMPRESS_MINIMUM_SIZE if minimum_size is None else minimum_size
+        self.content_types = frozenset(settings.COMPRESS_CONTENT_TYPES if content_types is None else content_types)
+        self.levels = {
+            'zstd': settings.COMPRESS_ZSTD_LEVEL,
+            'br': settings.COMPRESS_BROTLI_LEVEL,
+            'gzip': settings.COMPRESS_GZIP_LEVEL,
+            **(levels or {}),
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or scope['method'] == 'HEAD':
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get('accept-encoding', ''), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressResponder(self, send, encoding)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressResponder:
+    """单个响应的压缩状态，响应头延迟到首个响应体消息时发送"""
+
+    def __init__(self, middleware: CompressMiddleware, send: Send, encoding: str) -> None:
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start: Message | None = None
+        self.compressor: StreamCompressor | None = None
+        self.passthrough = False
+
+    def compressible(self, message: Message) -> bool:
+        """
+        判断响应是否可压缩，已编码、分段或不在类型白名单内的响应原样返回
+
+        :param message: 响应开始消息
+        :return:
+        """
+        status = message['status']
+        if status < 200 or status in (204, 206, 304):
+            return False
+        headers = Headers(raw=message['headers'])
+        if 'content-encoding' in headers or 'content-range' in headers:
+            return False
+        content_type = headers.get('content-type', '').partition(';')[0].strip().lower()
+        return content_type in self.middleware.content_types
+
+    def encode_headers(self, body_length: int | None) -> None:
+        """
+        设置压缩后的响应头
+
+        :param body_length: 压缩后的长度，流式响应为 None
+        :return:
+        """
+        headers = MutableHeaders(raw=list(self.start['headers']))
+        headers['Content-Encoding'] = self.encoding
+        if body_length is None:
+            del headers['Content-Length']
+        else:
+            headers['Content-Length'] = str(body_length)
+        headers.add_vary_header('Accept-Encoding')
+        # 压缩后的字节与原响应不同，强实体标签降级为弱实体标签
+        etag = headers.get('etag')
+        if etag and not etag.startswith('W/'):
+            headers['ETag'] = f'W/{etag}'
+        self.start['headers'] = headers.raw
+
+    async def send(self, message: Message) -> None:
+        if self.passthrough:
+            await self._send(message)
+            return
+
+        if message['type'] == 'http.response.start':
+            if self.compressible(message):
+                self.start = message
+            else:
+                self.passthrough = True
+                await self._send(message)
+            return
+
+        if message['type'] != 'http.response.body':
+            # 如 http.response.pathsend 等扩展，原样发送
+            self.passthrough = True
+            await self._send(self.start)
+            await self._send(message)
+            return
+
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+        if self.compressor is None:
+            if not more_body:
+                if len(body) < self.middleware.minimum_size:
+                    self.passthrough = True
+                    await self._send(self.start)
+                    await self._send(message)
+                    return
+                compressor = StreamCompressor(self.encoding, self.middleware.levels[self.encoding])
+                body = compressor.compress(body) + compressor.finish()
+                self.encode_headers(len(body))
+                await self._send(self.start)
+                await self._send({'type': 'http.response.body', 'body': body})
+                return
+            # 流式响应（如导出、文件下载）边读边压缩，长度未知
+            self.compressor = StreamCompressor(self.encoding, self.middleware.levels[self.encoding])
+            self.encode_headers(None)
+            await self._send(self.start)
+
+        data = self.compressor.compress(body)
+        if not more_body:
+            data += self.compressor.finish()
+        if data or not more_body:
+            await self._send({'type': 'http.response.body', 'body': data, 'more_body': more_body})
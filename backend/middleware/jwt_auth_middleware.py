@@ -12,6 +12,8 @@ from backend.common.exception.errors import TokenError
 from backend.common.log import log
 from backend.common.security.jwt import jwt_authentication
 from backend.core.conf import settings
+from backend.database.db import replica_pool
+from backend.database.router import bind_route_state
 from backend.utils.serializers import MsgSpecJSONResponse
 
 
@@ -74,6 +76,10 @@ class JwtAuthMiddleware(AuthenticationBackend):
             log.exception(f'JWT 授权异常：{e}')
             raise _AuthenticationError(code=getattr(e, 'code', 500), msg=getattr(e, 'msg', 'Internal Server Error'))
 
+        # 读写分离时，设置当前用户的读写路由状态
+        if replica_pool:
+            await bind_route_state(user.id)
+
         # 请注意，此返回使用非标准模式，所以在认证通过时，将丢失某些标准特性
         # 标准返回模式请查看：https://www.starlette.io/authentication/
         return AuthCredentials(['authenticated']), user
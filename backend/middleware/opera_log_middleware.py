@@ -8,13 +8,16 @@ from fastapi import Response
 from starlette.datastructures import UploadFile
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
+from starlette.types import ASGIApp
 
 from backend.app.admin.schema.opera_log import CreateOperaLogParam
 from backend.app.admin.service.opera_log_service import opera_log_service
 from backend.common.dataclasses import RequestCallNext
 from backend.common.enums import OperaLogCipherType, StatusType
 from backend.common.log import log
+from backend.common.opera_log import READ_METHODS, opera_log_policy_registry
 from backend.core.conf import settings
+from backend.database.uow import without_request_session
 from backend.utils.encrypt import AESCipher, ItsDCipher, Md5Cipher
 from backend.utils.timezone import timezone
 from backend.utils.trace_id import get_request_trace_id
@@ -23,6 +26,16 @@ from backend.utils.trace_id import get_request_trace_id
 class OperaLogMiddleware(BaseHTTPMiddleware):
     """操作日志中间件"""
 
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        初始化操作日志中间件
+
+        :param app: ASGI 应用
+        :return:
+        """
+        super().__init__(app)
+        self.path_exclude = frozenset(settings.OPERA_LOG_PATH_EXCLUDE)
+
     async def dispatch(self, request: Request, call_next: Any) -> Response:
         """
         处理请求并记录操作日志
@@ -33,7 +46,7 @@ class OperaLogMiddleware(BaseHTTPMiddleware):
         """
         # 排除记录白名单
         path = request.url.path
-        if path in settings.OPERA_LOG_PATH_EXCLUDE or not path.startswith(f'{settings.FASTAPI_API_V1_PATH}'):
+        if path in self.path_exclude or not path.startswith(f'{settings.FASTAPI_API_V1_PATH}'):
             return await call_next(request)
 
         # 请求解析
@@ -43,8 +56,9 @@ class OperaLogMiddleware(BaseHTTPMiddleware):
         except AttributeError:
             username = None
         method = request.method
-        args = await self.get_request_args(request)
-        args = await self.desensitization(args)
+        # 请求体只能在执行请求前读取，只读请求的参数在确定记录后再解析
+        is_read = method in READ_METHODS
+        args = None if is_read else await self.desensitization(await self.get_request_args(request))
 
         # 执行请求
         start_time = timezone.now()
@@ -56,29 +70,36 @@ class OperaLogMiddleware(BaseHTTPMiddleware):
         _route = request.scope.get('route')
         summary = getattr(_route, 'summary', None) or ''
 
-        # 日志创建
-        opera_log_in = CreateOperaLogParam(
-            trace_id=get_request_trace_id(request),
-            username=username,
-            method=method,
-            title=summary,
-            path=path,
-            ip=request.state.ip,
-            country=request.state.country,
-            region=request.state.region,
-            city=request.state.city,
-            user_agent=request.state.user_agent,
-            os=request.state.os,
-            browser=request.state.browser,
-            device=request.state.device,
-            args=args,
-            status=request_next.status,
-            code=request_next.code,
-            msg=request_next.msg,
-            cost_time=cost_time,
-            opera_time=start_time,
-        )
-        create_task(opera_log_service.create(obj=opera_log_in))  # noqa: ignore
+        # 路由策略
+        policy = opera_log_policy_registry.get(_route, method)
+        error = request_next.status == StatusType.disable or not request_next.code.startswith('2')
+        if opera_log_policy_registry.should_log(policy, method, error):
+            if is_read:
+                args = await self.desensitization(self.get_read_args(request))
+
+            # 日志创建
+            opera_log_in = CreateOperaLogParam(
+                trace_id=get_request_trace_id(request),
+                username=username,
+                method=method,
+                title=summary,
+                path=path,
+                ip=request.state.ip,
+                country=request.state.country,
+                region=request.state.region,
+                city=request.state.city,
+                user_agent=request.state.user_agent,
+                os=request.state.os,
+                browser=request.state.browser,
+                device=request.state.device,
+                args=args,
+                status=request_next.status,
+                code=request_next.code,
+                msg=request_next.msg,
+                cost_time=cost_time,
+                opera_time=start_time,
+            )
+            create_task(without_request_session(opera_log_service.create(obj=opera_log_in)))  # noqa: ignore
 
         # 错误抛出
         if request_next.err:
@@ -168,6 +189,18 @@ class OperaLogMiddleware(BaseHTTPMiddleware):
                 args.update({'body': str(body_data)})
         return args
 
+    @staticmethod
+    def get_read_args(request: Request) -> dict[str, Any]:
+        """
+        获取只读请求参数
+
+        :param request: FastAPI 请求对象
+        :return:
+        """
+        args = dict(request.query_params)
+        args.update(request.path_params)
+        return args
+
     @staticmethod
     @sync_to_async
     def desensitization(args: dict[str, Any]) -> dict[str, Any] | None:
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from backend.database.db import async_db_session
+from backend.database.uow import RequestUnitOfWork, request_uow
+
+
+class RequestSessionMiddleware:
+    """请求级数据库会话中间件，为每个请求创建工作单元，请求内的服务共享同一数据库连接"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        uow = RequestUnitOfWork(async_db_session.maker)
+        token = request_uow.set(uow)
+        try:
+            await self.app(scope, receive, send)
+        except BaseException:
+            await uow.release(commit=False)
+            raise
+        else:
+            # 未经过路由函数释放的请求（如认证失败）
+            await uow.release(commit=True)
+        finally:
+            request_uow.reset(token)
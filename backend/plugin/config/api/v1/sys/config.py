@@ -2,13 +2,16 @@
 # -*- coding: utf-8 -*-
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Path, Query
+from fastapi import APIRouter, Depends, Path, Query, Response
 
+from backend.common.etag import conditional_get
 from backend.common.pagination import DependsPagination, PageData, paging_data
 from backend.common.response.response_schema import ResponseModel, ResponseSchemaModel, response_base
 from backend.common.security.jwt import DependsJwtAuth
 from backend.common.security.permission import RequestPermission
 from backend.common.security.rbac import DependsRBAC
+from backend.common.sparse_fields import FieldSet, sparse_fields
+from backend.common.struct_body import struct_body
 from backend.database.db import CurrentSession
 from backend.plugin.config.schema.config import (
     CreateConfigParam,
@@ -21,7 +24,7 @@ from backend.plugin.config.service.config_service import config_service
 router = APIRouter()
 
 
-@router.get('/website', summary='获取网站参数配置', dependencies=[DependsJwtAuth])
+@router.get('/website', summary='获取网站参数配置', dependencies=[DependsJwtAuth, conditional_get('config')])
 async def get_website_config() -> ResponseSchemaModel[list[GetConfigDetail]]:
     config = await config_service.get_built_in_config('website')
     return response_base.success(data=config)
@@ -40,7 +43,7 @@ async def save_website_config(objs: list[SaveBuiltInConfigParam]) -> ResponseMod
     return response_base.success()
 
 
-@router.get('/protocol', summary='获取用户协议', dependencies=[DependsJwtAuth])
+@router.get('/protocol', summary='获取用户协议', dependencies=[DependsJwtAuth, conditional_get('config')])
 async def get_protocol_config() -> ResponseSchemaModel[list[GetConfigDetail]]:
     config = await config_service.get_built_in_config('protocol')
     return response_base.success(data=config)
@@ -59,7 +62,7 @@ async def save_protocol_config(objs: list[SaveBuiltInConfigParam]) -> ResponseMo
     return response_base.success()
 
 
-@router.get('/policy', summary='获取用户政策', dependencies=[DependsJwtAuth])
+@router.get('/policy', summary='获取用户政策', dependencies=[DependsJwtAuth, conditional_get('config')])
 async def get_policy_config() -> ResponseSchemaModel[list[GetConfigDetail]]:
     config = await config_service.get_built_in_config('policy')
     return response_base.success(data=config)
@@ -78,7 +81,7 @@ async def save_policy_config(objs: list[SaveBuiltInConfigParam]) -> ResponseMode
     return response_base.success()
 
 
-@router.get('/{pk}', summary='获取参数配置详情', dependencies=[DependsJwtAuth])
+@router.get('/{pk}', summary='获取参数配置详情', dependencies=[DependsJwtAuth, conditional_get('config')])
 async def get_config(pk: Annotated[int, Path(description='参数配置 ID')]) -> ResponseSchemaModel[GetConfigDetail]:
     config = await config_service.get(pk)
     return response_base.success(data=config)
@@ -87,19 +90,22 @@ async def get_config(pk: Annotated[int, Path(description='参数配置 ID')]) ->
 @router.get(
     '',
     summary='分页获取所有参数配置',
+    response_model=ResponseSchemaModel[PageData[GetConfigDetail]],
     dependencies=[
         DependsJwtAuth,
         DependsPagination,
+        conditional_get('config'),
     ],
 )
 async def get_pagination_configs(
     db: CurrentSession,
+    fields: Annotated[FieldSet, sparse_fields(GetConfigDetail)],
     name: Annotated[str | None, Query(description='参数配置名称')] = None,
     type: Annotated[str | None, Query()] = None,
-) -> ResponseSchemaModel[PageData[GetConfigDetail]]:
-    config_select = await config_service.get_select(name=name, type=type)
+) -> Response:
+    config_select = fields.project(await config_service.get_select(name=name, type=type))
     page_data = await paging_data(db, config_select)
-    return response_base.success(data=page_data)
+    return response_base.fast_success(data=page_data, schema=PageData[fields.schema])
 
 
 @router.post(
@@ -110,7 +116,7 @@ async def get_pagination_configs(
         DependsRBAC,
     ],
 )
-async def create_config(obj: CreateConfigParam) -> ResponseModel:
+async def create_config(obj: Annotated[CreateConfigParam, struct_body(CreateConfigParam)]) -> ResponseModel:
     await config_service.create(obj=obj)
     return response_base.success()
 
@@ -123,7 +129,10 @@ async def create_config(obj: CreateConfigParam) -> ResponseModel:
         DependsRBAC,
     ],
 )
-async def update_config(pk: Annotated[int, Path(description='参数配置 ID')], obj: UpdateConfigParam) -> ResponseModel:
+async def update_config(
+    pk: Annotated[int, Path(description='参数配置 ID')],
+    obj: Annotated[UpdateConfigParam, struct_body(UpdateConfigParam)],
+) -> ResponseModel:
     count = await config_service.update(pk=pk, obj=obj)
     if count > 0:
         return response_base.success()
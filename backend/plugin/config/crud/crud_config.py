@@ -1,14 +1,16 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-from typing import Sequence
+from typing import Iterable, Sequence
 
-from sqlalchemy import Select
+from sqlalchemy import Select, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy_crud_plus import CRUDPlus
 
+from backend.database.dml import conditional_update, unique_except_self, upsert
 from backend.plugin.config.conf import config_settings
 from backend.plugin.config.model import Config
-from backend.plugin.config.schema.config import CreateConfigParam, UpdateConfigParam
+from backend.plugin.config.schema.config import CreateConfigParam, SaveBuiltInConfigParam, UpdateConfigParam
+from backend.utils.timezone import timezone
 
 
 class CRUDConfig(CRUDPlus[Config]):
@@ -55,6 +57,21 @@ class CRUDConfig(CRUDPlus[Config]):
         """
         return await self.select_model_by_column(db, key=key)
 
+    async def get_keys_of_other_type(self, db: AsyncSession, keys: Iterable[str], type: str) -> Sequence[str]:
+        """
+        获取已被其他类型占用的键名
+
+        :param db: 数据库会话
+        :param keys: 参数配置键名
+        :param type: 参数配置类型
+        :return:
+        """
+        stmt = select(self.model.key).where(
+            self.model.key.in_(set(keys)), or_(self.model.type.is_(None), self.model.type != type)
+        )
+        result = await db.execute(stmt)
+        return result.scalars().all()
+
     async def get_list(self, name: str | None, type: str | None) -> Select:
         """
         获取参数配置列表
@@ -80,6 +97,22 @@ class CRUDConfig(CRUDPlus[Config]):
         """
         await self.create_model(db, obj)
 
+    async def save_built_in(self, db: AsyncSession, objs: Sequence[SaveBuiltInConfigParam], type: str) -> int:
+        """
+        批量保存内置参数配置，键名已存在时更新名称和键值
+
+        :param db: 数据库会话
+        :param objs: 保存内置参数配置参数列表，键名不可重复
+        :param type: 参数配置类型
+        :return:
+        """
+        now = timezone.now()
+        rows = [
+            {**obj.model_dump(), 'type': type, 'is_frontend': False, 'remark': None, 'created_time': now}
+            for obj in objs
+        ]
+        return await upsert(db, self.model, rows, ['key'], ['name', 'value'], updated_time=now)
+
     async def update(self, db: AsyncSession, pk: int, obj: UpdateConfigParam) -> int:
         """
         更新参数配置
@@ -87,9 +120,16 @@ class CRUDConfig(CRUDPlus[Config]):
         :param db: 数据库会话
         :param pk: 参数配置 ID
         :param obj: 更新参数配置参数
-        :return:
-        """
-        return await self.update_model(db, pk, obj)
+        :return: 更新行数，参数配置不存在或键名已存在时为 0
+        """
+        return await conditional_update(
+            db,
+            self.model,
+            pk,
+            obj.model_dump(exclude_unset=True),
+            self.model.type.not_in(config_settings.CONFIG_BUILT_IN_TYPES),
+            unique_except_self(self.model, pk, {'key': obj.key}),
+        )
 
     async def delete(self, db: AsyncSession, pk: list[int]) -> int:
         """
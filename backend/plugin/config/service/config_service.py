@@ -6,6 +6,7 @@ from sqlalchemy import Select
 
 from backend.common.exception import errors
 from backend.database.db import async_db_session
+from backend.database.redis import redis_client
 from backend.plugin.config.conf import config_settings
 from backend.plugin.config.crud.crud_config import config_dao
 from backend.plugin.config.model import Config
@@ -39,15 +40,15 @@ class ConfigService:
         :param type: 参数配置类型
         :return:
         """
+        # 键名重复时以最后一次提交为准
+        configs = {obj.key: obj for obj in objs}
         async with async_db_session.begin() as db:
-            for obj in objs:
-                config = await config_dao.get_by_key_and_type(db, obj.key, type)
-                if config is None:
-                    if await config_dao.get_by_key(db, obj.key):
-                        raise errors.ForbiddenError(msg=f'参数配置 {obj.key} 已存在')
-                    await config_dao.create_model(db, obj, flush=True, type=type)
-                else:
-                    await config_dao.update_model(db, config.id, obj, type=type)
+            conflicts = set(await config_dao.get_keys_of_other_type(db, configs, type))
+            for key in configs:
+                if key in conflicts:
+                    raise errors.ForbiddenError(msg=f'参数配置 {key} 已存在')
+            await config_dao.save_built_in(db, list(configs.values()), type)
+        await redis_client.bump_generation('config')
 
     @staticmethod
     async def get(pk: int) -> Config:
@@ -89,6 +90,7 @@ class ConfigService:
             if config:
                 raise errors.ForbiddenError(msg=f'参数配置 {obj.key} 已存在')
             await config_dao.create(db, obj)
+        await redis_client.bump_generation('config')
 
     @staticmethod
     async def update(*, pk: int, obj: UpdateConfigParam) -> int:
@@ -100,15 +102,13 @@ class ConfigService:
         :return:
         """
         async with async_db_session.begin() as db:
-            config = await config_dao.get(db, pk)
-            if not config:
-                raise errors.NotFoundError(msg='参数配置不存在')
-            if config.key != obj.key:
-                config = await config_dao.get_by_key(db, obj.key)
-                if config:
-                    raise errors.ForbiddenError(msg=f'参数配置 {obj.key} 已存在')
             count = await config_dao.update(db, pk, obj)
-            return count
+            if not count:
+                if not await config_dao.get(db, pk):
+                    raise errors.NotFoundError(msg='参数配置不存在')
+                raise errors.ForbiddenError(msg=f'参数配置 {obj.key} 已存在')
+        await redis_client.bump_generation('config')
+        return count
 
     @staticmethod
     async def delete(*, pk: list[int]) -> int:
@@ -120,7 +120,8 @@ class ConfigService:
         """
         async with async_db_session.begin() as db:
             count = await config_dao.delete(db, pk)
-            return count
+        await redis_client.bump_generation('config')
+        return count
 
 
 config_service: ConfigService = ConfigService()
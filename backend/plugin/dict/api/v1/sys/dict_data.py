@@ -2,13 +2,16 @@
 # -*- coding: utf-8 -*-
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Path, Query
+from fastapi import APIRouter, Depends, Path, Query, Response
 
+from backend.common.etag import conditional_get
 from backend.common.pagination import DependsPagination, PageData, paging_data
 from backend.common.response.response_schema import ResponseModel, ResponseSchemaModel, response_base
 from backend.common.security.jwt import DependsJwtAuth
 from backend.common.security.permission import RequestPermission
 from backend.common.security.rbac import DependsRBAC
+from backend.common.sparse_fields import FieldSet, sparse_fields
+from backend.common.struct_body import struct_body
 from backend.database.db import CurrentSession
 from backend.plugin.dict.schema.dict_data import (
     CreateDictDataParam,
@@ -21,7 +24,14 @@ from backend.plugin.dict.service.dict_data_service import dict_data_service
 router = APIRouter()
 
 
-@router.get('/{pk}', summary='Get dictionary details', dependencies=[DependsJwtAuth])
+@router.get(
+    '/{pk}',
+    summary='Get dictionary details',
+    dependencies=[
+        DependsJwtAuth,
+        conditional_get('dict_data', 'dict_type'),
+    ],
+)
 async def get_dict_data(
     pk: Annotated[int, Path(description='Dictionary data ID')],
 ) -> ResponseSchemaModel[GetDictDataWithRelation]:
@@ -32,20 +42,23 @@ async def get_dict_data(
 @router.get(
     '',
     summary='分页获取所有字典',
+    response_model=ResponseSchemaModel[PageData[GetDictDataDetail]],
     dependencies=[
         DependsJwtAuth,
         DependsPagination,
+        conditional_get('dict_data'),
     ],
 )
 async def get_pagination_dict_datas(
     db: CurrentSession,
+    fields: Annotated[FieldSet, sparse_fields(GetDictDataDetail)],
     label: Annotated[str | None, Query(description='Dictionary data label')] = None,
     value: Annotated[str | None, Query(description='Dictionary data key value')] = None,
     status: Annotated[int | None, Query(description='Status')] = None,
-) -> ResponseSchemaModel[PageData[GetDictDataDetail]]:
-    dict_data_select = await dict_data_service.get_select(label=label, value=value, status=status)
+) -> Response:
+    dict_data_select = fields.project(await dict_data_service.get_select(label=label, value=value, status=status))
     page_data = await paging_data(db, dict_data_select)
-    return response_base.success(data=page_data)
+    return response_base.fast_success(data=page_data, schema=PageData[fields.schema])
 
 
 @router.post(
@@ -56,7 +69,7 @@ async def get_pagination_dict_datas(
         DependsRBAC,
     ],
 )
-async def create_dict_data(obj: CreateDictDataParam) -> ResponseModel:
+async def create_dict_data(obj: Annotated[CreateDictDataParam, struct_body(CreateDictDataParam)]) -> ResponseModel:
     await dict_data_service.create(obj=obj)
     return response_base.success()
 
@@ -70,7 +83,8 @@ async def create_dict_data(obj: CreateDictDataParam) -> ResponseModel:
     ],
 )
 async def update_dict_data(
-    pk: Annotated[int, Path(description='Dictionary data ID')], obj: UpdateDictDataParam
+    pk: Annotated[int, Path(description='Dictionary data ID')],
+    obj: Annotated[UpdateDictDataParam, struct_body(UpdateDictDataParam)],
 ) -> ResponseModel:
     count = await dict_data_service.update(pk=pk, obj=obj)
     if count > 0:
@@ -2,13 +2,16 @@
 # -*- coding: utf-8 -*-
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Path, Query
+from fastapi import APIRouter, Depends, Path, Query, Response
 
+from backend.common.etag import conditional_get
 from backend.common.pagination import DependsPagination, PageData, paging_data
 from backend.common.response.response_schema import ResponseModel, ResponseSchemaModel, response_base
 from backend.common.security.jwt import DependsJwtAuth
 from backend.common.security.permission import RequestPermission
 from backend.common.security.rbac import DependsRBAC
+from backend.common.sparse_fields import FieldSet, sparse_fields
+from backend.common.struct_body import struct_body
 from backend.database.db import CurrentSession
 from backend.plugin.dict.schema.dict_type import CreateDictTypeParam, GetDictTypeDetail, UpdateDictTypeParam
 from backend.plugin.dict.service.dict_type_service import dict_type_service
@@ -19,20 +22,23 @@ router = APIRouter()
 @router.get(
     '',
     summary='Paginate to get all dictionary types',
+    response_model=ResponseSchemaModel[PageData[GetDictTypeDetail]],
     dependencies=[
         DependsJwtAuth,
         DependsPagination,
+        conditional_get('dict_type'),
     ],
 )
 async def get_pagination_dict_types(
     db: CurrentSession,
+    fields: Annotated[FieldSet, sparse_fields(GetDictTypeDetail)],
     name: Annotated[str | None, Query(description='Dictionary type name')] = None,
     code: Annotated[str | None, Query(description='Dictionary type code')] = None,
     status: Annotated[int | None, Query(description='Status')] = None,
-) -> ResponseSchemaModel[PageData[GetDictTypeDetail]]:
-    dict_type_select = await dict_type_service.get_select(name=name, code=code, status=status)
+) -> Response:
+    dict_type_select = fields.project(await dict_type_service.get_select(name=name, code=code, status=status))
     page_data = await paging_data(db, dict_type_select)
-    return response_base.success(data=page_data)
+    return response_base.fast_success(data=page_data, schema=PageData[fields.schema])
 
 
 @router.post(
@@ -43,7 +49,7 @@ async def get_pagination_dict_types(
         DependsRBAC,
     ],
 )
-async def create_dict_type(obj: CreateDictTypeParam) -> ResponseModel:
+async def create_dict_type(obj: Annotated[CreateDictTypeParam, struct_body(CreateDictTypeParam)]) -> ResponseModel:
     await dict_type_service.create(obj=obj)
     return response_base.success()
 
@@ -57,7 +63,8 @@ async def create_dict_type(obj: CreateDictTypeParam) -> ResponseModel:
     ],
 )
 async def update_dict_type(
-    pk: Annotated[int, Path(description='Dictionary type ID')], obj: UpdateDictTypeParam
+    pk: Annotated[int, Path(description='Dictionary type ID')],
+    obj: Annotated[UpdateDictTypeParam, struct_body(UpdateDictTypeParam)],
 ) -> ResponseModel:
     count = await dict_type_service.update(pk=pk, obj=obj)
     if count > 0:
@@ -4,6 +4,7 @@ from sqlalchemy import Select
 
 from backend.common.exception import errors
 from backend.database.db import async_db_session
+from backend.database.redis import redis_client
 from backend.plugin.dict.crud.crud_dict_data import dict_data_dao
 from backend.plugin.dict.crud.crud_dict_type import dict_type_dao
 from backend.plugin.dict.model import DictData
@@ -55,6 +56,7 @@ class DictDataService:
             if not dict_type:
                 raise errors.NotFoundError(msg='Dictionary type does not exist')
             await dict_data_dao.create(db, obj)
+        await redis_client.bump_generation('dict_data')
 
     @staticmethod
     async def update(*, pk: int, obj: UpdateDictDataParam) -> int:
@@ -76,7 +78,8 @@ class DictDataService:
             if not dict_type:
                 raise errors.NotFoundError(msg='Dictionary type does not exist')
             count = await dict_data_dao.update(db, pk, obj)
-            return count
+        await redis_client.bump_generation('dict_data')
+        return count
 
     @staticmethod
     async def delete(*, pk: list[int]) -> int:
@@ -88,7 +91,8 @@ class DictDataService:
         """
         async with async_db_session.begin() as db:
             count = await dict_data_dao.delete(db, pk)
-            return count
+        await redis_client.bump_generation('dict_data')
+        return count
 
 
 dict_data_service: DictDataService = DictDataService()
@@ -4,6 +4,7 @@ from sqlalchemy import Select
 
 from backend.common.exception import errors
 from backend.database.db import async_db_session
+from backend.database.redis import redis_client
 from backend.plugin.dict.crud.crud_dict_type import dict_type_dao
 from backend.plugin.dict.schema.dict_type import CreateDictTypeParam, UpdateDictTypeParam
 
@@ -36,6 +37,7 @@ class DictTypeService:
             if dict_type:
                 raise errors.ForbiddenError(msg='Dictionary type already exists')
             await dict_type_dao.create(db, obj)
+        await redis_client.bump_generation('dict_type')
 
     @staticmethod
     async def update(*, pk: int, obj: UpdateDictTypeParam) -> int:
@@ -54,7 +56,8 @@ class DictTypeService:
                 if await dict_type_dao.get_by_code(db, obj.code):
                     raise errors.ForbiddenError(msg='Dictionary type already exists')
             count = await dict_type_dao.update(db, pk, obj)
-            return count
+        await redis_client.bump_generation('dict_type')
+        return count
 
     @staticmethod
     async def delete(*, pk: list[int]) -> int:
@@ -66,7 +69,10 @@ class DictTypeService:
         """
         async with async_db_session.begin() as db:
             count = await dict_type_dao.delete(db, pk)
-            return count
+        await redis_client.bump_generation('dict_type')
+        # 字典数据随字典类型级联删除
+        await redis_client.bump_generation('dict_data')
+        return count
 
 
 dict_type_service: DictTypeService = DictTypeService()
@@ -2,13 +2,16 @@
 # -*- coding: utf-8 -*-
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Path, Query
+from fastapi import APIRouter, Depends, Path, Query, Response
 
+from backend.common.etag import conditional_get
 from backend.common.pagination import DependsPagination, PageData, paging_data
 from backend.common.response.response_schema import ResponseModel, ResponseSchemaModel, response_base
 from backend.common.security.jwt import DependsJwtAuth
 from backend.common.security.permission import RequestPermission
 from backend.common.security.rbac import DependsRBAC
+from backend.common.sparse_fields import FieldSet, sparse_fields
+from backend.common.struct_body import struct_body
 from backend.database.db import CurrentSession
 from backend.plugin.notice.schema.notice import CreateNoticeParam, GetNoticeDetail, UpdateNoticeParam
 from backend.plugin.notice.service.notice_service import notice_service
@@ -16,7 +19,14 @@ from backend.plugin.notice.service.notice_service import notice_service
 router = APIRouter()
 
 
-@router.get('/{pk}', summary='Get notice announcement details', dependencies=[DependsJwtAuth])
+@router.get(
+    '/{pk}',
+    summary='Get notice announcement details',
+    dependencies=[
+        DependsJwtAuth,
+        conditional_get('notice'),
+    ],
+)
 async def get_notice(pk: Annotated[int, Path(description='Notice announcement ID')]) -> ResponseSchemaModel[GetNoticeDetail]:
     notice = await notice_service.get(pk=pk)
     return response_base.success(data=notice)
@@ -25,15 +35,19 @@ async def get_notice(pk: Annotated[int, Path(description='Notice announcement ID
 @router.get(
     '',
     summary='分页获取所有通知公告',
+    response_model=ResponseSchemaModel[PageData[GetNoticeDetail]],
     dependencies=[
         DependsJwtAuth,
         DependsPagination,
+        conditional_get('notice'),
     ],
 )
-async def get_pagination_notices(db: CurrentSession) -> ResponseSchemaModel[PageData[GetNoticeDetail]]:
-    notice_select = await notice_service.get_select()
+async def get_pagination_notices(
+    db: CurrentSession, fields: Annotated[FieldSet, sparse_fields(GetNoticeDetail)]
+) -> Response:
+    notice_select = fields.project(await notice_service.get_select())
     page_data = await paging_data(db, notice_select)
-    return response_base.success(data=page_data)
+    return response_base.fast_success(data=page_data, schema=PageData[fields.schema])
 
 
 @router.post(
@@ -44,7 +58,7 @@ async def get_pagination_notices(db: CurrentSession) -> ResponseSchemaModel[Page
         DependsRBAC,
     ],
 )
-async def create_notice(obj: CreateNoticeParam) -> ResponseModel:
+async def create_notice(obj: Annotated[CreateNoticeParam, struct_body(CreateNoticeParam)]) -> ResponseModel:
     await notice_service.create(obj=obj)
     return response_base.success()
 
@@ -57,7 +71,10 @@ async def create_notice(obj: CreateNoticeParam) -> ResponseModel:
         DependsRBAC,
     ],
 )
-async def update_notice(pk: Annotated[int, Path(description='Notice announcement ID')], obj: UpdateNoticeParam) -> ResponseModel:
+async def update_notice(
+    pk: Annotated[int, Path(description='Notice announcement ID')],
+    obj: Annotated[UpdateNoticeParam, struct_body(UpdateNoticeParam)],
+) -> ResponseModel:
     count = await notice_service.update(pk=pk, obj=obj)
     if count > 0:
         return response_base.success()
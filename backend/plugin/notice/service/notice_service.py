@@ -6,6 +6,7 @@ from sqlalchemy import Select
 
 from backend.common.exception import errors
 from backend.database.db import async_db_session
+from backend.database.redis import redis_client
 from backend.plugin.notice.crud.crud_notice import notice_dao
 from backend.plugin.notice.model import Notice
 from backend.plugin.notice.schema.notice import CreateNoticeParam, UpdateNoticeParam
@@ -50,6 +51,7 @@ class NoticeService:
         """
         async with async_db_session.begin() as db:
             await notice_dao.create(db, obj)
+        await redis_client.bump_generation('notice')
 
     @staticmethod
     async def update(*, pk: int, obj: UpdateNoticeParam) -> int:
@@ -65,7 +67,8 @@ class NoticeService:
             if not notice:
                 raise errors.NotFoundError(msg='Notice announcement does not exist')
             count = await notice_dao.update(db, pk, obj)
-            return count
+        await redis_client.bump_generation('notice')
+        return count
 
     @staticmethod
     async def delete(*, pk: list[int]) -> int:
@@ -77,7 +80,8 @@ class NoticeService:
         """
         async with async_db_session.begin() as db:
             count = await notice_dao.delete(db, pk)
-            return count
+        await redis_client.bump_generation('notice')
+        return count
 
 
 notice_service: NoticeService = NoticeService()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+响应压缩基准测试
+
+对比 zstd、brotli、gzip 在不同压缩级别下对典型接口响应（分页用户列表、菜单树、CSV 导出）的压缩率和吞吐量，
+流式压缩按导出分块大小逐块压缩，无需启动服务
+
+用法::
+
+    python backend/scripts/bench_compress.py
+    python backend/scripts/bench_compress.py --rows 20000 --repeat 5 --zstd-levels 1 3 6 --gzip-levels 1 5 9
+"""
+
+import argparse
+import random
+import time
+
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+import msgspec
+
+from backend.core.conf import settings
+from backend.utils.build_tree import build_tree
+from backend.utils.compress import StreamCompressor, available_encodings
+
+
+def _user_page(rows: int) -> bytes:
+    """分页用户列表响应"""
+    rng = random.Random(rows)
+    base = datetime(2024, 1, 1)
+    items = [
+        {
+            'id': i,
+            'uuid': f'{rng.getrandbits(128):032x}',
+            'username': f'user{i}',
+            'nickname': f'用户{i}',
+            'email': f'user{i}@example.com',
+            'phone': f'138{rng.randint(0, 99999999):08d}',
+            'avatar': None,
+            'status': rng.choice((0, 1)),
+            'is_superuser': False,
+            'is_staff': rng.random() < 0.2,
+            'is_multi_login': False,
+            'dept_id': rng.randint(1, 50),
+            'join_time': (base + timedelta(minutes=i)).strftime(settings.DATETIME_FORMAT),
+            'last_login_time': (base + timedelta(hours=rng.randint(0, 10000))).strftime(settings.DATETIME_FORMAT),
+        }
+        for i in range(1, rows + 1)
+    ]
+    page = {'items': items, 'total': rows, 'page': 1, 'size': rows, 'total_pages': 1, 'links': {}}
+    return msgspec.json.encode({'code': 200, 'msg': '请求成功', 'data': page})
+
+
+def _menu_tree(rows: int) -> bytes:
+    """菜单树响应"""
+    rng = random.Random(rows)
+    nodes = [
+        {
+            'id': i,
+            'name': f'Menu{i}',
+            'path': f'/system/menu{i}',
+            'sort': rng.randint(0, 100),
+            'type': rng.choice((0, 1, 2)),
+            'component': f'/views/system/menu{i}/index.vue',
+            'perms': f'sys:menu{i}:view',
+            'parent_id': None if i <= 10 else rng.randint(1, i - 1),
+            'meta': {'title': f'菜单{i}', 'icon': 'carbon:menu', 'keepAlive': True, 'hideInMenu': False},
+        }
+        for i in range(1, rows + 1)
+    ]
+    return msgspec.json.encode({'code': 200, 'msg': '请求成功', 'data': build_tree(nodes, sort_key='sort')})
+
+
+def _csv_export(rows: int) -> bytes:
+    """CSV 导出文件"""
+    rng = random.Random(rows)
+    lines = ['id,username,nickname,email,status,created_time']
+    lines.extend(
+        f'{i},user{i},用户{i},user{i}@example.com,{rng.choice((0, 1))},2024-01-{rng.randint(1, 28):02d} 08:00:00'
+        for i in range(1, rows + 1)
+    )
+    return '\n'.join(lines).encode()
+
+
+def _compress(encoding: str, level: int, data: bytes) -> bytes:
+    compressor = StreamCompressor(encoding, level)
+    return compressor.compress(data) + compressor.finish()
+
+
+def _compress_chunks(encoding: str, level: int, chunks: list[bytes]) -> int:
+    compressor = StreamCompressor(encoding, level)
+    size = sum(len(compressor.compress(chunk)) for chunk in chunks)
+    return size + len(compressor.finish())
+
+
+def _bench(func: Callable[[], Any], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(rows: int, repeat: int, chunk_size: int, levels: dict[str, list[int]]) -> None:
+    payloads = {
+        'users': _user_page(rows),
+        'menus': _menu_tree(rows),
+        'csv': _csv_export(rows),
+    }
+    print(f'{"payload":<8}{"encoding":<10}{"level":>6}{"size KB":>10}{"ratio":>8}{"MB/s":>10}{"stream MB/s":>13}')
+    for name, data in payloads.items():
+        mb = len(data) / 1024 / 1024
+        chunks = [data[i : i + chunk_size] for i in range(0, len(data), chunk_size)]
+        print(f'{name:<8}{"identity":<10}{"-":>6}{len(data) / 1024:>10.1f}{1:>8.2f}{"-":>10}{"-":>13}')
+        for encoding in available_encodings():
+            for level in levels[encoding]:
+                compressed = _compress(encoding, level, data)
+                seconds = _bench(lambda: _compress(encoding, level, data), repeat)
+                stream_seconds = _bench(lambda: _compress_chunks(encoding, level, chunks), repeat)
+                print(
+                    f'{name:<8}{encoding:<10}{level:>6}{len(compressed) / 1024:>10.1f}'
+                    f'{len(data) / len(compressed):>8.2f}{mb / seconds:>10.1f}{mb / stream_seconds:>13.1f}'
+                )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5000, help='每种响应的数据行数')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--chunk-size', type=int, default=64 * 1024, help='流式压缩的分块大小（字节）')
+    parser.add_argument('--zstd-levels', type=int, nargs='+', default=[1, 3, 6, 9, 19])
+    parser.add_argument('--brotli-levels', type=int, nargs='+', default=[1, 4, 6, 9, 11])
+    parser.add_argument('--gzip-levels', type=int, nargs='+', default=[1, 5, 6, 9])
+    args = parser.parse_args()
+    main(
+        args.rows,
+        args.repeat,
+        args.chunk_size,
+        {'zstd': args.zstd_levels, 'br': args.brotli_levels, 'gzip': args.gzip_levels},
+    )
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ruff: noqa: I001
+"""
+DAO 查询语句构建开销基准测试
+
+对比每次请求构建 select() 与使用 lambda_stmt 缓存语句时，单次查询在 Python 侧的开销
+（语句构建 + 缓存键生成，编译结果在两种方式下均命中 SQLAlchemy 编译缓存），无需连接数据库
+
+用法::
+
+    python backend/scripts/bench_statement.py -n 20000
+"""
+
+import argparse
+import time
+
+from typing import Any, Callable
+
+from anyio import run
+from sqlalchemy import and_, asc, select
+from sqlalchemy.orm import selectinload
+
+from backend.app.admin.crud.crud_dept import dept_dao
+from backend.app.admin.crud.crud_menu import menu_dao
+from backend.app.admin.crud.crud_role import role_dao
+from backend.app.admin.crud.crud_user import user_dao
+from backend.app.admin.model import Dept, Menu, Role, User
+
+
+class _Result:
+    def scalars(self) -> '_Result':
+        return self
+
+    def first(self) -> None:
+        return None
+
+    def all(self) -> list:
+        return []
+
+
+class _CaptureSession:
+    """记录 DAO 生成的语句，不执行查询"""
+
+    stmt: Any = None
+
+    async def execute(self, stmt: Any) -> _Result:
+        self.stmt = stmt
+        return _Result()
+
+
+def _before_user_with_relation(user_id: int) -> Any:
+    return (
+        select(User)
+        .options(
+            selectinload(User.dept),
+            selectinload(User.roles).options(selectinload(Role.menus), selectinload(Role.scopes)),
+        )
+        .where(and_(User.id == user_id))
+    )
+
+
+def _before_role_with_relation(role_id: int) -> Any:
+    return select(Role).options(selectinload(Role.menus), selectinload(Role.scopes)).where(Role.id == role_id)
+
+
+def _before_role_menus(menu_ids: list[int]) -> Any:
+    return select(Menu).order_by(asc(Menu.sort)).where(and_(Menu.type.in_([0, 1]), Menu.id.in_(menu_ids)))
+
+
+def _before_dept_children(dept_id: int) -> Any:
+    return select(Dept).where(Dept.parent_id == dept_id, Dept.del_flag == 0)
+
+
+async def _after(call: Callable[[_CaptureSession, int], Any], i: int) -> Any:
+    db = _CaptureSession()
+    await call(db, i)
+    return db.stmt
+
+
+CASES = {
+    'user.get_with_relation': (
+        _before_user_with_relation,
+        lambda db, i: user_dao.get_with_relation(db, user_id=i),
+    ),
+    'role.get_with_relation': (
+        _before_role_with_relation,
+        lambda db, i: role_dao.get_with_relation(db, i),
+    ),
+    'menu.get_role_menus': (
+        lambda i: _before_role_menus([i, i + 1, i + 2]),
+        lambda db, i: menu_dao.get_role_menus(db, False, [i, i + 1, i + 2]),
+    ),
+    'dept.get_children': (
+        _before_dept_children,
+        lambda db, i: dept_dao.get_children(db, i),
+    ),
+}
+
+
+async def bench(n: int) -> None:
+    print(f'{"query": <24}{"before µs/op": >14}{"after µs/op": >14}{"speedup": >10}')
+    for name, (before, after) in CASES.items():
+        for i in range(100):
+            before(i)._generate_cache_key()
+            (await _after(after, i))._generate_cache_key()
+
+        start = time.perf_counter()
+        for i in range(n):
+            before(i)._generate_cache_key()
+        before_cost = (time.perf_counter() - start) / n * 1e6
+
+        start = time.perf_counter()
+        for i in range(n):
+            (await _after(after, i))._generate_cache_key()
+        after_cost = (time.perf_counter() - start) / n * 1e6
+
+        print(f'{name: <24}{before_cost: >14.1f}{after_cost: >14.1f}{before_cost / after_cost: >9.1f}x')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='DAO 查询语句构建开销基准测试')
+    parser.add_argument('-n', type=int, default=20000)
+    cli_args = parser.parse_args()
+    run(bench, cli_args.n)  # type: ignore
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+树形结构构建基准测试
+
+对比旧版遍历算法（列表成员判断，宽树下为 O(n²)）与当前 O(n) 构建算法在不同规模和形状下的耗时，无需连接数据库
+
+用法::
+
+    python backend/scripts/bench_tree.py
+    python backend/scripts/bench_tree.py --sizes 1000 10000 100000 --legacy-max 10000
+"""
+
+import argparse
+import random
+import time
+
+from typing import Any, Callable
+
+from backend.utils.build_tree import build_tree, build_tree_from_rows
+
+
+def _legacy_traversal_to_tree(nodes: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """旧版遍历算法，仅用于对比"""
+    tree: list[dict[str, Any]] = []
+    node_dict = {node['id']: node for node in nodes}
+    for node in nodes:
+        parent_id = node['parent_id']
+        if parent_id is None:
+            tree.append(node)
+        else:
+            parent_node = node_dict.get(parent_id)
+            if parent_node is not None:
+                if 'children' not in parent_node:
+                    parent_node['children'] = []
+                if node not in parent_node['children']:
+                    parent_node['children'].append(node)
+            else:
+                if node not in tree:
+                    tree.append(node)
+    return tree
+
+
+def _rows(size: int, shape: str) -> list[tuple]:
+    """生成 (id, parent_id, sort, name) 行"""
+    rng = random.Random(size)
+    rows = []
+    for i in range(1, size + 1):
+        match shape:
+            case 'wide':
+                # 所有节点均为根节点
+                parent_id = None
+            case 'flat':
+                # 单根节点下挂全部子节点
+                parent_id = None if i == 1 else 1
+            case 'deep':
+                parent_id = None if i == 1 else i - 1
+            case _:
+                parent_id = None if i == 1 else rng.randint(1, i - 1)
+        rows.append((i, parent_id, rng.randint(0, 100), f'node{i}'))
+    rows.sort(key=lambda r: r[2])
+    return rows
+
+
+def _bench(func: Callable[[], Any], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(sizes: list[int], legacy_max: int, repeat: int) -> None:
+    columns = ['id', 'parent_id', 'sort', 'name']
+    print(f'{"shape":<8}{"size":>8}{"legacy ms":>12}{"dicts ms":>12}{"rows ms":>12}')
+    for shape in ('random', 'flat', 'wide', 'deep'):
+        for size in sizes:
+            rows = _rows(size, shape)
+            nodes = [dict(zip(columns, row)) for row in rows]
+            legacy = '-'
+            if size <= legacy_max:
+                legacy = f'{_bench(lambda: _legacy_traversal_to_tree([dict(n) for n in nodes]), repeat):.2f}'
+            dicts = _bench(lambda: build_tree([dict(n) for n in nodes]), repeat)
+            from_rows = _bench(lambda: build_tree_from_rows(rows, columns), repeat)
+            print(f'{shape:<8}{size:>8}{legacy:>12}{dicts:>12.2f}{from_rows:>12.2f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--legacy-max', type=int, default=10000, help='旧版算法的最大测试规模，宽树下耗时为平方级')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    main(args.sizes, args.legacy_max, args.repeat)
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ruff: noqa: I001
+"""
+部门、菜单层级索引（闭包表）工具
+
+用法::
+
+    # 根据 parent_id 重建闭包表，开启 HIERARCHY_CLOSURE_ENABLED 前或数据修复时执行
+    python backend/scripts/hierarchy.py rebuild
+"""
+
+import argparse
+
+from anyio import run
+
+from backend.app.admin.crud.crud_dept import dept_tree
+from backend.app.admin.crud.crud_menu import menu_tree
+from backend.database.db import async_db_session, create_table
+
+
+async def rebuild() -> None:
+    """重建部门和菜单闭包表"""
+    await create_table()
+    for name, tree in (('dept', dept_tree), ('menu', menu_tree)):
+        async with async_db_session.begin() as db:
+            count = await tree.rebuild(db)
+        print(f'{name} closure rebuilt: {count} rows')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=['rebuild'])
+    args = parser.parse_args()
+    run(rebuild)  # type: ignore
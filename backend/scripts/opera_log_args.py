@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ruff: noqa: I001
+"""
+操作日志请求参数压缩工具
+
+用法::
+
+    # 1. 为已有数据库添加 args_compressed 列，并将超过阈值的历史参数压缩迁移
+    python backend/scripts/opera_log_args.py migrate
+
+    # 2. 基于最近的操作日志训练共享字典，并将输出的字典 ID 配置到 OPERA_LOG_ARGS_COMPRESS_DICT_ID
+    python backend/scripts/opera_log_args.py train --limit 20000
+
+    # 3. 使用代表性请求参数进行体积和耗时基准测试
+    python backend/scripts/opera_log_args.py bench
+"""
+
+import argparse
+import random
+import time
+
+import msgspec
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from anyio import run
+from sqlalchemy import inspect, select, update
+
+from backend.app.admin.model import OperaLog
+from backend.core.conf import settings
+from backend.database.db import async_db_session, async_engine
+from backend.utils.compress import ZstdDictCodec, opera_log_args_codec
+
+
+def _add_column(conn) -> bool:
+    """添加 args_compressed 列（已存在时跳过）"""
+    columns = {column['name'] for column in inspect(conn).get_columns(OperaLog.__tablename__)}
+    if 'args_compressed' in columns:
+        return False
+    Operations(MigrationContext.configure(conn)).add_column(
+        OperaLog.__tablename__, OperaLog.__table__.c.args_compressed.copy()
+    )
+    return True
+
+
+async def migrate(batch_size: int) -> None:
+    """添加列并回填历史数据"""
+    async with async_engine.begin() as conn:
+        if await conn.run_sync(_add_column):
+            print('Column args_compressed added')
+
+    last_id, migrated = 0, 0
+    while True:
+        async with async_db_session.begin() as db:
+            stmt = (
+                select(OperaLog.id, OperaLog.args)
+                .where(OperaLog.id > last_id, OperaLog.args.is_not(None), OperaLog.args_compressed.is_(None))
+                .order_by(OperaLog.id)
+                .limit(batch_size)
+            )
+            rows = (await db.execute(stmt)).all()
+            if not rows:
+                break
+            for pk, args in rows:
+                args, args_compressed = opera_log_args_codec.pack(args)
+                if args_compressed is not None:
+                    await db.execute(
+                        update(OperaLog).where(OperaLog.id == pk).values(args=None, args_compressed=args_compressed)
+                    )
+                    migrated += 1
+            last_id = rows[-1].id
+    print(f'Migrated {migrated} rows')
+
+
+async def train(limit: int, dict_size: int) -> None:
+    """基于历史数据训练字典"""
+    async with async_db_session() as db:
+        stmt = select(OperaLog).order_by(OperaLog.id.desc()).limit(limit)
+        logs = (await db.execute(stmt)).scalars().all()
+    samples = [msgspec.json.encode(log.args) for log in logs if log.args]
+    if not samples:
+        print('No samples found')
+        return
+    dict_id = opera_log_args_codec.train(samples, dict_size)
+    print(f'Trained dictionary {opera_log_args_codec.dict_path(dict_id)} from {len(samples)} samples')
+    print(f'Set OPERA_LOG_ARGS_COMPRESS_DICT_ID={dict_id} to enable it')
+
+
+def _representative_args(n: int) -> list[dict]:
+    """生成代表性请求参数，覆盖批量接口和普通接口"""
+    rnd = random.Random(0)
+    samples = []
+    for i in range(n):
+        match i % 4:
+            case 0:
+                # 批量更新角色菜单
+                samples.append({'pk': rnd.randint(1, 50), 'menus': rnd.sample(range(1, 5000), rnd.randint(200, 800))})
+            case 1:
+                # 批量删除
+                samples.append({'pk': [rnd.randint(1, 10**6) for _ in range(rnd.randint(100, 400))]})
+            case 2:
+                # 保存内置参数配置
+                samples.append({
+                    'body': str([
+                        {'name': f'配置{j}', 'key': f'website_key_{j}', 'value': f'https://example.com/{rnd.random()}'}
+                        for j in range(rnd.randint(10, 40))
+                    ])
+                })
+            case _:
+                # 普通表单
+                samples.append({
+                    'username': f'user{i}',
+                    'nickname': f'nick{i}',
+                    'email': f'user{i}@example.com',
+                    'dept_id': rnd.randint(1, 100),
+                    'roles': rnd.sample(range(1, 20), 3),
+                    'password': 'e10adc3949ba59abbe56e057f20f883e',
+                })
+    return samples
+
+
+def bench(n: int, dict_size: int) -> None:
+    """体积和耗时基准测试"""
+    samples = [msgspec.json.encode(args) for args in _representative_args(n * 2)]
+    training, testing = samples[:n], samples[n:]
+
+    plain = ZstdDictCodec('bench', level=settings.OPERA_LOG_ARGS_COMPRESS_LEVEL)
+    trained = ZstdDictCodec('bench', level=settings.OPERA_LOG_ARGS_COMPRESS_LEVEL)
+    trained.dict_id = trained.train(training, dict_size)
+    trained.dict_path(trained.dict_id).unlink()
+
+    raw_size = sum(len(s) for s in testing)
+    print(f'samples: {len(testing)}, raw: {raw_size} bytes, avg: {raw_size / len(testing):.0f} bytes')
+    for label, codec in (('zstd', plain), ('zstd+dict', trained)):
+        start = time.perf_counter()
+        compressed = [codec.compress(s) for s in testing]
+        compress_cost = (time.perf_counter() - start) / len(testing) * 1e6
+        start = time.perf_counter()
+        for c in compressed:
+            codec.decompress(c)
+        decompress_cost = (time.perf_counter() - start) / len(testing) * 1e6
+        size = sum(len(c) for c in compressed)
+        print(
+            f'{label: <10} size: {size} bytes ({size / raw_size:.1%}), '
+            f'compress: {compress_cost:.1f} µs/op, decompress: {decompress_cost:.1f} µs/op'
+        )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='操作日志请求参数压缩工具')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    migrate_parser = subparsers.add_parser('migrate', help='添加压缩列并迁移历史数据')
+    migrate_parser.add_argument('--batch-size', type=int, default=1000)
+    train_parser = subparsers.add_parser('train', help='训练共享字典')
+    train_parser.add_argument('--limit', type=int, default=20000)
+    train_parser.add_argument('--dict-size', type=int, default=112640)
+    bench_parser = subparsers.add_parser('bench', help='基准测试')
+    bench_parser.add_argument('-n', type=int, default=2000)
+    bench_parser.add_argument('--dict-size', type=int, default=112640)
+    cli_args = parser.parse_args()
+
+    match cli_args.command:
+        case 'migrate':
+            run(migrate, cli_args.batch_size)  # type: ignore
+        case 'train':
+            run(train, cli_args.limit, cli_args.dict_size)  # type: ignore
+        case 'bench':
+            bench(cli_args.n, cli_args.dict_size)
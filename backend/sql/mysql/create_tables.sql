@@ -138,6 +138,23 @@ create index ix_sys_dept_id
 create index ix_sys_dept_parent_id
     on sys_dept (parent_id);
 
+create table sys_dept_closure
+(
+    ancestor_id   int not null comment '祖先部门ID',
+    descendant_id int not null comment '后代部门ID',
+    depth         int not null comment '层级距离（0为自身）',
+    primary key (ancestor_id, descendant_id),
+    constraint sys_dept_closure_ibfk_1
+        foreign key (ancestor_id) references sys_dept (id)
+            on delete cascade,
+    constraint sys_dept_closure_ibfk_2
+        foreign key (descendant_id) references sys_dept (id)
+            on delete cascade
+);
+
+create index ix_sys_dept_closure_descendant_id
+    on sys_dept_closure (descendant_id, depth);
+
 create table sys_dict_type
 (
     id           int auto_increment comment '主键 ID'
@@ -206,6 +223,9 @@ create table sys_login_log
 create index ix_sys_login_log_id
     on sys_login_log (id);
 
+create index ix_sys_login_log_created_time
+    on sys_login_log (created_time);
+
 create table sys_menu
 (
     id           int auto_increment comment '主键 ID'
@@ -238,6 +258,23 @@ create index ix_sys_menu_id
 create index ix_sys_menu_parent_id
     on sys_menu (parent_id);
 
+create table sys_menu_closure
+(
+    ancestor_id   int not null comment '祖先菜单ID',
+    descendant_id int not null comment '后代菜单ID',
+    depth         int not null comment '层级距离（0为自身）',
+    primary key (ancestor_id, descendant_id),
+    constraint sys_menu_closure_ibfk_1
+        foreign key (ancestor_id) references sys_menu (id)
+            on delete cascade,
+    constraint sys_menu_closure_ibfk_2
+        foreign key (descendant_id) references sys_menu (id)
+            on delete cascade
+);
+
+create index ix_sys_menu_closure_descendant_id
+    on sys_menu_closure (descendant_id, depth);
+
 create table sys_notice
 (
     id           int auto_increment comment '主键 ID'
@@ -279,6 +316,7 @@ create table sys_opera_log
     msg          longtext     null comment '提示消息',
     cost_time    float        not null comment '请求耗时（ms）',
     opera_time   datetime     not null comment '操作时间',
+    args_compressed longblob  null comment '请求参数（zstd 压缩）',
     created_time datetime     not null comment '创建时间'
 )
     comment '操作日志表';
@@ -286,6 +324,9 @@ create table sys_opera_log
 create index ix_sys_opera_log_id
     on sys_opera_log (id);
 
+create index ix_sys_opera_log_created_time
+    on sys_opera_log (created_time);
+
 create table sys_role
 (
     id           int auto_increment comment '主键 ID'
@@ -388,6 +429,9 @@ create index dept_id
 create index ix_sys_user_id
     on sys_user (id);
 
+create index ix_sys_user_join_time
+    on sys_user (join_time);
+
 create index ix_sys_user_status
     on sys_user (status);
 
@@ -72,6 +72,27 @@ create index ix_sys_dept_id
 create index ix_sys_dept_parent_id
     on sys_dept (parent_id);
 
+create table sys_dept_closure
+(
+    ancestor_id   integer not null
+        references sys_dept
+            on delete cascade,
+    descendant_id integer not null
+        references sys_dept
+            on delete cascade,
+    depth         integer not null,
+    primary key (ancestor_id, descendant_id)
+);
+
+comment on column sys_dept_closure.ancestor_id is '祖先部门ID';
+
+comment on column sys_dept_closure.descendant_id is '后代部门ID';
+
+comment on column sys_dept_closure.depth is '层级距离（0为自身）';
+
+create index ix_sys_dept_closure_descendant_id
+    on sys_dept_closure (descendant_id, depth);
+
 create table sys_login_log
 (
     id           serial
@@ -127,6 +148,9 @@ comment on column sys_login_log.created_time is '创建时间';
 create index ix_sys_login_log_id
     on sys_login_log (id);
 
+create index ix_sys_login_log_created_time
+    on sys_login_log (created_time);
+
 create table sys_menu
 (
     id           serial
@@ -193,6 +217,27 @@ create index ix_sys_menu_id
 create index ix_sys_menu_parent_id
     on sys_menu (parent_id);
 
+create table sys_menu_closure
+(
+    ancestor_id   integer not null
+        references sys_menu
+            on delete cascade,
+    descendant_id integer not null
+        references sys_menu
+            on delete cascade,
+    depth         integer not null,
+    primary key (ancestor_id, descendant_id)
+);
+
+comment on column sys_menu_closure.ancestor_id is '祖先菜单ID';
+
+comment on column sys_menu_closure.descendant_id is '后代菜单ID';
+
+comment on column sys_menu_closure.depth is '层级距离（0为自身）';
+
+create index ix_sys_menu_closure_descendant_id
+    on sys_menu_closure (descendant_id, depth);
+
 create table sys_opera_log
 (
     id           serial
@@ -216,6 +261,7 @@ create table sys_opera_log
     msg          text,
     cost_time    double precision         not null,
     opera_time   timestamp with time zone not null,
+    args_compressed bytea,
     created_time timestamp with time zone not null
 );
 
@@ -261,11 +307,16 @@ comment on column sys_opera_log.cost_time is '请求耗时（ms）';
 
 comment on column sys_opera_log.opera_time is '操作时间';
 
+comment on column sys_opera_log.args_compressed is '请求参数（zstd 压缩）';
+
 comment on column sys_opera_log.created_time is '创建时间';
 
 create index ix_sys_opera_log_id
     on sys_opera_log (id);
 
+create index ix_sys_opera_log_created_time
+    on sys_opera_log (created_time);
+
 create table sys_role
 (
     id           serial
@@ -609,6 +660,9 @@ create unique index ix_sys_user_email
 create index ix_sys_user_id
     on sys_user (id);
 
+create index ix_sys_user_join_time
+    on sys_user (join_time);
+
 create unique index ix_sys_user_username
     on sys_user (username);
 
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from backend.utils.build_tree import build_tree, build_tree_from_rows, recursive_to_tree
+
+
+def _ids(tree: list[dict]) -> list:
+    return [(node['id'], _ids(node['children'])) if 'children' in node else node['id'] for node in tree]
+
+
+def test_build_tree_keeps_level_order() -> None:
+    nodes = [
+        {'id': 1, 'parent_id': None, 'sort': 2},
+        {'id': 2, 'parent_id': None, 'sort': 1},
+        {'id': 3, 'parent_id': 1, 'sort': 2},
+        {'id': 4, 'parent_id': 1, 'sort': 1},
+    ]
+    assert _ids(build_tree(nodes, sort_key='sort')) == [2, (1, [4, 3])]
+
+
+def test_build_tree_orphans_become_roots() -> None:
+    nodes = [{'id': 1, 'parent_id': None}, {'id': 2, 'parent_id': 99}, {'id': 3, 'parent_id': 2}]
+    assert _ids(build_tree(nodes)) == [1, (2, [3])]
+
+
+def test_build_tree_breaks_cycles_deterministically() -> None:
+    nodes = [
+        {'id': 1, 'parent_id': None},
+        {'id': 5, 'parent_id': 6},
+        {'id': 6, 'parent_id': 7},
+        {'id': 7, 'parent_id': 6},
+    ]
+    # 环 6 -> 7 -> 6 在输入中最靠前的节点 6 成为根节点，挂在环下的 5 保留
+    assert _ids(build_tree(nodes)) == [1, (6, [5, 7])]
+
+
+def test_build_tree_from_rows() -> None:
+    rows = [(1, None, 'a'), (2, 1, 'b')]
+    tree = build_tree_from_rows(rows, ['id', 'parent_id', 'name'])
+    assert tree == [{'id': 1, 'parent_id': None, 'name': 'a', 'children': [{'id': 2, 'parent_id': 1, 'name': 'b'}]}]
+
+
+def test_recursive_to_tree_subtree() -> None:
+    nodes = [{'id': 1, 'parent_id': None}, {'id': 2, 'parent_id': 1}, {'id': 3, 'parent_id': 2}]
+    assert _ids(recursive_to_tree(nodes, parent_id=1)) == [(2, [3])]
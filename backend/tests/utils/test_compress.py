@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import gzip
+
+import msgspec
+import pytest
+import zstandard
+
+from backend.utils.compress import StreamCompressor, ZstdDictCodec, available_encodings
+
+
+def test_pack_keeps_small_payload_inline() -> None:
+    codec = ZstdDictCodec('test', threshold=1024)
+    args = {'username': 'admin'}
+    assert codec.pack(args) == (args, None)
+    assert codec.pack(None) == (None, None)
+
+
+def test_pack_compresses_large_payload() -> None:
+    codec = ZstdDictCodec('test', threshold=1024)
+    args = {'menus': list(range(1000))}
+    inline, compressed = codec.pack(args)
+    assert inline is None
+    assert len(compressed) < len(msgspec.json.encode(args))
+    assert codec.unpack(compressed) == args
+
+
+def test_unpack_with_trained_dictionary(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr('backend.utils.compress.ZSTD_DICT_DIR', tmp_path)
+    samples = [msgspec.json.encode({'pk': i, 'menus': list(range(i, i + 300))}) for i in range(200)]
+    codec = ZstdDictCodec('test', threshold=0)
+    codec.dict_id = codec.train(samples, 4096)
+    _, compressed = codec.pack({'pk': 1, 'menus': [1, 2, 3]})
+
+    # 新的编解码器实例从磁盘按帧头部字典 ID 加载字典
+    reader = ZstdDictCodec('test')
+    assert reader.unpack(compressed) == {'pk': 1, 'menus': [1, 2, 3]}
+
+
+@pytest.mark.parametrize('encoding', available_encodings())
+def test_stream_compressor_round_trip(encoding: str) -> None:
+    chunks = [msgspec.json.encode({'pk': i, 'menus': list(range(i, i + 100))}) for i in range(50)]
+    compressor = StreamCompressor(encoding, 3)
+    compressed = b''.join(compressor.compress(chunk) for chunk in chunks) + compressor.finish()
+    match encoding:
+        case 'zstd':
+            data = zstandard.ZstdDecompressor().decompressobj().decompress(compressed)
+        case 'br':
+            data = pytest.importorskip('brotli').decompress(compressed)
+        case _:
+            data = gzip.decompress(compressed)
+    assert data == b''.join(chunks)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+
+from contextlib import asynccontextmanager
+from typing import Annotated
+
+import httpx
+
+from fastapi import Depends, FastAPI, HTTPException
+from starlette.authentication import AuthenticationBackend
+from starlette.middleware.authentication import AuthenticationMiddleware
+
+from backend.core.conf import settings
+from backend.database.uow import RequestUnitOfWork, UnitOfWorkSessionMaker, request_uow
+from backend.middleware import opera_log_middleware, request_session_middleware
+from backend.middleware.opera_log_middleware import OperaLogMiddleware
+from backend.middleware.request_session_middleware import RequestSessionMiddleware
+
+
+class _Session:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.info = {}
+        self.calls = []
+
+    async def flush(self) -> None:
+        self.calls.append('flush')
+
+    async def commit(self) -> None:
+        self.calls.append('commit')
+
+    async def rollback(self) -> None:
+        self.calls.append('rollback')
+
+    async def close(self) -> None:
+        self.calls.append('close')
+
+
+class _Maker:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.sessions = []
+
+    def __call__(self, **kw) -> _Session:
+        session = _Session(self.name)
+        self.sessions.append(session)
+        return session
+
+    @asynccontextmanager
+    async def begin(self):
+        session = self()
+        session.info['independent'] = True
+        yield session
+        await session.commit()
+
+
+class _NoAuth(AuthenticationBackend):
+    async def authenticate(self, conn):
+        return None
+
+
+def _build_app(monkeypatch) -> tuple[FastAPI, _Maker, list]:
+    maker = _Maker('shared')
+    session_maker = UnitOfWorkSessionMaker(maker)
+    logs = []
+
+    class _OperaLogService:
+        @staticmethod
+        async def create(*, obj) -> None:
+            async with session_maker.begin() as db:
+                logs.append((obj.code, db, UnitOfWorkSessionMaker.current()))
+
+    monkeypatch.setattr(request_session_middleware, 'async_db_session', session_maker)
+    monkeypatch.setattr(opera_log_middleware, 'opera_log_service', _OperaLogService)
+
+    async def deny() -> None:
+        # 依赖已使用请求会话，随后认证失败，路由函数不会执行
+        async with session_maker():
+            pass
+        raise HTTPException(status_code=401)
+
+    app = FastAPI()
+
+    @app.post(f'{settings.FASTAPI_API_V1_PATH}/validate')
+    async def validate(pk: int) -> None: ...
+
+    @app.post(f'{settings.FASTAPI_API_V1_PATH}/deny')
+    async def denied(_: Annotated[None, Depends(deny)]) -> None: ...
+
+    @app.middleware('http')
+    async def state(request, call_next):
+        for key in ('ip', 'country', 'region', 'city', 'user_agent', 'os', 'browser', 'device'):
+            setattr(request.state, key, 'test')
+        return await call_next(request)
+
+    app.add_middleware(OperaLogMiddleware)
+    app.add_middleware(AuthenticationMiddleware, backend=_NoAuth())
+    app.add_middleware(RequestSessionMiddleware)
+    return app, maker, logs
+
+
+def test_opera_log_of_rejected_request_uses_own_session(monkeypatch) -> None:
+    app, maker, logs = _build_app(monkeypatch)
+
+    async def run() -> tuple[int, int]:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            invalid = await client.post(f'{settings.FASTAPI_API_V1_PATH}/validate?pk=a')
+            denied = await client.post(f'{settings.FASTAPI_API_V1_PATH}/deny')
+        for _ in range(10):
+            await asyncio.sleep(0)
+        return invalid.status_code, denied.status_code
+
+    assert asyncio.run(run()) == (422, 401)
+    assert len(logs) == 2
+    request_sessions = [session for session in maker.sessions if 'independent' not in session.info]
+    for _, db, uow in logs:
+        # 日志任务不使用请求工作单元，在独立会话中提交
+        assert uow is None
+        assert db not in request_sessions
+        assert db.calls == ['commit']
+    # 请求会话仅由工作单元提交一次，未被日志任务使用
+    assert [session.calls for session in request_sessions] == [['commit', 'close']]
+
+
+def test_write_block_commits_before_side_effects() -> None:
+    maker = _Maker('shared')
+    session_maker = UnitOfWorkSessionMaker(maker)
+
+    async def run() -> list[str]:
+        uow = RequestUnitOfWork(maker)
+        token = request_uow.set(uow)
+        try:
+            async with session_maker.begin() as db:
+                db.calls.append('write')
+            # 事务块之后的副作用（如递增数据代数）应在提交之后执行
+            db.calls.append('side_effect')
+            try:
+                async with session_maker.begin() as db:
+                    raise ValueError
+            except ValueError:
+                pass
+            async with session_maker() as db:
+                db.calls.append('read')
+            await uow.release(commit=True)
+        finally:
+            request_uow.reset(token)
+        return db.calls
+
+    calls = asyncio.run(run())
+    assert len(maker.sessions) == 1
+    assert calls == ['write', 'commit', 'side_effect', 'rollback', 'read', 'commit', 'close']
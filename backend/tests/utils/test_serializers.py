@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from decimal import Decimal
+
+from sqlalchemy import Numeric, String
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from backend.utils.serializers import select_as_dict, select_list_serialize
+
+
+class _Base(DeclarativeBase):
+    pass
+
+
+class _Item(_Base):
+    __tablename__ = 'test_serializer_item'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(32))
+    price: Mapped[Decimal | None] = mapped_column(Numeric(10, 2))
+
+
+def test_select_list_serialize():
+    items = [_Item(id=1, name='a', price=Decimal('1.50')), _Item(id=2, name='b', price=None)]
+    assert select_list_serialize(items) == [
+        {'id': 1, 'name': 'a', 'price': 1.5},
+        {'id': 2, 'name': 'b', 'price': None},
+    ]
+
+
+def test_select_as_dict_keeps_instance_state():
+    item = _Item(id=1, name='a', price=None)
+    assert '_sa_instance_state' not in select_as_dict(item)
+    assert '_sa_instance_state' in item.__dict__
+    assert select_as_dict(item, use_alias=True) == {'id': 1, 'name': 'a', 'price': None}
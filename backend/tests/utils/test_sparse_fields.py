@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+
+from sqlalchemy.dialects import mysql
+
+from backend.app.admin.crud.crud_opera_log import opera_log_dao
+from backend.app.admin.schema.opera_log import GetOperaLogDetail
+from backend.common.sparse_fields import FieldSet
+
+
+def _projected_sql(*names: str) -> str:
+    stmt = asyncio.run(opera_log_dao.get_list(username=None, status=None, ip=None))
+    stmt = FieldSet(GetOperaLogDetail, frozenset(names)).project(stmt)
+    return str(stmt.compile(dialect=mysql.dialect()))
+
+
+def test_project_loads_field_dependencies() -> None:
+    # 压缩存储的请求参数需同时加载 args_compressed，否则加载事件无法解压
+    sql = _projected_sql('args')
+    assert 'sys_opera_log.args,' in sql
+    assert 'sys_opera_log.args_compressed' in sql
+    assert 'sys_opera_log.msg' not in sql
+
+
+def test_project_skips_unrequested_dependencies() -> None:
+    sql = _projected_sql('path')
+    assert 'sys_opera_log.path' in sql
+    assert 'sys_opera_log.args_compressed' not in sql
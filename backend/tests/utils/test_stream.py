@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+
+from backend.utils import stream
+from backend.utils.stream import RedisStreamConsumer
+
+
+class _Redis:
+    def __init__(self, messages: list[tuple[str, dict[str, str]]]) -> None:
+        self.messages = messages
+        self.acked: list[str] = []
+
+    async def xgroup_create(self, *args, **kwargs) -> None:
+        pass
+
+    async def xpending_range(self, *args, **kwargs) -> list:
+        return []
+
+    async def xreadgroup(self, *args, **kwargs) -> list:
+        return [('stream', self.messages)] if self.messages else []
+
+    async def xack(self, stream: str, group: str, *message_ids: str) -> int:
+        self.acked.extend(message_ids)
+        return len(message_ids)
+
+
+def test_poison_message_does_not_block_batch(monkeypatch) -> None:
+    redis = _Redis([('1-0', {'data': 'a'}), ('2-0', {'data': 'poison'}), ('3-0', {'data': 'b'})])
+    monkeypatch.setattr(stream, 'redis_client', redis)
+    handled = []
+
+    async def handler(data: list[str]) -> None:
+        if 'poison' in data:
+            raise ValueError('poison')
+        handled.extend(data)
+
+    consumer = RedisStreamConsumer('stream', 'group', handler)
+    assert asyncio.run(consumer.process(block=False)) == 2
+    # 仅异常消息保留在待确认列表中，后续超过最大投递次数时单独转入死信流
+    assert redis.acked == ['1-0', '3-0']
+    assert handled == ['a', 'b']
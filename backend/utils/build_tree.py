@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-from typing import Any, Sequence
+from operator import itemgetter
+from typing import Any, Iterable, Sequence
 
 from backend.common.enums import BuildTreeType
 from backend.utils.serializers import RowData, select_list_serialize
@@ -14,54 +15,164 @@ def get_tree_nodes(row: Sequence[RowData]) -> list[dict[str, Any]]:
     :return:
     """
     tree_nodes = select_list_serialize(row)
-    tree_nodes.sort(key=lambda x: x['sort'])
+    tree_nodes.sort(key=itemgetter('sort'))
     return tree_nodes
 
 
-def traversal_to_tree(nodes: list[dict[str, Any]]) -> list[dict[str, Any]]:
+def _detach(node: dict[str, Any], parent: dict[str, Any]) -> None:
     """
-    通过遍历算法构造树形结构
+    从父节点的子节点列表中移除节点，按对象标识比较，避免对存在环的字典做深比较
 
-    :param nodes: 树节点列表
+    :param node: 节点
+    :param parent: 父节点
     :return:
     """
-    tree: list[dict[str, Any]] = []
-    node_dict = {node['id']: node for node in nodes}
+    children = parent['children']
+    for i, child in enumerate(children):
+        if child is node:
+            del children[i]
+            break
+    if not children:
+        del parent['children']
+
+
+def build_tree(
+    nodes: Iterable[dict[str, Any]],
+    *,
+    id_key: str = 'id',
+    parent_key: str = 'parent_id',
+    sort_key: str | None = None,
+) -> list[dict[str, Any]]:
+    """
+    构建树形结构，原地为节点添加 children，时间复杂度 O(n)
+
+    - 同级节点保持输入顺序；指定 sort_key 时先按其稳定排序（输入已有序时排序同样为线性）
+    - 父节点不存在的节点（孤儿节点）作为根节点，位置与其在输入中的顺序一致
+    - 存在环时，以环上输入顺序最靠前的节点作为根节点断开，保证输出无环且结果确定
 
+    :param nodes: 树节点
+    :param id_key: 节点 ID 键名
+    :param parent_key: 父节点 ID 键名
+    :param sort_key: 排序键名，为空时不排序
+    :return:
+    """
+    nodes = list(nodes)
+    if sort_key is not None:
+        nodes.sort(key=itemgetter(sort_key))
+
+    index = {node[id_key]: node for node in nodes}
+    order = {id(node): i for i, node in enumerate(nodes)}
+    tree: list[dict[str, Any]] = []
     for node in nodes:
-        parent_id = node['parent_id']
-        if parent_id is None:
+        parent = index.get(node[parent_key])
+        if parent is None:
             tree.append(node)
+        elif 'children' in parent:
+            parent['children'].append(node)
         else:
-            parent_node = node_dict.get(parent_id)
-            if parent_node is not None:
-                if 'children' not in parent_node:
-                    parent_node['children'] = []
-                if node not in parent_node['children']:
-                    parent_node['children'].append(node)
-            else:
-                if node not in tree:
-                    tree.append(node)
-
+            parent['children'] = [node]
+
+    # 从根节点出发不可达的节点均位于环上或挂在环下
+    reached: set[int] = set()
+    stack = list(tree)
+    while stack:
+        node = stack.pop()
+        reached.add(id(node))
+        stack.extend(node.get('children', ()))
+    if len(reached) == len(nodes):
+        return tree
+
+    roots: list[dict[str, Any]] = []
+    for node in nodes:
+        if id(node) in reached:
+            continue
+        # 沿父节点向上直到重复，得到环上的节点
+        path: dict[int, dict[str, Any]] = {}
+        current = node
+        while id(current) not in path:
+            path[id(current)] = current
+            current = index[current[parent_key]]
+        cycle = [current]
+        parent = index[current[parent_key]]
+        while parent is not current:
+            cycle.append(parent)
+            parent = index[parent[parent_key]]
+        root = min(cycle, key=lambda n: order[id(n)])
+        _detach(root, index[root[parent_key]])
+        roots.append(root)
+        stack = [root]
+        while stack:
+            current = stack.pop()
+            reached.add(id(current))
+            stack.extend(current.get('children', ()))
+
+    # 断开的根节点按输入顺序并入
+    tree.extend(roots)
+    tree.sort(key=lambda n: order[id(n)])
     return tree
 
 
+def build_tree_from_rows(
+    rows: Iterable[Sequence[Any]],
+    columns: Sequence[str],
+    *,
+    id_key: str = 'id',
+    parent_key: str = 'parent_id',
+    sort_key: str | None = None,
+) -> list[dict[str, Any]]:
+    """
+    直接从查询结果行元组构建树形结构，每行仅创建一个节点字典
+
+    :param rows: 查询结果行，如 select(Menu.id, Menu.parent_id, ...) 的结果
+    :param columns: 行元组对应的列名
+    :param id_key: 节点 ID 键名
+    :param parent_key: 父节点 ID 键名
+    :param sort_key: 排序键名，为空时不排序
+    :return:
+    """
+    return build_tree(
+        (dict(zip(columns, row)) for row in rows), id_key=id_key, parent_key=parent_key, sort_key=sort_key
+    )
+
+
+def traversal_to_tree(nodes: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    通过遍历算法构造树形结构
+
+    :param nodes: 树节点列表
+    :return:
+    """
+    return build_tree(nodes)
+
+
 def recursive_to_tree(nodes: list[dict[str, Any]], *, parent_id: int | None = None) -> list[dict[str, Any]]:
     """
-    通过递归算法构造树形结构（性能影响较大）
+    通过递归算法构造树形结构，仅包含指定父节点下的子树
 
     :param nodes: 树节点列表
     :param parent_id: 父节点 ID，默认为 None 表示根节点
     :return:
     """
-    tree: list[dict[str, Any]] = []
+    children: dict[Any, list[dict[str, Any]]] = {}
     for node in nodes:
-        if node['parent_id'] == parent_id:
-            child_nodes = recursive_to_tree(nodes, parent_id=node['id'])
+        children.setdefault(node['parent_id'], []).append(node)
+
+    visited: set[Any] = set()
+
+    def _build(pid: Any) -> list[dict[str, Any]]:
+        tree = []
+        for node in children.get(pid, ()):
+            # 存在环时不重复展开
+            if node['id'] in visited:
+                continue
+            visited.add(node['id'])
+            child_nodes = _build(node['id'])
             if child_nodes:
                 node['children'] = child_nodes
             tree.append(node)
-    return tree
+        return tree
+
+    return _build(parent_id)
 
 
 def get_tree_data(
@@ -93,22 +204,29 @@ def get_vben5_tree_data(row: Sequence[RowData]) -> list[dict[str, Any]]:
     :param row: 原始数据行序列
     :return:
     """
-    # 需要移除的原始字段
-    remove_keys = {'title', 'icon', 'link', 'cache', 'display', 'status'}
-
+    # 直接由菜单构造 vben5 节点，不经过中间字典
     vben5_nodes = [
         {
-            **{k: v for k, v in node.items() if k not in remove_keys},
+            'id': menu.id,
+            'name': menu.name,
+            'path': menu.path,
+            'sort': menu.sort,
+            'type': menu.type,
+            'component': menu.component,
+            'perms': menu.perms,
+            'remark': menu.remark,
+            'parent_id': menu.parent_id,
+            'created_time': menu.created_time,
+            'updated_time': menu.updated_time,
             'meta': {
-                'title': node['title'],
-                'icon': node['icon'],
-                'link': node['link'],
-                'keepAlive': node['cache'],
-                'hideInMenu': not bool(node['display']),
-                'menuVisibleWithForbidden': not bool(node['status']),
+                'title': menu.title,
+                'icon': menu.icon,
+                'link': menu.link,
+                'keepAlive': menu.cache,
+                'hideInMenu': not bool(menu.display),
+                'menuVisibleWithForbidden': not bool(menu.status),
             },
         }
-        for node in get_tree_nodes(row)
+        for menu in row
     ]
-
-    return traversal_to_tree(vben5_nodes)
+    return build_tree(vben5_nodes, sort_key='sort')
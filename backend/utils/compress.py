@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import zlib
+
+from pathlib import Path
+from typing import Any, Sequence
+
+import msgspec
+import zstandard
+
+from backend.common.log import log
+from backend.core.conf import settings
+from backend.core.path_conf import ZSTD_DICT_DIR
+
+try:
+    import brotli
+except ImportError:  # brotli 为可选依赖，未安装时不提供 br 编码
+    brotli = None
+
+
+class ZstdDictCodec:
+    """
+    基于 zstd 共享训练字典的压缩编解码器
+
+    压缩帧头部会写入字典 ID，解压时按 ID 加载对应字典，因此重新训练字典后，历史数据仍可正常解压
+    """
+
+    def __init__(self, name: str, *, dict_id: int | None = None, level: int = 3, threshold: int = 1024) -> None:
+        """
+        初始化编解码器
+
+        :param name: 字典名称，字典文件保存为 {ZSTD_DICT_DIR}/{name}_{dict_id}.dict
+        :param dict_id: 压缩使用的字典 ID，为 None 时不使用字典
+        :param level: 压缩级别
+        :param threshold: 压缩阈值（字节），小于阈值的数据不压缩
+        :return:
+        """
+        self.name = name
+        self.dict_id = dict_id
+        self.level = level
+        self.threshold = threshold
+        self._dicts: dict[int, zstandard.ZstdCompressionDict] = {}
+        self._compressor: zstandard.ZstdCompressor | None = None
+        self._decompressors: dict[int, zstandard.ZstdDecompressor] = {}
+
+    def dict_path(self, dict_id: int) -> Path:
+        """
+        获取字典文件路径
+
+        :param dict_id: 字典 ID
+        :return:
+        """
+        return ZSTD_DICT_DIR / f'{self.name}_{dict_id}.dict'
+
+    def load_dict(self, dict_id: int) -> zstandard.ZstdCompressionDict:
+        """
+        加载字典（进程内缓存）
+
+        :param dict_id: 字典 ID
+        :return:
+        """
+        zstd_dict = self._dicts.get(dict_id)
+        if zstd_dict is None:
+            with open(self.dict_path(dict_id), 'rb') as f:
+                zstd_dict = zstandard.ZstdCompressionDict(f.read())
+            self._dicts[dict_id] = zstd_dict
+        return zstd_dict
+
+    @property
+    def compressor(self) -> zstandard.ZstdCompressor:
+        """压缩器"""
+        if self._compressor is None:
+            zstd_dict = None
+            if self.dict_id:
+                try:
+                    zstd_dict = self.load_dict(self.dict_id)
+                except FileNotFoundError:
+                    log.warning(f'zstd 字典 {self.dict_path(self.dict_id)} 不存在，将使用无字典压缩')
+            self._compressor = zstandard.ZstdCompressor(level=self.level, dict_data=zstd_dict, write_dict_id=True)
+        return self._compressor
+
+    def decompressor(self, dict_id: int) -> zstandard.ZstdDecompressor:
+        """
+        获取字典对应的解压器
+
+        :param dict_id: 字典 ID，0 表示无字典
+        :return:
+        """
+        decompressor = self._decompressors.get(dict_id)
+        if decompressor is None:
+            zstd_dict = self.load_dict(dict_id) if dict_id else None
+            decompressor = zstandard.ZstdDecompressor(dict_data=zstd_dict)
+            self._decompressors[dict_id] = decompressor
+        return decompressor
+
+    def compress(self, data: bytes) -> bytes:
+        """
+        压缩数据
+
+        :param data: 原始数据
+        :return:
+        """
+        return self.compressor.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        """
+        解压数据
+
+        :param data: 压缩数据
+        :return:
+        """
+        dict_id = zstandard.get_frame_parameters(data).dict_id
+        return self.decompressor(dict_id).decompress(data)
+
+    def pack(self, obj: Any) -> tuple[Any, bytes | None]:
+        """
+        将对象按阈值拆分为内联值或压缩值
+
+        :param obj: 可 JSON 序列化的对象
+        :return: (内联值, 压缩值)，二者仅有一个不为 None
+        """
+        if obj is None:
+            return None, None
+        raw = msgspec.json.encode(obj)
+        if len(raw) < self.threshold:
+            return obj, None
+        return None, self.compress(raw)
+
+    def unpack(self, data: bytes) -> Any:
+        """
+        解压并反序列化对象
+
+        :param data: 压缩数据
+        :return:
+        """
+        return msgspec.json.decode(self.decompress(data))
+
+    def train(self, samples: Sequence[bytes], dict_size: int = 112640) -> int:
+        """
+        训练并保存字典
+
+        :param samples: 样本数据
+        :param dict_size: 字典大小（字节）
+        :return: 字典 ID
+        """
+        zstd_dict = zstandard.train_dictionary(dict_size, list(samples), level=self.level)
+        dict_id = zstd_dict.dict_id()
+        os.makedirs(ZSTD_DICT_DIR, exist_ok=True)
+        with open(self.dict_path(dict_id), 'wb') as f:
+            f.write(zstd_dict.as_bytes())
+        self._dicts[dict_id] = zstd_dict
+        return dict_id
+
+
+def available_encodings() -> tuple[str, ...]:
+    """获取当前环境支持的 HTTP 内容编码"""
+    return ('zstd', 'br', 'gzip') if brotli is not None else ('zstd', 'gzip')
+
+
+class StreamCompressor:
+    """HTTP 内容编码（Content-Encoding）的流式压缩器"""
+
+    def __init__(self, encoding: str, level: int) -> None:
+        """
+        初始化压缩器
+
+        :param encoding: 内容编码，zstd、br 或 gzip
+        :param level: 压缩级别，br 为 quality（0-11）
+        :return:
+        """
+        self.encoding = encoding
+        match encoding:
+            case 'zstd':
+                compressor = zstandard.ZstdCompressor(level=level).compressobj()
+                self._compress = compressor.compress
+                self._finish = compressor.flush
+            case 'br' if brotli is not None:
+                compressor = brotli.Compressor(quality=level)
+                self._compress = compressor.process
+                self._finish = compressor.finish
+            case 'gzip':
+                compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+                self._compress = compressor.compress
+                self._finish = compressor.flush
+            case _:
+                raise ValueError(f'不支持的内容编码：{encoding}')
+
+    def compress(self, data: bytes) -> bytes:
+        """
+        压缩数据块，压缩器可能缓冲数据而返回空字节
+
+        :param data: 原始数据块
+        :return:
+        """
+        return self._compress(data)
+
+    def finish(self) -> bytes:
+        """
+        结束压缩并返回剩余数据
+
+        :return:
+        """
+        return self._finish()
+
+
+# 操作日志请求参数编解码器
+opera_log_args_codec: ZstdDictCodec = ZstdDictCodec(
+    'opera_log_args',
+    dict_id=settings.OPERA_LOG_ARGS_COMPRESS_DICT_ID,
+    level=settings.OPERA_LOG_ARGS_COMPRESS_LEVEL,
+    threshold=settings.OPERA_LOG_ARGS_COMPRESS_THRESHOLD,
+)
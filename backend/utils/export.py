@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import csv
+import io
+import zlib
+
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, AsyncGenerator, AsyncIterable, Sequence
+from urllib.parse import quote
+
+import msgspec
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.responses import StreamingResponse
+
+from backend.common.enums import ExportFormatType
+from backend.core.conf import settings
+
+_json_encoder = msgspec.json.Encoder(decimal_format='number')
+
+_media_types = {
+    ExportFormatType.csv: 'text/csv; charset=utf-8',
+    ExportFormatType.ndjson: 'application/x-ndjson',
+}
+
+
+def _get_value(obj: Any, column: str) -> Any:
+    """
+    获取对象属性值，支持以 . 分隔的关联属性
+
+    :param obj: 对象
+    :param column: 属性路径
+    :return:
+    """
+    for attr in column.split('.'):
+        if obj is None:
+            return None
+        obj = getattr(obj, attr)
+    return obj
+
+
+def _csv_value(value: Any) -> Any:
+    """
+    转换 CSV 单元格值
+
+    :param value: 原始值
+    :return:
+    """
+    if value is None:
+        return ''
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return _json_encoder.encode(value).decode()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+class _CSVEncoder:
+    """CSV 增量编码器，复用同一缓冲区"""
+
+    def __init__(self) -> None:
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+
+    def encode(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        self.writer.writerows(rows)
+        data = self.buffer.getvalue().encode()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data
+
+
+async def stream_export(
+    db: AsyncSession,
+    stmt: Select,
+    columns: Sequence[str],
+    fmt: ExportFormatType,
+    *,
+    batch_size: int | None = None,
+) -> AsyncGenerator[bytes, None]:
+    """
+    通过服务端游标流式读取查询结果并逐批编码，内存占用与导出行数无关
+
+    :param db: 数据库会话
+    :param stmt: 查询语句
+    :param columns: 导出列，支持以 . 分隔的关联属性
+    :param fmt: 导出格式
+    :param batch_size: 每批读取行数
+    :return:
+    """
+    batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+    csv_encoder = _CSVEncoder() if fmt == ExportFormatType.csv else None
+    if csv_encoder is not None:
+        # BOM 便于 Excel 正确识别 UTF-8
+        yield b'\xef\xbb\xbf' + csv_encoder.encode([columns])
+
+    result = await db.stream_scalars(stmt.execution_options(yield_per=batch_size))
+    async for partition in result.partitions():
+        if csv_encoder is not None:
+            yield csv_encoder.encode([[_csv_value(_get_value(item, c)) for c in columns] for item in partition])
+        else:
+            yield _json_encoder.encode_lines([{c: _get_value(item, c) for c in columns} for item in partition])
+
+
+async def gzip_stream(chunks: AsyncIterable[bytes], level: int | None = None) -> AsyncGenerator[bytes, None]:
+    """
+    流式 gzip 压缩
+
+    :param chunks: 原始数据块
+    :param level: 压缩级别
+    :return:
+    """
+    compressor = zlib.compressobj(level or settings.EXPORT_GZIP_LEVEL, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_response(
+    chunks: AsyncIterable[bytes], filename: str, fmt: ExportFormatType, *, gzip: bool = False
+) -> StreamingResponse:
+    """
+    创建分块传输的导出文件响应
+
+    :param chunks: 数据块
+    :param filename: 文件名，不含扩展名
+    :param fmt: 导出格式
+    :param gzip: 是否压缩为 .gz 文件
+    :return:
+    """
+    filename = f'{filename}.{fmt.value}'
+    media_type = _media_types[fmt]
+    if gzip:
+        chunks = gzip_stream(chunks)
+        filename = f'{filename}.gz'
+        media_type = 'application/gzip'
+    headers = {'Content-Disposition': f"attachment; filename*=UTF-8''{quote(filename)}"}
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
@@ -1,8 +1,13 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import csv
+import io
 import os
 
+from typing import Any
+
 import aiofiles
+import msgspec
 
 from fastapi import UploadFile
 
@@ -74,3 +79,32 @@ async def upload_file(file: UploadFile) -> str:
     finally:
         await file.close()
     return filename
+
+
+async def read_data_rows(file: UploadFile) -> list[dict[str, Any]]:
+    """
+    读取 CSV 或 JSON 数据文件，CSV 空单元格将被忽略
+
+    :param file: FastAPI 上传文件对象
+    :return:
+    """
+    file_ext = file.filename.split('.')[-1].lower()
+    if file_ext not in ('csv', 'json'):
+        raise errors.ForbiddenError(msg='仅支持 CSV 或 JSON 文件')
+    if file.size and file.size > settings.UPLOAD_DATA_SIZE_MAX:
+        raise errors.ForbiddenError(msg='文件超出最大限制，请重新选择')
+    try:
+        content = await file.read()
+    finally:
+        await file.close()
+    try:
+        if file_ext == 'csv':
+            reader = csv.DictReader(io.StringIO(content.decode('utf-8-sig')))
+            rows = [{k: v for k, v in row.items() if k is not None and v != ''} for row in reader]
+        else:
+            rows = msgspec.json.decode(content)
+    except (UnicodeDecodeError, csv.Error, msgspec.DecodeError):
+        raise errors.RequestError(msg='文件解析失败')
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise errors.RequestError(msg='文件内容须为对象列表')
+    return rows
@@ -1,7 +1,10 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 from decimal import Decimal
-from typing import Any, Sequence, TypeVar
+from enum import Enum
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Callable, NamedTuple, Sequence, Type, TypeVar
 
 from fastapi.encoders import decimal_encoder
 from msgspec import json
@@ -14,53 +17,138 @@ RowData = Row | RowMapping | Any
 R = TypeVar('R', bound=RowData)
 
 
+def _convert_decimal(value: Any) -> Any:
+    return decimal_encoder(value) if isinstance(value, Decimal) else value
+
+
+def _convert_enum(value: Any) -> Any:
+    return value.value if isinstance(value, Enum) else value
+
+
+class SerializePlan(NamedTuple):
+    """模型的序列化计划，每个模型仅构建一次"""
+
+    keys: tuple[str, ...]
+    getter: Callable[[Any], tuple[Any, ...]]
+    converters: tuple[tuple[int, Callable[[Any], Any]], ...]
+
+
+def _column_converter(column: Any) -> Callable[[Any], Any] | None:
+    """
+    根据列类型确定值转换函数，datetime 由 msgspec 和 pydantic 原生处理，保持原值
+
+    :param column: 表列
+    :return:
+    """
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        # 无法确定类型的列（如自定义类型）退化为逐值判断
+        return _convert_decimal
+    if issubclass(python_type, Decimal):
+        return _convert_decimal
+    if issubclass(python_type, Enum):
+        return _convert_enum
+    return None
+
+
+def _make_getter(keys: tuple[str, ...]) -> Callable[[Any], tuple[Any, ...]]:
+    getter = attrgetter(*keys)
+    if len(keys) == 1:
+        return lambda obj: (getter(obj),)
+    return getter
+
+
+@lru_cache(maxsize=None)
+def get_serialize_plan(model: Type[Any]) -> SerializePlan:
+    """
+    获取模型表列的序列化计划：列名、批量取值函数和需要转换的列
+
+    :param model: SQLA 模型
+    :return:
+    """
+    columns = model.__table__.columns
+    keys = tuple(columns.keys())
+    converters = []
+    for i, column in enumerate(columns):
+        converter = _column_converter(column)
+        if converter is not None:
+            converters.append((i, converter))
+    return SerializePlan(keys, _make_getter(keys), tuple(converters))
+
+
+@lru_cache(maxsize=None)
+def _get_alias_plan(model: Type[Any]) -> SerializePlan:
+    mapper = class_mapper(model)
+    keys = tuple(prop.key for prop in mapper.iterate_properties if isinstance(prop, (ColumnProperty, SynonymProperty)))
+    return SerializePlan(keys, _make_getter(keys), ())
+
+
+def _plan_values(plan: SerializePlan, obj: Any) -> list[Any] | tuple[Any, ...]:
+    values = plan.getter(obj)
+    if plan.converters:
+        values = list(values)
+        for i, converter in plan.converters:
+            if values[i] is not None:
+                values[i] = converter(values[i])
+    return values
+
+
+def _row_serialize(row: Row | RowMapping) -> dict[str, Any]:
+    items = row._mapping.items() if isinstance(row, Row) else row.items()
+    return {key: _convert_decimal(value) for key, value in items}
+
+
 def select_columns_serialize(row: R) -> dict[str, Any]:
     """
     序列化 SQLAlchemy 查询表的列，不包含关联列
 
-    :param row: SQLAlchemy 查询结果行
+    :param row: SQLAlchemy 查询结果行，可为模型实例或 Row 元组
     :return:
     """
-    result = {}
-    for column in row.__table__.columns.keys():
-        value = getattr(row, column)
-        if isinstance(value, Decimal):
-            value = decimal_encoder(value)
-        result[column] = value
-    return result
+    if isinstance(row, (Row, RowMapping)):
+        return _row_serialize(row)
+    plan = get_serialize_plan(type(row))
+    return dict(zip(plan.keys, _plan_values(plan, row)))
 
 
 def select_list_serialize(row: Sequence[R]) -> list[dict[str, Any]]:
     """
-    序列化 SQLAlchemy 查询列表
+    序列化 SQLAlchemy 查询列表，同一模型的计划只查找一次
 
-    :param row: SQLAlchemy 查询结果列表
+    :param row: SQLAlchemy 查询结果列表，可为模型实例或 Row 元组
     :return:
     """
-    return [select_columns_serialize(item) for item in row]
+    result = []
+    model, plan = None, None
+    for item in row:
+        if isinstance(item, (Row, RowMapping)):
+            result.append(_row_serialize(item))
+            continue
+        if type(item) is not model:
+            model = type(item)
+            plan = get_serialize_plan(model)
+        result.append(dict(zip(plan.keys, _plan_values(plan, item))))
+    return result
 
 
 def select_as_dict(row: R, use_alias: bool = False) -> dict[str, Any]:
     """
-    将 SQLAlchemy 查询结果转换为字典，可以包含关联数据
+    将 SQLAlchemy 查询结果转换为字典，可以包含关联数据，不修改实例状态
 
     :param row: SQLAlchemy 查询结果行
     :param use_alias: 是否使用别名作为列名
     :return:
     """
+    if isinstance(row, Row):
+        return row._asdict()
+    if isinstance(row, RowMapping):
+        return dict(row)
     if not use_alias:
-        result = row.__dict__
-        if '_sa_instance_state' in result:
-            del result['_sa_instance_state']
-    else:
-        result = {}
-        mapper = class_mapper(row.__class__)  # type: ignore
-        for prop in mapper.iterate_properties:
-            if isinstance(prop, (ColumnProperty, SynonymProperty)):
-                key = prop.key
-                result[key] = getattr(row, key)
-
-    return result
+        # 仅包含已加载的属性，不会触发延迟加载
+        return {key: value for key, value in row.__dict__.items() if key != '_sa_instance_state'}
+    plan = _get_alias_plan(type(row))
+    return dict(zip(plan.keys, plan.getter(row)))
 
 
 class MsgSpecJSONResponse(JSONResponse):
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+import os
+import socket
+
+from typing import Awaitable, Callable
+
+from redis.exceptions import ResponseError
+
+from backend.common.log import log
+from backend.database.redis import redis_client
+
+# 批处理函数，接收消息数据列表
+StreamHandler = Callable[[list[str]], Awaitable[None]]
+
+
+class RedisStreamConsumer:
+    """
+    Redis Stream 消费者组
+
+    消息处理成功后确认（XACK），批量处理失败时逐条处理，处理失败的消息保留在待确认列表中，空闲超时后被重新认领重试，
+    超过最大投递次数的消息转移至死信流 {stream}:dead
+    """
+
+    def __init__(
+        self,
+        stream: str,
+        group: str,
+        handler: StreamHandler,
+        *,
+        batch_size: int = 500,
+        block_ms: int = 2000,
+        claim_idle_ms: int = 60000,
+        max_deliveries: int = 5,
+    ) -> None:
+        """
+        初始化消费者组
+
+        :param stream: 流名称
+        :param group: 消费者组名称
+        :param handler: 批处理函数
+        :param batch_size: 单批最大消息数
+        :param block_ms: 无消息时阻塞等待时长（毫秒）
+        :param claim_idle_ms: 待确认消息空闲超过该时长后重新认领（毫秒）
+        :param max_deliveries: 最大投递次数
+        :return:
+        """
+        self.stream = stream
+        self.group = group
+        self.handler = handler
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.claim_idle_ms = claim_idle_ms
+        self.max_deliveries = max_deliveries
+        self.consumer = f'{socket.gethostname()}-{os.getpid()}'
+        self._group_created = False
+
+    @property
+    def dead_stream(self) -> str:
+        """死信流名称"""
+        return f'{self.stream}:dead'
+
+    async def ensure_group(self) -> None:
+        """创建消费者组（已存在时跳过）"""
+        if self._group_created:
+            return
+        try:
+            await redis_client.xgroup_create(self.stream, self.group, id='0', mkstream=True)
+        except ResponseError as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+        self._group_created = True
+
+    async def claim(self) -> list[tuple[str, dict[str, str]]]:
+        """
+        认领空闲超时的待确认消息，超过最大投递次数的消息转入死信流
+
+        :return:
+        """
+        pending = await redis_client.xpending_range(
+            self.stream, self.group, '-', '+', self.batch_size, idle=self.claim_idle_ms
+        )
+        if not pending:
+            return []
+        dead_ids, retry_ids = [], []
+        for item in pending:
+            if item['times_delivered'] >= self.max_deliveries:
+                dead_ids.append(item['message_id'])
+            else:
+                retry_ids.append(item['message_id'])
+        if dead_ids:
+            await self.dead_letter(dead_ids)
+        if not retry_ids:
+            return []
+        return await redis_client.xclaim(self.stream, self.group, self.consumer, self.claim_idle_ms, retry_ids)
+
+    async def dead_letter(self, message_ids: list[str]) -> None:
+        """
+        将消息转入死信流并确认
+
+        :param message_ids: 消息 ID 列表
+        :return:
+        """
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for message_id in message_ids:
+                for _, fields in await redis_client.xrange(self.stream, message_id, message_id):
+                    pipe.xadd(self.dead_stream, {**fields, 'origin_id': message_id})
+            pipe.xack(self.stream, self.group, *message_ids)
+            await pipe.execute()
+        log.error(f'Redis Stream {self.stream} 消息超过最大投递次数，已转入死信流: {message_ids}')
+
+    async def read(self, block: bool = True) -> list[tuple[str, dict[str, str]]]:
+        """
+        读取一批消息，优先重试待确认消息
+
+        :param block: 无消息时是否阻塞等待
+        :return:
+        """
+        messages = await self.claim()
+        if messages:
+            return messages
+        result = await redis_client.xreadgroup(
+            self.group,
+            self.consumer,
+            {self.stream: '>'},
+            count=self.batch_size,
+            block=self.block_ms if block else None,
+        )
+        return result[0][1] if result else []
+
+    async def process(self, block: bool = True) -> int:
+        """
+        读取并处理一批消息
+
+        :param block: 无消息时是否阻塞等待
+        :return: 已确认的消息数
+        """
+        await self.ensure_group()
+        messages = await self.read(block)
+        if not messages:
+            return 0
+        try:
+            await self.handler([fields['data'] for _, fields in messages])
+        except Exception as e:
+            if len(messages) == 1:
+                raise
+            log.warning(f'Redis Stream {self.stream} 批量处理失败，改为逐条处理: {e}')
+            message_ids = await self.process_each(messages)
+        else:
+            message_ids = [message_id for message_id, _ in messages]
+        await redis_client.xack(self.stream, self.group, *message_ids)
+        return len(message_ids)
+
+    async def process_each(self, messages: list[tuple[str, dict[str, str]]]) -> list[str]:
+        """
+        逐条处理消息，处理失败的消息保留在待确认列表中，避免单条异常消息拖累整批被转入死信流
+
+        :param messages: 消息列表
+        :return: 处理成功的消息 ID 列表
+        """
+        message_ids, error = [], None
+        for message_id, fields in messages:
+            try:
+                await self.handler([fields['data']])
+            except Exception as e:
+                log.error(f'Redis Stream {self.stream} 消息 {message_id} 处理失败: {e}')
+                error = e
+            else:
+                message_ids.append(message_id)
+        if not message_ids:
+            raise error
+        return message_ids
+
+    async def drain(self) -> int:
+        """
+        处理所有积压消息后返回，用于定时任务
+
+        :return: 已确认的消息数
+        """
+        total = 0
+        while count := await self.process(block=False):
+            total += count
+        return total
+
+    async def run(self) -> None:
+        """持续消费，用于应用进程内的后台任务"""
+        while True:
+            try:
+                await self.process()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.error(f'Redis Stream {self.stream} 消费失败: {e}')
+                await asyncio.sleep(self.block_ms / 1000)